@@ -1,21 +1,105 @@
 """Flask entry point used locally and by Vercel."""
 
+from functools import partial
+import hmac
+import json
 import os
 import sys
 
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, jsonify, render_template, request, stream_with_context
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from data_loader import TennisDataLoader
+from data_reload import DataReloader
 from market_odds import get_market_comparison
-from simulation_service import ValidationError, run_simulation_request
+from player_search import (
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_SEARCH_LIMIT,
+    MAX_PAGE_SIZE,
+    MAX_SEARCH_LIMIT,
+    PlayerDirectory,
+)
+from result_store import SimulationResultStore, TieredResultCache
+from simulation_cache import BoundedLRUCache
+from simulation_service import (
+    SimulationPool,
+    ValidationError,
+    run_simulation_request,
+    unchanged_inputs,
+)
 from upcoming_service import UpcomingMatchService
 
 
 app = Flask(__name__, template_folder="../templates", static_folder="../static")
-data_loader = TennisDataLoader()
-upcoming_service = UpcomingMatchService(data_loader)
+# OPPONENT_ADJUSTED=1 simulates with the refresh job's opponent-adjusted
+# serve and return rates instead of the raw ones.
+load_data = partial(TennisDataLoader, opponent_adjusted=os.environ.get("OPPONENT_ADJUSTED") == "1")
+data_loader = load_data()
+# Dashboard simulations run on a shared process pool when workers are
+# configured; serverless deployments leave it unset and compute inline.
+simulation_workers = int(os.environ.get("SIMULATION_WORKERS", "0"))
+simulation_pool = SimulationPool(data_loader, simulation_workers) if simulation_workers > 0 else None
+# An optional SQLite file (ideally on a mounted volume) keeps seeded results
+# across restarts; the in-memory LRUs stay in front of it.
+result_store_path = os.environ.get("SIMULATION_STORE_PATH")
+result_store = SimulationResultStore(result_store_path) if result_store_path else None
+simulate_cache = TieredResultCache(
+    BoundedLRUCache(max_entries=256, max_bytes=8 * 1024 * 1024), result_store
+)
+simulate_cache.warm_load(
+    data_loader.data_version, limit=256, unchanged=unchanged_inputs(data_loader)
+)
+player_directory = PlayerDirectory.from_loader(data_loader)
+upcoming_service = UpcomingMatchService(
+    data_loader,
+    simulation_pool=simulation_pool,
+    prewarm=os.environ.get("PREWARM_DASHBOARD") == "1",
+    result_store=result_store,
+)
+
+
+def activate_loader(loader, previous):
+    """Start a warm pool for ``loader``; return the step that makes it live.
+
+    Caches are only carried forward in that step, so a failed reload leaves
+    the live snapshot's caches untouched.
+    """
+    pool = SimulationPool(loader, simulation_workers) if simulation_workers > 0 else None
+    try:
+        if pool is not None:
+            pool.start()
+        directory = PlayerDirectory.from_loader(loader)
+    except Exception:
+        if pool is not None:
+            pool.shutdown(wait=False)
+        raise
+
+    def go_live():
+        global player_directory
+        if loader.data_version != previous.data_version:
+            simulate_cache.carry_forward(
+                previous.data_version, loader.data_version, unchanged_inputs(loader), limit=256
+            )
+        upcoming_service.swap_loader(loader, pool)
+        player_directory = directory
+
+    return go_live
+
+
+# New data written by scripts/refresh_data.py is picked up when metadata.json
+# changes, or on an authenticated POST /api/admin/reload.
+data_reloader = DataReloader(data_loader, on_swap=[activate_loader], loader_factory=load_data)
+if os.environ.get("WATCH_DATA", "1") == "1":
+    data_reloader.start_watching()
+
+
+def published_response(snapshot, cache_control):
+    """Serve pre-serialized bytes with a strong ETag; If-None-Match gets a 304."""
+    response = app.response_class(snapshot.body, mimetype="application/json")
+    response.set_etag(snapshot.etag)
+    response.headers["Cache-Control"] = cache_control
+    return response.make_conditional(request)
 
 
 @app.get("/")
@@ -23,14 +107,72 @@ def index():
     return render_template("index.html")
 
 
+def bounded_int_arg(name, default, maximum):
+    """Read a positive integer query argument; raise ValueError with a message."""
+    try:
+        value = int(request.args.get(name, default))
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+    if not 1 <= value <= maximum:
+        raise ValueError(f"{name} must be between 1 and {maximum}")
+    return value
+
+
 @app.get("/api/players")
 def get_players():
-    return jsonify({"players": data_loader.get_all_players()})
+    directory = player_directory
+    if "page" not in request.args and "per_page" not in request.args:
+        return published_response(directory.full_list, "public, max-age=300")
+    try:
+        page = bounded_int_arg("page", 1, 10**6)
+        per_page = bounded_int_arg("per_page", DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    return published_response(directory.page(page, per_page), "public, max-age=300")
+
+
+@app.get("/api/players/search")
+def search_players():
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "q is required"}), 400
+    try:
+        limit = bounded_int_arg("limit", DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    return jsonify({"query": query, "players": player_directory.search(query, limit)})
 
 
 @app.get("/healthz")
 def healthcheck():
-    return jsonify({"status": "ok", "data_version": upcoming_service.data_version})
+    return jsonify({
+        "status": "ok",
+        "data_version": upcoming_service.data_version,
+        "warmup": upcoming_service.warmup_status(),
+        "data": data_reloader.status(),
+    })
+
+
+@app.post("/api/admin/reload")
+def reload_data():
+    token = os.environ.get("ADMIN_TOKEN")
+    if not token:
+        return jsonify({"error": "Not found"}), 404
+    supplied = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(supplied.encode("utf-8"), f"Bearer {token}".encode("utf-8")):
+        return jsonify({"error": "Unauthorized"}), 401
+    started = data_reloader.request_reload()
+    return jsonify({"started": started, **data_reloader.status()}), 202
+
+
+@app.get("/api/metrics")
+def metrics():
+    return jsonify({
+        "discovery": upcoming_service.discovery_metrics(),
+        "simulation_cache": upcoming_service.cache_metrics(),
+        "simulate_cache": simulate_cache.metrics(),
+        "result_store": result_store.metrics() if result_store is not None else None,
+    })
 
 
 @app.get("/api/upcoming")
@@ -42,8 +184,10 @@ def upcoming_matches():
     if not 1 <= days <= 7:
         return jsonify({"error": "Days must be between 1 and 7"}), 400
     try:
-        response = jsonify(upcoming_service.get_upcoming(days=days))
-        response.headers["Cache-Control"] = "public, max-age=60"
+        response = published_response(
+            upcoming_service.get_upcoming_snapshot(days=days), "public, max-age=60"
+        )
+        response.headers["Age"] = str(int(upcoming_service.snapshot_age() or 0))
         return response
     except Exception:
         app.logger.exception("Upcoming-match discovery failed")
@@ -53,11 +197,11 @@ def upcoming_matches():
 @app.get("/api/upcoming/<match_id>/simulation")
 def upcoming_simulation(match_id):
     try:
-        response = jsonify(upcoming_service.get_simulation(match_id))
-        response.headers["Cache-Control"] = "public, max-age=300"
-        return response
-    except KeyError:
-        return jsonify({"error": "Upcoming match not found"}), 404
+        return published_response(
+            upcoming_service.get_simulation_snapshot(match_id), "public, max-age=300"
+        )
+    except KeyError as error:
+        return jsonify({"error": error.args[0]}), 404
     except ValueError as error:
         return jsonify({"error": str(error)}), 422
     except Exception:
@@ -65,12 +209,68 @@ def upcoming_simulation(match_id):
         return jsonify({"error": "Match simulation is temporarily unavailable"}), 503
 
 
+def requested_match_ids():
+    return [item.strip() for item in request.args.get("ids", "").split(",") if item.strip()]
+
+
+def simulation_line(match_id, snapshot, error):
+    """Encode one batch result around the snapshot's pre-serialized bytes."""
+    if error is not None:
+        status, message = error
+        return json.dumps(
+            {"error": message, "id": match_id, "status": status},
+            separators=(",", ":"), sort_keys=True,
+        ).encode("utf-8")
+    return b'{"id":' + json.dumps(match_id).encode("utf-8") + b',"simulation":' + snapshot.body + b"}"
+
+
+@app.get("/api/upcoming/simulations")
+def upcoming_simulations():
+    try:
+        results = upcoming_service.iter_simulation_snapshots(requested_match_ids())
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    except Exception:
+        app.logger.exception("Upcoming-match discovery failed")
+        return jsonify({"error": "Upcoming matches are temporarily unavailable"}), 503
+    lines = [simulation_line(*result) for result in results]
+    response = app.response_class(
+        b'{"results":[' + b",".join(lines) + b"]}", mimetype="application/json"
+    )
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+@app.get("/api/upcoming/simulations/stream")
+def stream_upcoming_simulations():
+    """NDJSON variant that writes each simulation as soon as it completes."""
+    try:
+        results = upcoming_service.iter_simulation_snapshots(requested_match_ids())
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    except Exception:
+        app.logger.exception("Upcoming-match discovery failed")
+        return jsonify({"error": "Upcoming matches are temporarily unavailable"}), 503
+
+    def generate():
+        for result in results:
+            yield simulation_line(*result) + b"\n"
+
+    response = app.response_class(
+        stream_with_context(generate()), mimetype="application/x-ndjson"
+    )
+    response.headers["Cache-Control"] = "no-store"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
 @app.post("/api/simulate")
 def simulate_match():
     try:
         payload = request.get_json(silent=True)
         return jsonify(run_simulation_request(
-            payload, data_loader, market_odds_provider=get_market_comparison
+            payload, data_reloader.loader, market_odds_provider=get_market_comparison,
+            result_cache=simulate_cache,
         ))
     except (ValidationError, ValueError) as error:
         return jsonify({"error": str(error)}), 400
@@ -0,0 +1,244 @@
+"""Surface-Elo and ranking baselines to show beside the point-level model."""
+
+from array import array
+from datetime import date
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+BASELINES_FILE = "elo_ratings.json"
+BASELINES_FORMAT_VERSION = 1
+SURFACES = ("hard", "clay", "grass")
+INITIAL_RATING = 1500.0
+
+
+def expected_score(rating: float, opponent: float) -> float:
+    return 1.0 / (1.0 + 10.0 ** ((opponent - rating) / 400.0))
+
+
+def k_factor(matches: int) -> float:
+    """Step size that shrinks as a rating gathers matches."""
+    return 250.0 / (matches + 5) ** 0.4
+
+
+def ranking_probability(rank: Optional[float], opponent_rank: Optional[float]) -> Optional[float]:
+    """Naive ranking baseline: ``1 / (1 + rank / opponent_rank)``."""
+    if not rank or not opponent_rank:
+        return None
+    return opponent_rank / (rank + opponent_rank)
+
+
+def _parse_rank(value) -> Optional[int]:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _match_order(row) -> Tuple:
+    number = row.get("match_num", "")
+    return row.get("tourney_id", ""), int(number) if number.isdigit() else 0
+
+
+class EloRatings:
+    """Overall and per-surface Elo ratings in arrays indexed by player id.
+
+    ``through`` is the last date whose matches are included. ``advance``
+    replays later matches in date order, and within a tournament in match
+    order, updating the arrays after each match.
+    """
+
+    def __init__(self, through: Optional[date] = None):
+        self.through = through
+        self.players: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self.overall = array("d")
+        self.overall_matches = array("I")
+        # Row-major: ``player * len(SURFACES) + surface``.
+        self.surface = array("d")
+        self.surface_matches = array("I")
+
+    def __len__(self):
+        return len(self.players)
+
+    def copy(self) -> "EloRatings":
+        ratings = EloRatings(self.through)
+        ratings.players = list(self.players)
+        ratings._ids = dict(self._ids)
+        for name in ("overall", "overall_matches", "surface", "surface_matches"):
+            setattr(ratings, name, array(getattr(self, name).typecode, getattr(self, name)))
+        return ratings
+
+    def _player_id(self, name: str) -> int:
+        player = self._ids.get(name)
+        if player is None:
+            player = self._ids[name] = len(self.players)
+            self.players.append(name)
+            self.overall.append(INITIAL_RATING)
+            self.overall_matches.append(0)
+            self.surface.extend((INITIAL_RATING,) * len(SURFACES))
+            self.surface_matches.extend((0,) * len(SURFACES))
+        return player
+
+    def rating(self, player: str, surface: Optional[str] = None) -> Optional[float]:
+        index = self._ids.get(player)
+        if index is None:
+            return None
+        if surface is None:
+            return self.overall[index]
+        if surface not in SURFACES:
+            return None
+        return self.surface[index * len(SURFACES) + SURFACES.index(surface)]
+
+    def probabilities(self, player1: str, player2: str, surface: Optional[str] = None) -> Dict:
+        """``player1``'s Elo and surface-Elo win probabilities; ``None`` if unrated."""
+        result = {"elo": None, "surface_elo": None}
+        overall = (self.rating(player1), self.rating(player2))
+        if None not in overall:
+            result["elo"] = expected_score(*overall)
+        if surface is not None:
+            rated = (self.rating(player1, surface), self.rating(player2, surface))
+            if None not in rated:
+                result["surface_elo"] = expected_score(*rated)
+        return result
+
+    def update(self, winner: str, loser: str, surface: Optional[str]) -> Tuple[float, Optional[float]]:
+        """Apply one result; return the winner's pre-match Elo and surface-Elo probabilities."""
+        won = self._player_id(winner)
+        lost = self._player_id(loser)
+        overall, counts = self.overall, self.overall_matches
+        probability = expected_score(overall[won], overall[lost])
+        overall[won] += k_factor(counts[won]) * (1.0 - probability)
+        overall[lost] -= k_factor(counts[lost]) * (1.0 - probability)
+        counts[won] += 1
+        counts[lost] += 1
+        if surface not in SURFACES:
+            return probability, None
+        width = len(SURFACES)
+        offset = SURFACES.index(surface)
+        won, lost = won * width + offset, lost * width + offset
+        ratings, counts = self.surface, self.surface_matches
+        surface_probability = expected_score(ratings[won], ratings[lost])
+        ratings[won] += k_factor(counts[won]) * (1.0 - surface_probability)
+        ratings[lost] -= k_factor(counts[lost]) * (1.0 - surface_probability)
+        counts[won] += 1
+        counts[lost] += 1
+        return probability, surface_probability
+
+    def advance(self, matches: Sequence[Tuple[date, Dict]], through: date) -> List[Tuple[date, Dict, Dict]]:
+        """Apply every match after ``self.through`` up to ``through`` in one pass.
+
+        Returns ``(match_date, row, baseline)`` per applied match, where
+        ``baseline`` holds the winner's pre-match ``elo``, ``surface_elo``, and
+        ``ranking`` probabilities.
+        """
+        start = self.through
+        ordered = sorted(
+            (
+                (match_date, _match_order(row), position, row)
+                for position, (match_date, row) in enumerate(matches)
+                if (start is None or match_date > start) and match_date <= through
+            ),
+            key=lambda item: item[:3],
+        )
+        emitted = []
+        for match_date, _, _, row in ordered:
+            winner = row["winner_name"].strip()
+            loser = row["loser_name"].strip()
+            if not winner or not loser:
+                continue
+            elo, surface_elo = self.update(winner, loser, row.get("surface", "").strip().lower())
+            emitted.append((match_date, row, {
+                "elo": elo,
+                "surface_elo": surface_elo,
+                "ranking": ranking_probability(
+                    _parse_rank(row.get("winner_rank")), _parse_rank(row.get("loser_rank"))
+                ),
+            }))
+        self.through = through
+        return emitted
+
+    def to_dict(self) -> Dict:
+        width = len(SURFACES)
+        return {
+            "through": None if self.through is None else self.through.isoformat(),
+            "players": self.players,
+            "overall": [round(value, 2) for value in self.overall],
+            "overall_matches": list(self.overall_matches),
+            "surface": {
+                surface: [round(value, 2) for value in self.surface[offset::width]]
+                for offset, surface in enumerate(SURFACES)
+            },
+            "surface_matches": {
+                surface: list(self.surface_matches[offset::width])
+                for offset, surface in enumerate(SURFACES)
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "EloRatings":
+        ratings = cls(date.fromisoformat(data["through"]) if data.get("through") else None)
+        ratings.players = list(data["players"])
+        ratings._ids = {name: index for index, name in enumerate(ratings.players)}
+        ratings.overall = array("d", data["overall"])
+        ratings.overall_matches = array("I", data["overall_matches"])
+        columns = [data["surface"][surface] for surface in SURFACES]
+        counts = [data["surface_matches"][surface] for surface in SURFACES]
+        if any(len(column) != len(ratings.players) for column in (
+            ratings.overall, ratings.overall_matches, *columns, *counts,
+        )):
+            raise ValueError("Elo ratings columns do not match the player list")
+        ratings.surface = array("d", (value for row in zip(*columns) for value in row))
+        ratings.surface_matches = array("I", (value for row in zip(*counts) for value in row))
+        return ratings
+
+
+def dump_checkpoints(checkpoints: Sequence[EloRatings]) -> bytes:
+    """Serialize ``checkpoints`` ordered by date; the last one is served."""
+    ordered = sorted(checkpoints, key=lambda ratings: ratings.through or date.min)
+    return (json.dumps({
+        "format_version": BASELINES_FORMAT_VERSION,
+        "checkpoints": [ratings.to_dict() for ratings in ordered],
+    }, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def load_checkpoints(path, sha256: Optional[str] = None) -> List[EloRatings]:
+    """Checkpoints stored at ``path`` ordered by date, or ``[]`` if there is no file.
+
+    With ``sha256``, a file that hashes to anything else raises ``ValueError``.
+    """
+    try:
+        blob = Path(path).read_bytes()
+    except FileNotFoundError:
+        return []
+    if sha256 is not None and hashlib.sha256(blob).hexdigest() != sha256:
+        raise ValueError(f"Elo ratings in {path} do not match their checksum")
+    data = json.loads(blob.decode("utf-8"))
+    if data.get("format_version") != BASELINES_FORMAT_VERSION:
+        raise ValueError(f"Unsupported Elo ratings format in {path}")
+    return [EloRatings.from_dict(checkpoint) for checkpoint in data["checkpoints"]]
+
+
+def latest_checkpoint(checkpoints: Sequence[EloRatings], through: Optional[date] = None):
+    """The newest checkpoint dated no later than ``through``, if any."""
+    eligible = [
+        ratings for ratings in checkpoints
+        if ratings.through is not None and (through is None or ratings.through <= through)
+    ]
+    return max(eligible, key=lambda ratings: ratings.through, default=None)
+
+
+def baseline_comparison(ratings: EloRatings, player1: str, player2: str,
+                        surfaces: Sequence[str], rankings: Tuple) -> Dict:
+    """Per-surface baseline probabilities for ``player1``, for API responses."""
+    ranking = ranking_probability(*rankings)
+    return {
+        "through": None if ratings.through is None else ratings.through.isoformat(),
+        "surfaces": {
+            surface: {**ratings.probabilities(player1, player2, surface), "ranking": ranking}
+            for surface in surfaces
+        },
+    }
+
@@ -1,6 +1,44 @@
 import csv
+import hashlib
+import json
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+import struct
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from baselines import BASELINES_FILE, latest_checkpoint, load_checkpoints
+from player_stats import (
+    SNAPSHOT_FORMAT_VERSION,
+    FallbackSourcesView,
+    PlayerDataView,
+    PlayerStatsTable,
+)
+from probability_table import PROBABILITY_TABLE_FORMAT_VERSION, load_probability_table
+
+
+SNAPSHOT_FILE = "player_stats.bin"
+MINIMUM_USABLE_PLAYERS = 50
+
+
+def read_metadata(metadata_path) -> Dict:
+    try:
+        metadata = json.loads(Path(metadata_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def read_data_version(metadata_path) -> str:
+    """Return the snapshot's ``as_of`` date from ``metadata.json``, or "unknown"."""
+    metadata = read_metadata(metadata_path)
+    return str(metadata.get("as_of") or metadata.get("generated_at") or "unknown")
+
+
+def validate_loader(loader: "TennisDataLoader") -> None:
+    """Reject a data snapshot that is not fit to serve; shared with the refresh job."""
+    if len(loader.get_all_players()) < MINIMUM_USABLE_PLAYERS:
+        raise RuntimeError(
+            f"Refresh produced fewer than {MINIMUM_USABLE_PLAYERS} usable players"
+        )
 
 
 class TennisDataLoader:
@@ -13,12 +51,47 @@ class TennisDataLoader:
         "breaks": "Tennis abstract - breaks.csv",
         "more": "Tennis abstract - more.csv",
     }
+    SURFACES = (*DISPLAY_SURFACES, "all")
+    # Numeric fields, one float column each in ``stats_table``.
+    STAT_FIELDS = (
+        "ranking", "matches_played", "first_serve_in_pct", "first_serve_win_pct",
+        "second_serve_win_pct", "second_serve_win_pct_in_play",
+        "double_fault_per_second_serve", "ace_pct", "double_fault_pct",
+        "vs_first_serve_win_pct", "vs_second_serve_win_pct", "vs_double_fault_pct",
+        "return_points_won", "median_opponent_rank", "mean_opponent_rank",
+        "break_point_conversion_pct", "break_point_save_pct", "break_points_converted",
+        "break_point_chances", "break_points_saved", "break_points_faced",
+        "dominance_ratio", "total_points_won_pct", "tiebreak_win_pct", "set_win_pct",
+        "game_win_pct", "adjusted_first_serve_win_pct", "adjusted_second_serve_win_pct",
+        "adjusted_vs_first_serve_win_pct", "adjusted_vs_second_serve_win_pct",
+    )
+    # Model inputs and the opponent-adjusted columns that replace them when selected.
+    OPPONENT_ADJUSTED_FIELDS = {
+        "first_serve_win_pct": "adjusted_first_serve_win_pct",
+        "second_serve_win_pct": "adjusted_second_serve_win_pct",
+        "vs_first_serve_win_pct": "adjusted_vs_first_serve_win_pct",
+        "vs_second_serve_win_pct": "adjusted_vs_second_serve_win_pct",
+    }
 
-    def __init__(self, data_dir: Optional[str] = None):
+    def __init__(self, data_dir: Optional[str] = None, use_snapshot: bool = True,
+                 map_snapshot: bool = True, opponent_adjusted: bool = False):
         self.data_dir = Path(data_dir) if data_dir else Path(__file__).resolve().parent / "data"
-        self.player_data: Dict[str, Dict[str, Dict]] = {}
-        self.fallback_sources: Dict[str, Dict[str, Optional[str]]] = {}
+        self.stats_table = PlayerStatsTable(self.STAT_FIELDS, self.SURFACES)
+        self.metadata = read_metadata(self.data_dir / "metadata.json")
+        self.data_version = str(
+            self.metadata.get("as_of") or self.metadata.get("generated_at") or "unknown"
+        )
+        self.source = None
+        self.use_snapshot = use_snapshot
+        # Mapped snapshots share one page-cache copy across gunicorn workers
+        # and simulation-pool processes.
+        self.map_snapshot = map_snapshot
+        # Serve the refresh job's opponent-adjusted serve and return rates,
+        # where present, in place of the raw ones.
+        self.opponent_adjusted = opponent_adjusted
         self.load_all_data()
+        self.baselines = self.load_baselines()
+        self.probability_table = self.load_probability_table()
 
     @staticmethod
     def clean_percentage(value) -> Optional[float]:
@@ -67,27 +140,119 @@ class TennisDataLoader:
         return rows
 
     def load_all_data(self) -> None:
+        """Load the binary snapshot when it matches ``metadata.json``, else the CSVs."""
+        if self.use_snapshot and self.load_snapshot():
+            self.source = "snapshot"
+            return
+        self.load_csv_files()
+        self.source = "csv"
+
+    def load_baselines(self):
+        """Latest Elo ratings from ``elo_ratings.json``, or ``None``.
+
+        Ratings missing from ``metadata.json``, or whose file is absent,
+        unreadable, or does not match the recorded checksum, are ignored so
+        the simulator still starts without its baselines.
+        """
+        recorded = self.metadata.get("baselines") or {}
+        if not recorded.get("sha256"):
+            return None
+        try:
+            checkpoints = load_checkpoints(
+                self.data_dir / recorded.get("file", BASELINES_FILE), recorded["sha256"]
+            )
+        except (KeyError, OSError, TypeError, ValueError):
+            return None
+        return latest_checkpoint(checkpoints)
+
+    def load_probability_table(self):
+        """The precomputed table for the loaded snapshot, or ``None``.
+
+        A table built from any other snapshot or with the other choice of
+        rates, or stats loaded from the CSVs, would disagree with live
+        simulation, so it is ignored.
+        """
+        recorded = self.metadata.get("probability_table") or {}
+        if (self.source != "snapshot"
+                or bool(recorded.get("opponent_adjusted")) != self.opponent_adjusted
+                or recorded.get("format_version") != PROBABILITY_TABLE_FORMAT_VERSION
+                or not recorded.get("sha256")):
+            return None
+        try:
+            table = load_probability_table(self.data_dir / recorded["file"], recorded["sha256"])
+        except (KeyError, OSError, ValueError, struct.error, UnicodeDecodeError):
+            return None
+        if table.snapshot_sha256 != (self.metadata.get("snapshot") or {}).get("sha256"):
+            return None
+        return table
+
+    def load_snapshot(self) -> bool:
+        recorded = self.metadata.get("snapshot") or {}
+        if recorded.get("format_version") != SNAPSHOT_FORMAT_VERSION or not recorded.get("sha256"):
+            return False
+        path = self.data_dir / recorded.get("file", SNAPSHOT_FILE)
+        table = None
+        try:
+            if self.map_snapshot:
+                table = PlayerStatsTable.map_file(path, recorded.get("sha256"))
+            else:
+                blob = path.read_bytes()
+        except (OSError, ValueError, struct.error, UnicodeDecodeError):
+            return False
+        if table is None and hashlib.sha256(blob).hexdigest() != recorded.get("sha256"):
+            return False
+        # A hand-edited or partially refreshed CSV set must win over the snapshot.
+        for filename, digest in (recorded.get("csv_sha256") or {}).items():
+            try:
+                if hashlib.sha256((self.data_dir / filename).read_bytes()).hexdigest() != digest:
+                    return False
+            except OSError:
+                return False
+        if table is None:
+            try:
+                table = PlayerStatsTable.from_bytes(blob)
+            except (ValueError, struct.error, UnicodeDecodeError):
+                return False
+        if table.fields != self.STAT_FIELDS or table.surfaces != self.SURFACES:
+            return False
+        self.stats_table = table
+        return True
+
+    def snapshot_bytes(self) -> bytes:
+        return self.stats_table.to_bytes()
+
+    @property
+    def player_data(self) -> Mapping[str, Mapping[str, Dict]]:
+        """``player -> surface -> stats`` view; reads return fresh dicts."""
+        return PlayerDataView(self.stats_table)
+
+    @property
+    def fallback_sources(self) -> Mapping[str, Dict[str, Optional[str]]]:
+        return FallbackSourcesView(self.stats_table)
+
+    def load_csv_files(self) -> None:
         datasets = {name: self.load_csv_data(filename) for name, filename in self.FILES.items()}
         players = sorted({player for rows in datasets.values() for player, _ in rows})
-        surfaces = (*self.DISPLAY_SURFACES, "all")
+        table = PlayerStatsTable(self.STAT_FIELDS, self.SURFACES)
 
         for player in players:
-            self.player_data[player] = {}
-            self.fallback_sources[player] = {}
-            for requested_surface in surfaces:
+            table.add_player(player)
+            # Requested surfaces that fall back to the same source share a row.
+            source_rows = {}
+            for requested_surface in self.SURFACES:
                 source_surface = self._choose_source_surface(
                     player, requested_surface, datasets
                 )
                 if source_surface is None:
                     continue
-                stats = self._get_player_surface_data(player, source_surface, datasets)
-                if stats is None:
-                    continue
-                stats["source_surface"] = source_surface
-                self.player_data[player][requested_surface] = stats
-                self.fallback_sources[player][requested_surface] = (
-                    None if source_surface == requested_surface else source_surface
-                )
+                if source_surface not in source_rows:
+                    stats = self._get_player_surface_data(player, source_surface, datasets)
+                    source_rows[source_surface] = (
+                        None if stats is None else table.append_row(source_surface, stats)
+                    )
+                if source_rows[source_surface] is not None:
+                    table.link(player, requested_surface, source_rows[source_surface])
+        self.stats_table = table
 
     @staticmethod
     def _choose_source_surface(player: str, requested_surface: str,
@@ -111,34 +276,47 @@ class TennisDataLoader:
             more = datasets["more"][key]
         except KeyError:
             return None
+        return self.stats_from_rows(serve, returning, breaks, more)
 
+    @classmethod
+    def stats_from_rows(cls, serve: Mapping, returning: Mapping, breaks: Mapping,
+                        more: Mapping) -> Optional[Dict]:
+        """Convert one player/surface row of each CSV into a model stats dict.
+
+        Returns ``None`` when a field the simulator requires is missing.
+        """
         stats = {
-            "ranking": self.clean_numeric(serve["ranking"]),
-            "matches_played": self.clean_numeric(serve["matches_played"]),
-            "first_serve_in_pct": self.clean_percentage(serve["first_serve_in_pct"]),
-            "first_serve_win_pct": self.clean_percentage(serve["first_serve_win_pct"]),
-            "second_serve_win_pct": self.clean_percentage(serve["second_serve_win_pct"]),
-            "second_serve_win_pct_in_play": self.clean_percentage(serve["second_serve_win_pct_in_play"]),
-            "double_fault_per_second_serve": self.clean_percentage(serve["double_fault_per_second_serve"]),
-            "ace_pct": self.clean_percentage(serve["ace_pct"]),
-            "double_fault_pct": self.clean_percentage(serve["double_fault_pct"]),
-            "vs_first_serve_win_pct": self.clean_percentage(returning["vs_first_serve_win_pct"]),
-            "vs_second_serve_win_pct": self.clean_percentage(returning["vs_second_serve_win_pct"]),
-            "vs_double_fault_pct": self.clean_percentage(returning["vs_double_fault_pct"]),
-            "return_points_won": self.clean_percentage(returning["return_points_won"]),
-            "median_opponent_rank": self.clean_numeric(returning.get("median_opponent_rank")),
-            "mean_opponent_rank": self.clean_numeric(returning.get("mean_opponent_rank")),
-            "break_point_conversion_pct": self.clean_percentage(breaks["break_point_conversion_pct"]),
-            "break_point_save_pct": self.clean_percentage(breaks["break_point_save_pct"]),
-            "break_points_converted": self.clean_numeric(breaks["break_points_converted"]),
-            "break_point_chances": self.clean_numeric(breaks["break_point_chances"]),
-            "break_points_saved": self.clean_numeric(breaks["break_points_saved"]),
-            "break_points_faced": self.clean_numeric(breaks["break_points_faced"]),
-            "dominance_ratio": self.clean_numeric(more["dominance_ratio"]),
-            "total_points_won_pct": self.clean_percentage(more["total_points_won_pct"]),
-            "tiebreak_win_pct": self.clean_percentage(more["tiebreak_win_pct"]),
-            "set_win_pct": self.clean_percentage(more["set_win_pct"]),
-            "game_win_pct": self.clean_percentage(more["game_win_pct"]),
+            "ranking": cls.clean_numeric(serve["ranking"]),
+            "matches_played": cls.clean_numeric(serve["matches_played"]),
+            "first_serve_in_pct": cls.clean_percentage(serve["first_serve_in_pct"]),
+            "first_serve_win_pct": cls.clean_percentage(serve["first_serve_win_pct"]),
+            "second_serve_win_pct": cls.clean_percentage(serve["second_serve_win_pct"]),
+            "second_serve_win_pct_in_play": cls.clean_percentage(serve["second_serve_win_pct_in_play"]),
+            "double_fault_per_second_serve": cls.clean_percentage(serve["double_fault_per_second_serve"]),
+            "ace_pct": cls.clean_percentage(serve["ace_pct"]),
+            "double_fault_pct": cls.clean_percentage(serve["double_fault_pct"]),
+            "vs_first_serve_win_pct": cls.clean_percentage(returning["vs_first_serve_win_pct"]),
+            "vs_second_serve_win_pct": cls.clean_percentage(returning["vs_second_serve_win_pct"]),
+            "vs_double_fault_pct": cls.clean_percentage(returning["vs_double_fault_pct"]),
+            "return_points_won": cls.clean_percentage(returning["return_points_won"]),
+            "median_opponent_rank": cls.clean_numeric(returning.get("median_opponent_rank")),
+            "mean_opponent_rank": cls.clean_numeric(returning.get("mean_opponent_rank")),
+            "break_point_conversion_pct": cls.clean_percentage(breaks["break_point_conversion_pct"]),
+            "break_point_save_pct": cls.clean_percentage(breaks["break_point_save_pct"]),
+            "break_points_converted": cls.clean_numeric(breaks["break_points_converted"]),
+            "break_point_chances": cls.clean_numeric(breaks["break_point_chances"]),
+            "break_points_saved": cls.clean_numeric(breaks["break_points_saved"]),
+            "break_points_faced": cls.clean_numeric(breaks["break_points_faced"]),
+            "dominance_ratio": cls.clean_numeric(more["dominance_ratio"]),
+            "total_points_won_pct": cls.clean_percentage(more["total_points_won_pct"]),
+            "tiebreak_win_pct": cls.clean_percentage(more["tiebreak_win_pct"]),
+            "set_win_pct": cls.clean_percentage(more["set_win_pct"]),
+            "game_win_pct": cls.clean_percentage(more["game_win_pct"]),
+            # Absent from CSVs written before the refresh job fitted them.
+            "adjusted_first_serve_win_pct": cls.clean_percentage(serve.get("adjusted_first_serve_win_pct")),
+            "adjusted_second_serve_win_pct": cls.clean_percentage(serve.get("adjusted_second_serve_win_pct")),
+            "adjusted_vs_first_serve_win_pct": cls.clean_percentage(returning.get("adjusted_vs_first_serve_win_pct")),
+            "adjusted_vs_second_serve_win_pct": cls.clean_percentage(returning.get("adjusted_vs_second_serve_win_pct")),
         }
         required_model_fields = (
             "first_serve_in_pct", "first_serve_win_pct", "second_serve_win_pct",
@@ -150,22 +328,34 @@ class TennisDataLoader:
         return stats
 
     def get_player_stats(self, player_name: str, surface: str) -> Tuple[Dict, bool]:
-        if player_name not in self.player_data:
+        table = self.stats_table
+        if player_name not in table.players:
             raise ValueError(f"Player {player_name} not found in data")
         surface = surface.lower()
-        if surface not in self.player_data[player_name]:
+        row = table.row(player_name, surface)
+        if row is None:
             raise ValueError(f"Surface {surface} not available for player {player_name}")
-        fallback = self.fallback_sources[player_name][surface] is not None
-        return self.player_data[player_name][surface], fallback
+        stats = table.row_dict(row)
+        if self.opponent_adjusted:
+            for field, adjusted in self.OPPONENT_ADJUSTED_FIELDS.items():
+                if stats[adjusted] is not None:
+                    stats[field] = stats[adjusted]
+        return stats, table.source_surface(row) != surface
 
     def get_all_players(self) -> List[Dict]:
+        table = self.stats_table
         players = []
-        for player_name, surfaces_data in self.player_data.items():
-            available = [surface for surface in self.DISPLAY_SURFACES if surface in surfaces_data]
+        for player_name in table.players:
+            available = [
+                surface for surface in self.DISPLAY_SURFACES
+                if table.row(player_name, surface) is not None
+            ]
             if not available:
                 continue
-            ranking_stats = surfaces_data.get("all") or surfaces_data[available[0]]
-            ranking = ranking_stats["ranking"]
+            ranking_row = table.row(player_name, "all")
+            if ranking_row is None:
+                ranking_row = table.row(player_name, available[0])
+            ranking = table.value("ranking", ranking_row)
             players.append({
                 "name": player_name,
                 "ranking": int(ranking) if ranking is not None else None,
@@ -175,7 +365,10 @@ class TennisDataLoader:
         return players
 
     def get_fallback_warning(self, player_name: str, surface: str) -> Optional[str]:
-        source = self.fallback_sources.get(player_name, {}).get(surface)
-        if source:
+        row = self.stats_table.row(player_name, surface)
+        if row is None:
+            return None
+        source = self.stats_table.source_surface(row)
+        if source != surface:
             return f"{player_name} uses {source}-surface data for {surface}"
         return None
@@ -0,0 +1,124 @@
+"""Swap in refreshed data snapshots without restarting the server."""
+
+import hashlib
+import threading
+import time
+from pathlib import Path
+
+from data_loader import TennisDataLoader, validate_loader
+
+
+METADATA_POLL_SECONDS = 30
+
+
+class DataReloader:
+    """Own the live loader and replace it when ``metadata.json`` changes.
+
+    New data is loaded and validated on a background thread. ``on_swap``
+    callbacks then receive ``(new_loader, old_loader)`` and prepare everything
+    that can fail, such as caches and pools, releasing it themselves if they
+    raise. A callback may return a function that puts what it prepared live;
+    those run only after every callback has succeeded, right after the
+    reference is replaced in one assignment, and must not fail. A request that
+    read ``loader`` before the swap keeps using the old snapshot. A snapshot
+    that fails is not retried by the watcher until ``metadata.json`` changes
+    again.
+    """
+
+    def __init__(self, loader, on_swap=(), loader_factory=TennisDataLoader,
+                 poll_seconds=METADATA_POLL_SECONDS, clock=time.time):
+        self._loader = loader
+        self.on_swap = list(on_swap)
+        self.loader_factory = loader_factory
+        self.poll_seconds = poll_seconds
+        self.clock = clock
+        self.metadata_path = Path(loader.data_dir) / "metadata.json"
+        self._metadata_digest = self._read_digest()
+        self._failed_digest = None
+        self._lock = threading.Lock()
+        self._reload_thread = None
+        self._watch_thread = None
+        self._reloads = 0
+        self._last_reload_at = None
+        self._last_error = None
+
+    @property
+    def loader(self):
+        return self._loader
+
+    def _read_digest(self):
+        try:
+            return hashlib.sha256(self.metadata_path.read_bytes()).hexdigest()
+        except OSError:
+            return None
+
+    def request_reload(self):
+        """Start a background reload unless one is already running.
+
+        Returns ``False`` when a reload was already in progress.
+        """
+        with self._lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                return False
+            self._reload_thread = threading.Thread(
+                target=self.reload, name="data-reload", daemon=True
+            )
+            self._reload_thread.start()
+            return True
+
+    def reload(self):
+        """Load, validate, and swap in the snapshot on disk; return success."""
+        digest = self._read_digest()
+        previous = self._loader
+        commits = []
+        try:
+            loader = self.loader_factory(str(previous.data_dir))
+            validate_loader(loader)
+            if self._read_digest() != digest:
+                # The refresh job is still writing; the next poll retries.
+                raise RuntimeError("Data snapshot changed while it was loading")
+            for callback in self.on_swap:
+                commits.append(callback(loader, previous))
+        except Exception as error:
+            self._failed_digest = digest
+            self._last_error = f"{type(error).__name__}: {error}"
+            return False
+        self._loader = loader
+        for commit in commits:
+            if commit is not None:
+                commit()
+        self._metadata_digest = digest
+        self._reloads += 1
+        self._last_reload_at = self.clock()
+        self._last_error = None
+        return True
+
+    def check_for_update(self):
+        """Reload when ``metadata.json`` differs from the loaded and the last failed snapshot's."""
+        digest = self._read_digest()
+        if digest is not None and digest not in (self._metadata_digest, self._failed_digest):
+            return self.request_reload()
+        return False
+
+    def start_watching(self):
+        if self._watch_thread is None:
+            self._watch_thread = threading.Thread(
+                target=self._watch, name="data-watch", daemon=True
+            )
+            self._watch_thread.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            self.check_for_update()
+
+    def status(self):
+        thread = self._reload_thread
+        return {
+            "data_version": self._loader.data_version,
+            "source": self._loader.source,
+            "reloads": self._reloads,
+            "last_reload_at": self._last_reload_at,
+            "last_error": self._last_error,
+            "reloading": thread is not None and thread.is_alive(),
+        }
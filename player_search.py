@@ -0,0 +1,90 @@
+"""Prefix search and paginated listings over the loaded player list."""
+
+from typing import Dict, List, Sequence
+
+from market_odds import _tokens
+from response_snapshot import ResponseSnapshot, publish
+from simulation_cache import BoundedLRUCache
+
+
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class PlayerSearchIndex:
+    """Accent-insensitive token-prefix index, built once per player list.
+
+    ``players`` must already be in ranking order. Every prefix of every name
+    token maps to the positions of the players carrying it, so posting lists
+    stay ranking-ordered and a search can stop after the first ``limit``
+    matches instead of scoring the whole list.
+    """
+
+    def __init__(self, players: Sequence[Dict]):
+        self.players = tuple(players)
+        self._tokens = [_tokens(player["name"]) for player in self.players]
+        postings: Dict[str, List[int]] = {}
+        for position, tokens in enumerate(self._tokens):
+            prefixes = {token[:end] for token in tokens for end in range(1, len(token) + 1)}
+            for prefix in prefixes:
+                postings.setdefault(prefix, []).append(position)
+        self._postings = postings
+
+    def __len__(self):
+        return len(self.players)
+
+    def search(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Dict]:
+        """Return up to ``limit`` players whose name tokens start with every query token."""
+        terms = list(dict.fromkeys(_tokens(query)))
+        if not terms or limit <= 0:
+            return []
+        postings = [self._postings.get(term) for term in terms]
+        if any(posting is None for posting in postings):
+            return []
+        # Walk the most selective posting list; check the rest per candidate.
+        candidates = min(postings, key=len)
+        others = [term for term, posting in zip(terms, postings) if posting is not candidates]
+        matches = []
+        for position in candidates:
+            tokens = self._tokens[position]
+            if all(any(token.startswith(term) for token in tokens) for term in others):
+                matches.append(self.players[position])
+                if len(matches) == limit:
+                    break
+        return matches
+
+
+class PlayerDirectory:
+    """Search index and pre-serialized player listings for one loader."""
+
+    def __init__(self, players: Sequence[Dict], data_version=None):
+        self.data_version = data_version
+        self.index = PlayerSearchIndex(players)
+        self.full_list = publish({"players": list(self.index.players)})
+        self._pages = BoundedLRUCache(max_entries=64)
+
+    @classmethod
+    def from_loader(cls, loader):
+        return cls(loader.get_all_players(), loader.data_version)
+
+    def search(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Dict]:
+        return self.index.search(query, limit)
+
+    def page(self, page: int, per_page: int = DEFAULT_PAGE_SIZE) -> ResponseSnapshot:
+        """Publish one 1-based page of the ranking-ordered list, memoized."""
+        key = (page, per_page)
+        snapshot = self._pages.get(key)
+        if snapshot is None:
+            players = self.index.players
+            start = (page - 1) * per_page
+            snapshot = publish({
+                "players": list(players[start:start + per_page]),
+                "page": page,
+                "per_page": per_page,
+                "total": len(players),
+                "pages": -(-len(players) // per_page),
+            })
+            self._pages.put(key, snapshot)
+        return snapshot
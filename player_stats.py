@@ -0,0 +1,298 @@
+"""Columnar, array-backed storage for per-player, per-surface statistics."""
+
+from array import array
+from collections.abc import Mapping, MutableMapping
+import hashlib
+import math
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Iterable, Optional, Tuple
+
+
+SNAPSHOT_FORMAT_VERSION = 3
+# magic, format version, field count, surface count, row count, string-table bytes
+_SNAPSHOT_HEADER = struct.Struct("<4sHHHII")
+_SNAPSHOT_MAGIC = b"TSNP"
+_MISSING_ROW = -1
+
+
+def _file_signature(stat: os.stat_result) -> Tuple[int, int, int]:
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _little_endian(values: array) -> array:
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+class PlayerStatsTable:
+    """One contiguous float64 column per statistic, NaN for missing values.
+
+    A row holds one player's statistics for one *source* surface. Each player
+    has a small slot array mapping every requested surface to a row, so
+    fallbacks (grass served from all-surface data, say) are a row-index
+    indirection rather than a duplicated record.
+
+    A table opened with :meth:`map_file` reads its columns straight out of a
+    read-only memory map, so every process mapping the same snapshot shares
+    one copy in the page cache. The first write copies the columns into
+    private arrays.
+    """
+
+    def __init__(self, fields: Iterable[str], surfaces: Iterable[str]):
+        self.fields = tuple(fields)
+        self.surfaces = tuple(surfaces)
+        self._surface_codes = {surface: code for code, surface in enumerate(self.surfaces)}
+        self.columns = {field: array("d") for field in self.fields}
+        self.row_sources = array("B")
+        self._slots: Dict[str, array] = {}
+        self._mapped_file: Optional[Tuple[str, Tuple[int, int, int], str]] = None
+
+    def __len__(self):
+        return len(self.row_sources)
+
+    @property
+    def players(self):
+        return self._slots.keys()
+
+    def add_player(self, player: str) -> None:
+        if player not in self._slots:
+            self._slots[player] = array("i", [_MISSING_ROW] * len(self.surfaces))
+
+    @property
+    def mapped(self) -> bool:
+        return self._mapped_file is not None
+
+    def _make_writable(self) -> None:
+        if self._mapped_file is not None:
+            for field in self.fields:
+                self.columns[field] = array("d", self.columns[field].tobytes())
+            self._mapped_file = None
+
+    def append_row(self, source_surface: str, stats: Mapping) -> int:
+        self._make_writable()
+        for field in self.fields:
+            value = stats.get(field)
+            self.columns[field].append(math.nan if value is None else value)
+        self.row_sources.append(self._surface_codes[source_surface])
+        return len(self.row_sources) - 1
+
+    def link(self, player: str, surface: str, row: int) -> None:
+        self.add_player(player)
+        self._slots[player][self._surface_codes[surface]] = row
+
+    def unlink(self, player: str, surface: str) -> None:
+        self._slots[player][self._surface_codes[surface]] = _MISSING_ROW
+
+    def row(self, player: str, surface: str) -> Optional[int]:
+        slots = self._slots.get(player)
+        code = self._surface_codes.get(surface)
+        if slots is None or code is None or slots[code] == _MISSING_ROW:
+            return None
+        return slots[code]
+
+    def surfaces_for(self, player: str):
+        slots = self._slots[player]
+        return [surface for code, surface in enumerate(self.surfaces) if slots[code] != _MISSING_ROW]
+
+    def source_surface(self, row: int) -> str:
+        return self.surfaces[self.row_sources[row]]
+
+    def value(self, field: str, row: int) -> Optional[float]:
+        value = self.columns[field][row]
+        return None if value != value else value
+
+    def row_dict(self, row: int) -> Dict:
+        """Materialize one row as the plain dict the simulation engine reads."""
+        stats = {}
+        for field in self.fields:
+            value = self.columns[field][row]
+            stats[field] = None if value != value else value
+        stats["source_surface"] = self.source_surface(row)
+        return stats
+
+    def column(self, field: str) -> memoryview:
+        """Zero-copy view of one statistic across every row."""
+        return memoryview(self.columns[field])
+
+    def to_bytes(self) -> bytes:
+        """Serialize as fixed-layout little-endian arrays.
+
+        Layout: header, newline-joined UTF-8 string table (fields, surfaces,
+        then players), per-row source-surface codes (uint8), per-player slot
+        rows (int32, one per surface), padding to 8 bytes, then one float64
+        column per field.
+        """
+        players = list(self._slots)
+        strings = "\n".join((*self.fields, *self.surfaces, *players)).encode("utf-8")
+        slots = array("i")
+        for player in players:
+            slots.extend(self._slots[player])
+        header = _SNAPSHOT_HEADER.pack(
+            _SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, len(self.fields), len(self.surfaces),
+            len(self), len(strings),
+        )
+        body = (
+            header + strings + self.row_sources.tobytes()
+            + _little_endian(slots).tobytes()
+        )
+        body += b"\0" * (-len(body) % 8)
+        for field in self.fields:
+            body += _little_endian(array("d", self.columns[field])).tobytes()
+        return body
+
+    @classmethod
+    def from_bytes(cls, blob, copy: bool = True) -> "PlayerStatsTable":
+        """Parse a snapshot; ``copy=False`` keeps columns as views into ``blob``.
+
+        Zero-copy columns need a little-endian host and a buffer that outlives
+        the table, such as the memory map held by :meth:`map_file`.
+        """
+        (magic, version, field_count, surface_count,
+         row_count, string_bytes) = _SNAPSHOT_HEADER.unpack_from(blob)
+        if magic != _SNAPSHOT_MAGIC or version != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError("Unsupported player snapshot")
+        offset = _SNAPSHOT_HEADER.size
+        strings = blob[offset:offset + string_bytes].decode("utf-8").split("\n")
+        offset += string_bytes
+        fields = strings[:field_count]
+        surfaces = strings[field_count:field_count + surface_count]
+        players = strings[field_count + surface_count:]
+        table = cls(fields, surfaces)
+        table.row_sources.frombytes(blob[offset:offset + row_count])
+        offset += row_count
+        slots = array("i")
+        slots.frombytes(blob[offset:offset + 4 * surface_count * len(players)])
+        _little_endian(slots)
+        offset += 4 * surface_count * len(players)
+        offset += -offset % 8
+        view = memoryview(blob)
+        for field in fields:
+            chunk = view[offset:offset + 8 * row_count]
+            offset += 8 * row_count
+            if len(chunk) != 8 * row_count:
+                raise ValueError("Truncated player snapshot")
+            if copy or sys.byteorder != "little":
+                column = table.columns[field]
+                column.frombytes(chunk)
+                _little_endian(column)
+            else:
+                table.columns[field] = chunk.cast("d")
+        if len(slots) != surface_count * len(players):
+            raise ValueError("Truncated player snapshot")
+        for index, player in enumerate(players):
+            table._slots[player] = slots[index * surface_count:(index + 1) * surface_count]
+        return table
+
+    @classmethod
+    def map_file(cls, path, sha256: Optional[str] = None) -> "PlayerStatsTable":
+        """Open a snapshot file as a shared, read-only memory map.
+
+        Raises ``ValueError`` when the mapped bytes do not hash to ``sha256``.
+        """
+        with open(path, "rb") as handle:
+            stat = os.fstat(handle.fileno())
+            mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        digest = hashlib.sha256(mapping).hexdigest()
+        if sha256 is not None and digest != sha256:
+            mapping.close()
+            raise ValueError("Player snapshot does not match its checksum")
+        table = cls.from_bytes(mapping, copy=False)
+        if sys.byteorder == "little":
+            # Column views keep ``mapping`` alive for the table's lifetime.
+            table._mapped_file = (str(path), _file_signature(stat), digest)
+        return table
+
+    def __reduce__(self):
+        # Pool workers re-map the same file instead of receiving a private copy.
+        if self._mapped_file is not None:
+            path, signature, digest = self._mapped_file
+            try:
+                unchanged = _file_signature(os.stat(path)) == signature
+            except OSError:
+                unchanged = False
+            if unchanged:
+                return (PlayerStatsTable.map_file, (path, digest))
+        return (PlayerStatsTable.from_bytes, (self.to_bytes(),))
+
+
+class PlayerSurfaces(MutableMapping):
+    """Dict-like ``surface -> stats`` view of one player's rows.
+
+    Reads materialize a fresh dict; assignment appends a new row, leaving any
+    surfaces that shared the old row untouched.
+    """
+
+    def __init__(self, table: PlayerStatsTable, player: str):
+        self._table = table
+        self._player = player
+
+    def __getitem__(self, surface):
+        row = self._table.row(self._player, surface)
+        if row is None:
+            raise KeyError(surface)
+        return self._table.row_dict(row)
+
+    def __setitem__(self, surface, stats):
+        row = self._table.append_row(stats.get("source_surface", surface), stats)
+        self._table.link(self._player, surface, row)
+
+    def __delitem__(self, surface):
+        if self._table.row(self._player, surface) is None:
+            raise KeyError(surface)
+        self._table.unlink(self._player, surface)
+
+    def __iter__(self):
+        return iter(self._table.surfaces_for(self._player))
+
+    def __len__(self):
+        return len(self._table.surfaces_for(self._player))
+
+
+class PlayerDataView(Mapping):
+    """``player -> surface -> stats`` view over a table.
+
+    The player set is fixed, but each player's ``PlayerSurfaces`` writes
+    through to the shared table. The first write to a memory-mapped table
+    copies its columns into private arrays, so that process stops sharing
+    the mapped snapshot.
+    """
+
+    def __init__(self, table: PlayerStatsTable):
+        self._table = table
+
+    def __getitem__(self, player):
+        if player not in self._table.players:
+            raise KeyError(player)
+        return PlayerSurfaces(self._table, player)
+
+    def __iter__(self):
+        return iter(self._table.players)
+
+    def __len__(self):
+        return len(self._table.players)
+
+
+class FallbackSourcesView(Mapping):
+    """``player -> surface -> fallback source`` derived from row indirection."""
+
+    def __init__(self, table: PlayerStatsTable):
+        self._table = table
+
+    def __getitem__(self, player):
+        if player not in self._table.players:
+            raise KeyError(player)
+        sources = {}
+        for surface in self._table.surfaces_for(player):
+            source = self._table.source_surface(self._table.row(player, surface))
+            sources[surface] = None if source == surface else source
+        return sources
+
+    def __iter__(self):
+        return iter(self._table.players)
+
+    def __len__(self):
+        return len(self._table.players)
@@ -0,0 +1,169 @@
+"""Exact match probabilities precomputed for every pair of top-ranked players."""
+
+from array import array
+import hashlib
+import math
+from pathlib import Path
+import struct
+import sys
+from typing import Dict, List, Optional, Sequence
+
+from simulation_engine import TennisSimulator
+
+
+PROBABILITY_TABLE_FILE = "probability_table.bin"
+PROBABILITY_TABLE_FORMAT_VERSION = 1
+# magic, format version, surface count, player count, string-table bytes
+_HEADER = struct.Struct("<4sHHII")
+_MAGIC = b"TPRB"
+SURFACES = ("hard", "clay", "grass")
+# Player 1's set scores per format; a cell stores their probabilities in this order.
+SET_SCORES = {
+    "best3": ("2-0", "2-1", "1-2", "0-2"),
+    "best5": ("3-0", "3-1", "3-2", "2-3", "1-3", "0-3"),
+}
+_FORMAT_OFFSETS = {"best3": 0, "best5": len(SET_SCORES["best3"])}
+_CELL_WIDTH = sum(len(scores) for scores in SET_SCORES.values())
+
+
+def _swap(score: str) -> str:
+    won, lost = score.split("-")
+    return f"{lost}-{won}"
+
+
+class ProbabilityTable:
+    """Set-score probabilities per (player pair, surface, format) in one float32 array.
+
+    Players are stored in ranking order and each unordered pair once, with the
+    higher-ranked player as player 1, so a lookup is a dictionary hit for each
+    name and an index computation. Cells where either player has no stats for
+    the surface hold NaN. ``snapshot_sha256`` names the player snapshot the
+    probabilities were computed from; the loader ignores a table built from
+    any other.
+    """
+
+    def __init__(self, players: Sequence[str], snapshot_sha256: str,
+                 surfaces: Sequence[str] = SURFACES, values: Optional[array] = None):
+        self.players: List[str] = list(players)
+        self.snapshot_sha256 = snapshot_sha256
+        self.surfaces = tuple(surfaces)
+        self._ids = {player: index for index, player in enumerate(self.players)}
+        self._surface_codes = {surface: code for code, surface in enumerate(self.surfaces)}
+        size = self.pair_count() * len(self.surfaces) * _CELL_WIDTH
+        self.values = array("f", [math.nan]) * size if values is None else values
+        if len(self.values) != size:
+            raise ValueError("Probability table does not match its player list")
+
+    def __len__(self):
+        return len(self.players)
+
+    def pair_count(self) -> int:
+        return len(self.players) * (len(self.players) - 1) // 2
+
+    def _pair_index(self, first: int, second: int) -> int:
+        # Row-major upper triangle without the diagonal.
+        count = len(self.players)
+        return first * (2 * count - first - 1) // 2 + second - first - 1
+
+    def _cell(self, first: int, second: int, surface: str) -> int:
+        return (self._pair_index(first, second) * len(self.surfaces)
+                + self._surface_codes[surface]) * _CELL_WIDTH
+
+    @classmethod
+    def build(cls, loader, top_n: int, snapshot_sha256: str) -> "ProbabilityTable":
+        """Compute every cell for the ``top_n`` ranked players in ``loader``."""
+        players = [player["name"] for player in loader.get_all_players() if player["ranking"]]
+        table = cls(players[:top_n], snapshot_sha256)
+        for surface in table.surfaces:
+            stats = []
+            for player in table.players:
+                try:
+                    stats.append(loader.get_player_stats(player, surface)[0])
+                except ValueError:
+                    stats.append(None)
+            for first, first_stats in enumerate(stats):
+                for second in range(first + 1, len(stats)):
+                    if first_stats is None or stats[second] is None:
+                        continue
+                    cell = table._cell(first, second, surface)
+                    for format_type, scores in SET_SCORES.items():
+                        distribution = TennisSimulator.exact_match_probabilities(
+                            first_stats, stats[second], format_type
+                        )["set_distributions"]
+                        offset = cell + _FORMAT_OFFSETS[format_type]
+                        table.values[offset:offset + len(scores)] = array(
+                            "f", (distribution.get(score, 0.0) for score in scores)
+                        )
+        return table
+
+    def lookup(self, player1: str, player2: str, surface: str, format_type: str) -> Optional[Dict]:
+        """``player1``'s win probability and set-score probabilities, or ``None``."""
+        first = self._ids.get(player1)
+        second = self._ids.get(player2)
+        if (first is None or second is None or first == second
+                or surface not in self._surface_codes or format_type not in SET_SCORES):
+            return None
+        swapped = first > second
+        if swapped:
+            first, second = second, first
+        offset = self._cell(first, second, surface) + _FORMAT_OFFSETS[format_type]
+        scores = SET_SCORES[format_type]
+        probabilities = self.values[offset:offset + len(scores)]
+        if math.isnan(probabilities[0]):
+            return None
+        set_distributions = {
+            _swap(score) if swapped else score: probability
+            for score, probability in zip(scores, probabilities)
+        }
+        sets_to_win = scores[0].split("-")[0]
+        player1_win_pct = sum(
+            probability for score, probability in set_distributions.items()
+            if score.split("-")[0] == sets_to_win
+        )
+        return {
+            "player1_win_pct": player1_win_pct,
+            "player2_win_pct": 1.0 - player1_win_pct,
+            "set_distributions": set_distributions,
+        }
+
+    def to_bytes(self) -> bytes:
+        """Serialize as a header, a newline-joined UTF-8 string table (snapshot
+        hash, surfaces, then players), padding to 4 bytes, and the float32
+        values in little-endian order.
+        """
+        strings = "\n".join((self.snapshot_sha256, *self.surfaces, *self.players)).encode("utf-8")
+        header = _HEADER.pack(
+            _MAGIC, PROBABILITY_TABLE_FORMAT_VERSION, len(self.surfaces), len(self.players),
+            len(strings),
+        )
+        body = header + strings
+        body += b"\0" * (-len(body) % 4)
+        values = array("f", self.values)
+        if sys.byteorder != "little":
+            values.byteswap()
+        return body + values.tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob) -> "ProbabilityTable":
+        magic, version, surface_count, player_count, string_bytes = _HEADER.unpack_from(blob)
+        if magic != _MAGIC or version != PROBABILITY_TABLE_FORMAT_VERSION:
+            raise ValueError("Unsupported probability table")
+        offset = _HEADER.size
+        strings = bytes(blob[offset:offset + string_bytes]).decode("utf-8").split("\n")
+        offset += string_bytes
+        offset += -offset % 4
+        if len(strings) != 1 + surface_count + player_count:
+            raise ValueError("Truncated probability table")
+        values = array("f")
+        values.frombytes(blob[offset:])
+        if sys.byteorder != "little":
+            values.byteswap()
+        return cls(strings[1 + surface_count:], strings[0], strings[1:1 + surface_count], values)
+
+
+def load_probability_table(path, sha256: str) -> ProbabilityTable:
+    """Read the table at ``path``; ``ValueError`` unless it hashes to ``sha256``."""
+    blob = Path(path).read_bytes()
+    if hashlib.sha256(blob).hexdigest() != sha256:
+        raise ValueError("Probability table does not match its checksum")
+    return ProbabilityTable.from_bytes(blob)
@@ -0,0 +1,59 @@
+"""Immutable API payloads serialized once and served as bytes."""
+
+from dataclasses import dataclass
+import hashlib
+import json
+from types import MappingProxyType
+from typing import Any, Mapping
+
+
+class FrozenList(tuple):
+    """Tuple that still compares equal to the list it was frozen from."""
+
+    def __eq__(self, other):
+        if isinstance(other, list):
+            other = tuple(other)
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = tuple.__hash__
+
+
+def freeze(value):
+    """Return a read-only view of a JSON-like value: mappings and tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+def _encode_frozen(value):
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value) -> bytes:
+    """Serialize like Flask's ``jsonify`` in production: compact, sorted keys."""
+    return json.dumps(
+        value, separators=(",", ":"), sort_keys=True, default=_encode_frozen
+    ).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class ResponseSnapshot:
+    data: Any
+    body: bytes
+    etag: str
+
+
+def publish(value) -> ResponseSnapshot:
+    body = dumps(value)
+    return ResponseSnapshot(
+        data=freeze(value),
+        body=body,
+        etag=hashlib.sha256(body).hexdigest(),
+    )
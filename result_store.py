@@ -0,0 +1,299 @@
+"""Persistent SQLite store that keeps simulation results across restarts."""
+
+import hashlib
+import json
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+
+STORE_MAX_BYTES = 64 * 1024 * 1024
+COMPACT_EVERY_WRITES = 500
+BUSY_TIMEOUT_MS = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    kind TEXT NOT NULL,
+    data_version TEXT NOT NULL,
+    request_key TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    body BLOB NOT NULL,
+    PRIMARY KEY (kind, data_version, request_key)
+);
+CREATE INDEX IF NOT EXISTS results_by_age ON results (kind, data_version, created_at);
+"""
+
+
+def canonical_request_key(request_data) -> str:
+    """Hash a validated simulation request independent of key order."""
+    text = json.dumps(request_data, separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SimulationResultStore:
+    """SQLite (WAL) result store with concurrent readers and a single writer.
+
+    Reads use one connection per thread and never block on the writer. Writes
+    are queued to one background thread that commits them in batches and
+    periodically compacts the file back under ``max_bytes``. Storage errors are
+    counted rather than raised: the store is only ever a cache.
+    """
+
+    def __init__(self, path, max_bytes=STORE_MAX_BYTES,
+                 compact_every=COMPACT_EVERY_WRITES, clock=time.time):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.compact_every = compact_every
+        self.clock = clock
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._writes = queue.Queue()
+        self._writer = None
+        self._writer_guard = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._written = 0
+        self._compacted = 0
+        self._errors = 0
+        connection = self._connection()
+        # auto_vacuum only takes effect before the first table is created.
+        connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000)
+            connection.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _count(self, field, amount=1):
+        with self._stats_lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def get(self, kind, data_version, request_key):
+        try:
+            row = self._connection().execute(
+                "SELECT body FROM results WHERE kind = ? AND data_version = ? AND request_key = ?",
+                (kind, data_version, request_key),
+            ).fetchone()
+            value = json.loads(zlib.decompress(row[0])) if row is not None else None
+        except (sqlite3.Error, zlib.error, ValueError):
+            self._count("_errors")
+            return None
+        self._count("_hits" if value is not None else "_misses")
+        return value
+
+    def recent(self, kind, data_version, limit):
+        """Return up to ``limit`` ``(request_key, value)`` pairs, newest first."""
+        try:
+            rows = self._connection().execute(
+                "SELECT request_key, body FROM results WHERE kind = ? AND data_version = ? "
+                "ORDER BY created_at DESC LIMIT ?",
+                (kind, data_version, limit),
+            ).fetchall()
+            return [(key, json.loads(zlib.decompress(body))) for key, body in rows]
+        except (sqlite3.Error, zlib.error, ValueError):
+            self._count("_errors")
+            return []
+
+    def latest_version(self, kind, excluding):
+        """Return the most recently written data version other than ``excluding``."""
+        try:
+            row = self._connection().execute(
+                "SELECT data_version FROM results WHERE kind = ? AND data_version != ? "
+                "ORDER BY created_at DESC LIMIT 1",
+                (kind, excluding),
+            ).fetchone()
+        except sqlite3.Error:
+            self._count("_errors")
+            return None
+        return row[0] if row is not None else None
+
+    def put(self, kind, data_version, request_key, value):
+        """Queue a result for the writer thread; never blocks on disk."""
+        body = zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+        self._writes.put((kind, data_version, request_key, self.clock(), len(body), body))
+        with self._writer_guard:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._run_writer, name="result-store-writer", daemon=True
+                )
+                self._writer.start()
+
+    def flush(self):
+        """Block until every queued write has been committed."""
+        self._writes.join()
+
+    def _run_writer(self):
+        since_compaction = 0
+        while True:
+            batch = [self._writes.get()]
+            while True:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self._connection() as connection:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO results "
+                        "(kind, data_version, request_key, created_at, size, body) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        batch,
+                    )
+                self._count("_written", len(batch))
+                since_compaction += len(batch)
+                if since_compaction >= self.compact_every:
+                    since_compaction = 0
+                    self.compact()
+            except sqlite3.Error:
+                self._count("_errors")
+            finally:
+                for _ in batch:
+                    self._writes.task_done()
+
+    def compact(self):
+        """Drop the oldest results until the store fits ``max_bytes``.
+
+        Runs on the writer thread during normal operation; callers outside it
+        only wait on SQLite's busy timeout.
+        """
+        connection = self._connection()
+        try:
+            rows = connection.execute(
+                "SELECT rowid, size FROM results ORDER BY created_at DESC"
+            ).fetchall()
+            kept = 0
+            doomed = []
+            for rowid, size in rows:
+                kept += size
+                if kept > self.max_bytes:
+                    doomed.append((rowid,))
+            if doomed:
+                with connection:
+                    connection.executemany("DELETE FROM results WHERE rowid = ?", doomed)
+                connection.execute("PRAGMA incremental_vacuum")
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error:
+            self._count("_errors")
+            return 0
+        self._count("_compacted", len(doomed))
+        return len(doomed)
+
+    def metrics(self):
+        try:
+            entries, stored_bytes = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+        except sqlite3.Error:
+            entries = stored_bytes = None
+        with self._stats_lock:
+            return {
+                "path": str(self.path),
+                "entries": entries,
+                "stored_bytes": stored_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "written": self._written,
+                "compacted": self._compacted,
+                "errors": self._errors,
+                "queued_writes": self._writes.qsize(),
+            }
+
+
+class TieredResultCache:
+    """In-memory LRU in front of an optional persistent result store.
+
+    Keys are ``(data_version, request_key)``. After a data refresh,
+    ``carry_forward`` re-keys the previous version's records that are still
+    valid instead of letting every one of them be recomputed.
+    """
+
+    def __init__(self, memory, store=None, kind="simulate"):
+        self.memory = memory
+        self.store = store
+        self.kind = kind
+        self._refresh = None
+        self._refresh_lock = threading.Lock()
+
+    def get(self, data_version, request_key):
+        value = self.memory.get((data_version, request_key))
+        if value is None and self.store is not None:
+            value = self.store.get(self.kind, data_version, request_key)
+            if value is not None:
+                self.memory.put((data_version, request_key), value)
+        return value
+
+    def _put(self, data_version, request_key, value):
+        self.memory.put((data_version, request_key), value)
+        if self.store is not None:
+            self.store.put(self.kind, data_version, request_key, value)
+
+    def put(self, data_version, request_key, value):
+        """Store a freshly computed result."""
+        self._put(data_version, request_key, value)
+        with self._refresh_lock:
+            if self._refresh is not None and self._refresh["to_version"] == data_version:
+                self._refresh["recomputed"] += 1
+
+    def warm_load(self, data_version, limit, unchanged=None):
+        """Copy the newest stored results for ``data_version`` into memory.
+
+        With an ``unchanged`` predicate, results from the store's previous
+        data version are carried forward as well.
+        """
+        if self.store is None:
+            return 0
+        entries = self.store.recent(self.kind, data_version, limit)
+        for request_key, value in reversed(entries):
+            self.memory.put((data_version, request_key), value)
+        if unchanged is not None:
+            previous = self.store.latest_version(self.kind, data_version)
+            if previous is not None:
+                self.carry_forward(previous, data_version, unchanged, limit)
+        return len(entries)
+
+    def carry_forward(self, previous_version, data_version, unchanged, limit):
+        """Re-key ``previous_version`` records that ``unchanged`` accepts.
+
+        Candidates come from memory and, when configured, the newest ``limit``
+        stored records. Rejected records are left to age out.
+        """
+        candidates = {
+            key[1]: value for key, value in self.memory.items()
+            if key[0] == previous_version
+        }
+        if self.store is not None:
+            for request_key, value in self.store.recent(self.kind, previous_version, limit):
+                candidates.setdefault(request_key, value)
+        carried = 0
+        for request_key, value in candidates.items():
+            if self.memory.get((data_version, request_key)) is None and unchanged(value):
+                self._put(data_version, request_key, value)
+                carried += 1
+        self.memory.purge(lambda key: key[0] == previous_version, "data_version")
+        report = {
+            "from_version": previous_version,
+            "to_version": data_version,
+            "carried_forward": carried,
+            "invalidated": len(candidates) - carried,
+            "recomputed": 0,
+        }
+        with self._refresh_lock:
+            self._refresh = report
+        return dict(report)
+
+    def metrics(self):
+        with self._refresh_lock:
+            refresh = dict(self._refresh) if self._refresh is not None else None
+        return {**self.memory.metrics(), "last_refresh": refresh}
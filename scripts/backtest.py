@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""Walk-forward backtest of the simulator on completed historical matches.
+
+Matches are replayed in date order. Each player's inputs come from a
+``PointInTimeIndex`` queried at the match date, so only matches played on
+earlier days are visible. Simulations run in a process pool, and each match's
+seed is derived from the base seed and the match key, so results do not depend
+on worker count or scheduling.
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from baselines import EloRatings  # noqa: E402
+from simulation_engine import TennisSimulator  # noqa: E402
+from scripts.refresh_data import (  # noqa: E402
+    DEFAULT_CACHE_DIR,
+    DownloadCache,
+    download_sources,
+    load_registry,
+    match_key,
+    replace_file,
+    select_matches,
+)
+from scripts.stats_index import PointInTimeIndex  # noqa: E402
+
+
+DEFAULT_SIMULATIONS = 1000
+DEFAULT_SEED = 20240101
+DEFAULT_ELO_YEARS = 5
+DEFAULT_OUTPUT = PROJECT_ROOT / "backtest_results.csv.gz"
+TASK_CHUNK_SIZE = 8
+INCOMPLETE_SCORE_TOKENS = {"RET", "W/O", "DEF", "ABN"}
+RESULT_COLUMNS = (
+    "date", "tourney_id", "match_num", "tourney_level", "surface", "format",
+    "player1", "player2", "player1_rank", "player2_rank", "player1_matches",
+    "player2_matches", "player1_fallback", "player2_fallback",
+    "player1_won", "player1_win_probability", "elo_probability",
+    "surface_elo_probability", "ranking_probability", "seed",
+)
+BASELINE_COLUMNS = {
+    "elo": "elo_probability",
+    "surface_elo": "surface_elo_probability",
+    "ranking": "ranking_probability",
+}
+
+
+def completed(row):
+    """Whether a row is a finished match, not a walkover, retirement, or default."""
+    tokens = row.get("score", "").upper().split()
+    return bool(tokens) and not INCOMPLETE_SCORE_TOKENS.intersection(tokens)
+
+
+def match_seed(base_seed, key):
+    """A 63-bit simulation seed fixed by the base seed and the match key."""
+    digest = hashlib.sha256(json.dumps([base_seed, list(key)]).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") >> 1
+
+
+def match_format(row):
+    return "best5" if row.get("best_of", "").strip() == "5" else "best3"
+
+
+def rank(stats):
+    value = stats.get("ranking")
+    return None if value is None else int(value)
+
+
+def baseline_probabilities(matches, end):
+    """Winner's pre-match Elo and ranking baselines per match key, from one replay."""
+    return {
+        match_key(row): baseline
+        for _, row, baseline in EloRatings().advance(matches, end)
+    }
+
+
+def plan_matches(matches, index, start, end, simulations=DEFAULT_SIMULATIONS, seed=DEFAULT_SEED,
+                 baselines=None):
+    """Build ``(results, tasks, skipped)`` for completed matches in ``[start, end]``.
+
+    ``results`` holds one row per evaluated match without its probability and
+    ``tasks`` the matching simulator arguments. Players are ordered by name,
+    not by result, so ``player1`` does not reveal the winner. Matches where
+    either player has too little earlier data are counted in ``skipped``.
+    ``baselines`` adds the ``baseline_probabilities`` columns for ``player1``.
+    """
+    results = []
+    tasks = []
+    skipped = 0
+    ordered = sorted(
+        ((match_date, position, row) for position, (match_date, row) in enumerate(matches)
+         if start <= match_date <= end and completed(row)),
+        key=lambda item: item[:2],
+    )
+    for match_date, _, row in ordered:
+        surface = row["surface"].strip().lower()
+        player1, player2 = sorted((row["winner_name"], row["loser_name"]))
+        try:
+            stats1, fallback1 = index.get_player_stats(player1, surface, match_date)
+            stats2, fallback2 = index.get_player_stats(player2, surface, match_date)
+        except ValueError:
+            skipped += 1
+            continue
+        key = match_key(row)
+        task_seed = match_seed(seed, key)
+        format_type = match_format(row)
+        baseline = (baselines or {}).get(key, {})
+        won = row["winner_name"] == player1
+        results.append({
+            "date": match_date.isoformat(),
+            "tourney_id": row["tourney_id"],
+            "match_num": row["match_num"],
+            "tourney_level": row.get("tourney_level", ""),
+            "surface": surface,
+            "format": format_type,
+            "player1": player1,
+            "player2": player2,
+            "player1_rank": rank(stats1),
+            "player2_rank": rank(stats2),
+            "player1_matches": int(stats1["matches_played"]),
+            "player2_matches": int(stats2["matches_played"]),
+            "player1_fallback": int(fallback1),
+            "player2_fallback": int(fallback2),
+            "player1_won": int(won),
+            **{
+                column: None if baseline.get(name) is None
+                else round(baseline[name] if won else 1.0 - baseline[name], 6)
+                for name, column in BASELINE_COLUMNS.items()
+            },
+            "seed": task_seed,
+        })
+        tasks.append((stats1, stats2, format_type, simulations, task_seed))
+    return results, tasks, skipped
+
+
+def evaluate_task(task):
+    stats1, stats2, format_type, simulations, seed = task
+    result = TennisSimulator().run_monte_carlo_simulation(
+        stats1, stats2, format_type, simulations, seed=seed
+    )
+    return result["player1_win_pct"]
+
+
+def evaluate_tasks(tasks, workers=None):
+    """Player-1 win probabilities for ``tasks``, in order."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        return [evaluate_task(task) for task in tasks]
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        return list(pool.map(evaluate_task, tasks, chunksize=TASK_CHUNK_SIZE))
+
+
+def run_backtest(matches, start, end, simulations=DEFAULT_SIMULATIONS, seed=DEFAULT_SEED,
+                 workers=None, window_days=365, min_matches=5, index=None):
+    """Evaluate every completed match in ``[start, end]``; return ``(results, skipped)``.
+
+    Elo baselines start from scratch at the first match in ``matches``.
+    """
+    if index is None:
+        index = PointInTimeIndex.from_matches(matches, window_days, min_matches)
+    results, tasks, skipped = plan_matches(
+        matches, index, start, end, simulations, seed, baseline_probabilities(matches, end)
+    )
+    for result, probability in zip(results, evaluate_tasks(tasks, workers)):
+        result["player1_win_probability"] = round(probability, 6)
+    return results, skipped
+
+
+def write_results(results, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle = io.StringIO()
+    writer = csv.DictWriter(handle, RESULT_COLUMNS, lineterminator="\n")
+    writer.writeheader()
+    for result in results:
+        writer.writerow({
+            column: "" if result[column] is None else result[column]
+            for column in RESULT_COLUMNS
+        })
+    # A fixed mtime keeps identical runs byte-identical.
+    replace_file(path, gzip.compress(handle.getvalue().encode("utf-8"), mtime=0))
+
+
+def read_results(path):
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as handle:
+        return list(csv.DictReader(handle))
+
+
+def load_history(cache_dir, first_day, last_day, offline=False):
+    """Matches from ``first_day`` through the seasons covering ``last_day``."""
+    cache = DownloadCache(cache_dir)
+    registry = load_registry(cache, offline)
+    by_name = {item["name"]: item for item in registry["files"]}
+    years = range(first_day.year, last_day.year + 1)
+    wanted = [
+        *(f"{year}.csv" for year in years),
+        *(f"{year}_challenger.csv" for year in years),
+        "ongoing_tourneys.csv", "challenger_ongoing_tourneys.csv",
+    ]
+    missing = [name for name in wanted if name not in by_name]
+    if missing:
+        raise RuntimeError(f"Source registry missing files: {missing}")
+    sources = download_sources({name: by_name[name] for name in wanted}, first_day, cache, offline)
+    cache.save()
+    return select_matches(sources)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--start", type=date.fromisoformat, required=True)
+    parser.add_argument("--end", type=date.fromisoformat, required=True)
+    parser.add_argument("--simulations", type=int, default=DEFAULT_SIMULATIONS)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--min-matches", type=int, default=5)
+    parser.add_argument(
+        "--elo-years", type=int, default=DEFAULT_ELO_YEARS,
+        help="years of earlier matches that warm up the Elo baselines",
+    )
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR)
+    parser.add_argument(
+        "--offline", action="store_true",
+        help="read match history only from the refresh job's download cache",
+    )
+    args = parser.parse_args()
+    if args.end < args.start:
+        parser.error("--end must not be before --start")
+    if args.simulations < 1 or args.workers < 1:
+        parser.error("--simulations and --workers must be >= 1")
+    if args.days < 30 or args.min_matches < 1:
+        parser.error("--days must be >= 30 and --min-matches must be >= 1")
+
+    began = time.perf_counter()
+    first_day = min(
+        args.start - timedelta(days=args.days),
+        date(args.start.year - args.elo_years, args.start.month, 1),
+    )
+    matches = load_history(args.cache_dir, first_day, args.end, args.offline)
+    results, skipped = run_backtest(
+        matches, args.start, args.end, args.simulations, args.seed, args.workers,
+        args.days, args.min_matches,
+    )
+    write_results(results, args.output)
+    print(
+        f"Backtested {len(results)} matches ({skipped} skipped for missing pre-match data) "
+        f"with {args.simulations} simulations each in {time.perf_counter() - began:.0f}s; "
+        f"wrote {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
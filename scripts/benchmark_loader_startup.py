@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Compare TennisDataLoader startup from the CSVs and from the binary snapshot."""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from data_loader import TennisDataLoader  # noqa: E402
+
+
+def time_loader(data_dir, use_snapshot, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        loader = TennisDataLoader(data_dir, use_snapshot=use_snapshot)
+        timings.append(time.perf_counter() - started)
+    return loader.source, timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-dir", default=str(PROJECT_ROOT / "data"))
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'source':>8}  {'median ms':>9}  {'p95 ms':>7}")
+    for use_snapshot in (False, True):
+        source, timings = time_loader(args.data_dir, use_snapshot, args.repeats)
+        if use_snapshot and source != "snapshot":
+            print("snapshot missing or stale; run scripts/refresh_data.py --snapshot-only")
+            return
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(0.95 * len(timings)))]
+        print(f"{source:>8}  {statistics.median(timings) * 1000:>9.1f}  {p95 * 1000:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Update the Elo baseline checkpoints in ``data/elo_ratings.json``.
+
+The file keeps a settled checkpoint, with ratings through ``--as-of`` minus
+``--settle-days`` (late-arriving results are unlikely before then), and the
+latest ratings, which the web app serves. Each run resumes from the settled
+checkpoint, so it reads only the seasons since then. Without a checkpoint, or
+with ``--rebuild``, the ratings are rebuilt from ``--history-years`` of matches.
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from baselines import (  # noqa: E402
+    BASELINES_FILE,
+    EloRatings,
+    dump_checkpoints,
+    latest_checkpoint,
+    load_checkpoints,
+)
+from data_loader import read_metadata  # noqa: E402
+from scripts.backtest import load_history  # noqa: E402
+from scripts.refresh_data import (  # noqa: E402
+    DEFAULT_CACHE_DIR,
+    replace_file,
+    write_metadata,
+)
+
+
+DEFAULT_HISTORY_YEARS = 10
+DEFAULT_SETTLE_DAYS = 28
+BASELINE_COLUMNS = (
+    "date", "tourney_id", "match_num", "surface", "winner_name", "loser_name",
+    "elo", "surface_elo", "ranking",
+)
+
+
+def update_checkpoints(checkpoints, matches, as_of, settle_days=DEFAULT_SETTLE_DAYS):
+    """Return ``(settled, latest, emitted)`` after replaying ``matches`` once.
+
+    ``emitted`` holds every replayed match with its winner's pre-match
+    baseline probabilities.
+    """
+    settled_through = as_of - timedelta(days=settle_days)
+    base = latest_checkpoint(checkpoints, settled_through)
+    ratings = base.copy() if base is not None else EloRatings()
+    emitted = ratings.advance(matches, settled_through)
+    settled = ratings.copy()
+    emitted += ratings.advance(matches, as_of)
+    return settled, ratings, emitted
+
+
+def baselines_csv(emitted) -> bytes:
+    handle = io.StringIO()
+    writer = csv.writer(handle, lineterminator="\n")
+    writer.writerow(BASELINE_COLUMNS)
+    for match_date, row, baseline in emitted:
+        writer.writerow([
+            match_date.isoformat(), row["tourney_id"], row["match_num"],
+            row["surface"].strip().lower(), row["winner_name"], row["loser_name"],
+            *("" if baseline[key] is None else round(baseline[key], 6)
+              for key in ("elo", "surface_elo", "ranking")),
+        ])
+    return gzip.compress(handle.getvalue().encode("utf-8"), mtime=0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--output-dir", type=Path, default=PROJECT_ROOT / "data")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--offline", action="store_true")
+    parser.add_argument("--settle-days", type=int, default=DEFAULT_SETTLE_DAYS)
+    parser.add_argument("--history-years", type=int, default=DEFAULT_HISTORY_YEARS)
+    parser.add_argument(
+        "--rebuild", action="store_true",
+        help="ignore stored checkpoints and replay --history-years of matches",
+    )
+    parser.add_argument(
+        "--matches-output", type=Path,
+        help="also write each replayed match's pre-match baseline probabilities (gzip CSV)",
+    )
+    args = parser.parse_args()
+    if args.settle_days < 0 or args.history_years < 1:
+        parser.error("--settle-days must be >= 0 and --history-years must be >= 1")
+
+    path = args.output_dir / BASELINES_FILE
+    checkpoints = [] if args.rebuild else load_checkpoints(path)
+    base = latest_checkpoint(checkpoints, args.as_of - timedelta(days=args.settle_days))
+    if base is not None:
+        first_day = base.through + timedelta(days=1)
+    else:
+        first_day = date(args.as_of.year - args.history_years, 1, 1)
+
+    began = time.perf_counter()
+    matches = load_history(args.cache_dir, first_day, args.as_of, args.offline)
+    loaded = time.perf_counter()
+    settled, latest, emitted = update_checkpoints(checkpoints, matches, args.as_of, args.settle_days)
+    replayed = time.perf_counter()
+
+    blob = dump_checkpoints([settled, latest])
+    replace_file(path, blob)
+    if args.matches_output:
+        args.matches_output.parent.mkdir(parents=True, exist_ok=True)
+        replace_file(args.matches_output, baselines_csv(emitted))
+    # Rewriting metadata.json last makes a running server reload the ratings.
+    metadata = read_metadata(args.output_dir / "metadata.json")
+    metadata["baselines"] = {
+        "file": BASELINES_FILE,
+        "sha256": hashlib.sha256(blob).hexdigest(),
+        "through": latest.through.isoformat(),
+        "settled_through": settled.through.isoformat(),
+        "players": len(latest),
+    }
+    write_metadata(metadata, args.output_dir)
+    print(
+        f"Replayed {len(emitted)} matches from {first_day} "
+        f"({'checkpoint' if base is not None else 'full rebuild'}) in "
+        f"{replayed - loaded:.1f}s after {loaded - began:.1f}s loading; "
+        f"{len(latest)} players rated through {latest.through}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""Score probability forecasts: log loss, Brier score, accuracy, and calibration.
+
+Scores are per-observation columns, so every metric is a mean and every
+breakdown is a partition of row positions. Bootstrap intervals use the Poisson
+bootstrap: each resample gives every row an independent Poisson(1) weight, so
+a whole batch of resamples is one ``randbytes`` call mapped through a byte
+table, and each resampled mean is a C-level dot product shared by every metric.
+"""
+
+import argparse
+from array import array
+from datetime import datetime, timezone
+import hashlib
+import html
+import json
+import math
+from operator import mul
+from pathlib import Path
+import random
+import statistics
+import sys
+from typing import Dict, List, Optional, Sequence
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.backtest import DEFAULT_OUTPUT as DEFAULT_RESULTS, read_results  # noqa: E402
+from scripts.refresh_data import replace_file  # noqa: E402
+
+
+METRICS = ("log_loss", "brier", "accuracy")
+PROBABILITY_FLOOR = 1e-15
+DEFAULT_BINS = 10
+DEFAULT_RESAMPLES = 1000
+DEFAULT_SEED = 20240101
+# Bytes of bootstrap weights drawn at once.
+BOOTSTRAP_BLOCK = 1 << 20
+FAVOURITE_BUCKETS = ((0.6, "50-60%"), (0.7, "60-70%"), (0.8, "70-80%"), (0.9, "80-90%"))
+SAMPLE_BUCKETS = ((10, "5-9"), (20, "10-19"), (50, "20-49"))
+TOUR_LEVELS = {"C": "challenger", "": "unknown"}
+DEFAULT_COLUMN = "player1_win_probability"
+DEFAULT_JSON = PROJECT_ROOT / "backtest_report.json"
+DEFAULT_HTML = PROJECT_ROOT / "backtest_report.html"
+
+
+def observation_scores(probabilities: Sequence[float], outcomes: Sequence[int]) -> Dict[str, array]:
+    """Per-row log loss, squared error, and correctness (0.5 for a 50% call)."""
+    probabilities = array("d", probabilities)
+    outcomes = array("b", outcomes)
+    if len(probabilities) != len(outcomes):
+        raise ValueError("probabilities and outcomes must have the same length")
+    if any(outcome not in (0, 1) for outcome in set(outcomes)):
+        raise ValueError("outcomes must be 0 or 1")
+    if probabilities and not 0.0 <= min(probabilities) <= max(probabilities) <= 1.0:
+        raise ValueError("probabilities must be between 0 and 1")
+    # Probability assigned to what actually happened, floored for the log.
+    realized = [
+        max(probability if outcome else 1.0 - probability, PROBABILITY_FLOOR)
+        for probability, outcome in zip(probabilities, outcomes)
+    ]
+    return {
+        "log_loss": array("d", [-value for value in map(math.log, realized)]),
+        "brier": array("d", [(1.0 - value) ** 2 for value in realized]),
+        "accuracy": array("d", [
+            0.5 if probability == 0.5 else float((probability > 0.5) == outcome)
+            for probability, outcome in zip(probabilities, outcomes)
+        ]),
+    }
+
+
+def _poisson_weight_table() -> bytes:
+    """Map each byte value to a Poisson(1) draw by inverting the CDF at its midpoint.
+
+    The 256-step quantization changes the weights' spread by under 0.2%.
+    """
+    table = bytearray()
+    weight, probability = 0, math.exp(-1.0)
+    cumulative = probability
+    for value in range(256):
+        while (value + 0.5) / 256 > cumulative:
+            weight += 1
+            probability /= weight
+            cumulative += probability
+        table.append(weight)
+    return bytes(table)
+
+
+POISSON_WEIGHTS = _poisson_weight_table()
+
+
+def bootstrap_means(columns: Sequence[Sequence[float]], resamples: int = DEFAULT_RESAMPLES,
+                    seed=DEFAULT_SEED) -> List[List[float]]:
+    """Poisson-bootstrap means of each column, with weights shared across columns.
+
+    A resample in which every weight is zero has no mean and is dropped.
+    Without an array library there is still one Python iteration per
+    resample, but each only runs C-level ``sum(map(mul, ...))`` dot
+    products over the batch's weight bytes. Accumulating each observation
+    across the batch through strided slices instead gives identical means
+    but was twice as slow on 7,000 forecasts.
+    """
+    columns = [list(column) for column in columns]
+    size = len(columns[0])
+    rng = random.Random(seed)
+    per_batch = max(1, BOOTSTRAP_BLOCK // size)
+    means = [[] for _ in columns]
+    remaining = resamples
+    while remaining:
+        batch = min(per_batch, remaining)
+        weights = rng.randbytes(batch * size).translate(POISSON_WEIGHTS)
+        for start in range(0, batch * size, size):
+            sample = weights[start:start + size]
+            total = sum(sample)
+            if total:
+                for column, column_means in zip(columns, means):
+                    column_means.append(sum(map(mul, sample, column)) / total)
+        remaining -= batch
+    return means
+
+
+def percentile_interval(values: Sequence[float]) -> List[float]:
+    """Central 95% interval of ``values``."""
+    cuts = statistics.quantiles(values, n=40, method="inclusive")
+    return [cuts[0], cuts[-1]]
+
+
+def calibration_table(probabilities: Sequence[float], outcomes: Sequence[int],
+                      bins: int = DEFAULT_BINS) -> List[Dict]:
+    """Equal-width probability bins with mean forecast and observed rate."""
+    counts = [0] * bins
+    predicted = [0.0] * bins
+    observed = [0] * bins
+    for probability, outcome in zip(probabilities, outcomes):
+        bucket = min(int(probability * bins), bins - 1)
+        counts[bucket] += 1
+        predicted[bucket] += probability
+        observed[bucket] += outcome
+    return [
+        {
+            "bin_low": round(bucket / bins, 6),
+            "bin_high": round((bucket + 1) / bins, 6),
+            "count": counts[bucket],
+            "mean_predicted": predicted[bucket] / counts[bucket],
+            "observed_rate": observed[bucket] / counts[bucket],
+        }
+        for bucket in range(bins) if counts[bucket]
+    ]
+
+
+def score_forecasts(probabilities: Sequence[float], outcomes: Sequence[int],
+                    bins: int = DEFAULT_BINS, resamples: int = DEFAULT_RESAMPLES,
+                    seed=DEFAULT_SEED) -> Dict:
+    """Every metric with its bootstrap interval, plus the calibration table."""
+    scores = observation_scores(probabilities, outcomes)
+    size = len(scores["log_loss"])
+    report = {"count": size}
+    if not size:
+        return report
+    columns = [scores[metric] for metric in METRICS]
+    intervals = [None] * len(METRICS)
+    if size > 1 and resamples > 1:
+        resampled = bootstrap_means(columns, resamples, seed)
+        if len(resampled[0]) > 1:
+            intervals = [percentile_interval(means) for means in resampled]
+    for metric, column, interval in zip(METRICS, columns, intervals):
+        report[metric] = math.fsum(column) / size
+        report[f"{metric}_ci95"] = interval
+    report["mean_predicted"] = math.fsum(probabilities) / size
+    report["observed_rate"] = sum(outcomes) / size
+    report["calibration"] = calibration_table(probabilities, outcomes, bins)
+    return report
+
+
+def forecast_report(probabilities: Sequence[float], outcomes: Sequence[int],
+                    groupings: Optional[Dict[str, Sequence]] = None, bins: int = DEFAULT_BINS,
+                    resamples: int = DEFAULT_RESAMPLES, seed=DEFAULT_SEED) -> Dict:
+    """Score all rows, then each group of every ``groupings`` key column.
+
+    Groups are resampled on their own, with a seed derived from the base seed
+    and the group, so adding a breakdown never changes another's intervals.
+    """
+    probabilities = array("d", probabilities)
+    outcomes = array("b", outcomes)
+    report = {
+        "bootstrap": {"resamples": resamples, "seed": seed, "confidence": 0.95},
+        "overall": score_forecasts(probabilities, outcomes, bins, resamples, seed),
+        "breakdowns": {},
+    }
+    for name, keys in (groupings or {}).items():
+        if len(keys) != len(probabilities):
+            raise ValueError(f"grouping {name!r} must have one key per forecast")
+        positions = {}
+        for position, key in enumerate(keys):
+            positions.setdefault(key, []).append(position)
+        report["breakdowns"][name] = {
+            str(key): score_forecasts(
+                array("d", map(probabilities.__getitem__, rows)),
+                array("b", map(outcomes.__getitem__, rows)),
+                bins, resamples, f"{seed}:{name}:{key}",
+            )
+            for key, rows in sorted(positions.items(), key=lambda item: str(item[0]))
+        }
+    return report
+
+
+def bucket_label(value, buckets, last):
+    for upper, label in buckets:
+        if value < upper:
+            return label
+    return last
+
+
+def backtest_groupings(rows: Sequence[Dict], probabilities: Sequence[float]) -> Dict[str, List]:
+    """Surface, tour level, favourite strength, and sample-size keys per backtest row."""
+    return {
+        "surface": [row["surface"] for row in rows],
+        "tour_level": [
+            TOUR_LEVELS.get(row.get("tourney_level", ""), "tour") for row in rows
+        ],
+        "favourite_strength": [
+            bucket_label(max(probability, 1.0 - probability), FAVOURITE_BUCKETS, "90-100%")
+            for probability in probabilities
+        ],
+        "sample_size": [
+            bucket_label(
+                min(int(row["player1_matches"]), int(row["player2_matches"])),
+                SAMPLE_BUCKETS, "50+",
+            )
+            for row in rows
+        ],
+    }
+
+
+def report_backtest(path, bins: int = DEFAULT_BINS, resamples: int = DEFAULT_RESAMPLES,
+                    seed=DEFAULT_SEED, column: str = DEFAULT_COLUMN) -> Dict:
+    """Score one probability column of a backtest; rows where it is blank are left out."""
+    rows = [row for row in read_results(path) if row.get(column)]
+    probabilities = array("d", (float(row[column]) for row in rows))
+    outcomes = array("b", (int(row["player1_won"]) for row in rows))
+    report = forecast_report(
+        probabilities, outcomes, backtest_groupings(rows, probabilities), bins, resamples, seed
+    )
+    report["source"] = {
+        "path": str(path),
+        "column": column,
+        "sha256": hashlib.sha256(Path(path).read_bytes()).hexdigest(),
+        "first_date": min((row["date"] for row in rows), default=None),
+        "last_date": max((row["date"] for row in rows), default=None),
+    }
+    return report
+
+
+def _number(value, digits=4):
+    return "" if value is None else f"{value:.{digits}f}"
+
+
+def _metric_cell(scores, metric):
+    interval = scores.get(f"{metric}_ci95")
+    text = _number(scores.get(metric))
+    if interval:
+        text += f' <span class="ci">[{_number(interval[0])}, {_number(interval[1])}]</span>'
+    return f"<td>{text}</td>"
+
+
+def _scores_table(groups: Dict[str, Dict], label: str) -> str:
+    header = "".join(f"<th>{name}</th>" for name in (label, "Matches", "Log loss", "Brier", "Accuracy"))
+    body = "".join(
+        f"<tr><td>{html.escape(key)}</td><td>{scores['count']}</td>"
+        + "".join(_metric_cell(scores, metric) for metric in METRICS) + "</tr>"
+        for key, scores in groups.items()
+    )
+    return f"<table><thead><tr>{header}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def _calibration_svg(calibration: List[Dict], size: int = 320) -> str:
+    pad = 30
+    span = size - 2 * pad
+
+    def coordinates(row):
+        return pad + row["mean_predicted"] * span, size - pad - row["observed_rate"] * span
+
+    largest = max((row["count"] for row in calibration), default=1)
+    dots = "".join(
+        '<circle cx="{:.1f}" cy="{:.1f}" r="{:.1f}"><title>{} matches: predicted {:.3f}, '
+        "observed {:.3f}</title></circle>".format(
+            *coordinates(row), 2 + 6 * math.sqrt(row["count"] / largest),
+            row["count"], row["mean_predicted"], row["observed_rate"],
+        )
+        for row in calibration
+    )
+    line = " ".join("{:.1f},{:.1f}".format(*coordinates(row)) for row in calibration)
+    return (
+        f'<svg viewBox="0 0 {size} {size}" width="{size}" height="{size}" role="img" '
+        f'aria-label="Calibration curve">'
+        f'<rect x="{pad}" y="{pad}" width="{span}" height="{span}" class="frame"/>'
+        f'<line x1="{pad}" y1="{size - pad}" x2="{size - pad}" y2="{pad}" class="diagonal"/>'
+        f'<polyline points="{line}" class="curve"/>{dots}'
+        f'<text x="{size / 2}" y="{size - 6}" text-anchor="middle">Predicted</text>'
+        f'<text x="10" y="{size / 2}" transform="rotate(-90 10 {size / 2})" '
+        f'text-anchor="middle">Observed</text></svg>'
+    )
+
+
+def render_html(report: Dict, title: str = "Forecast scoring report") -> str:
+    """A self-contained page with the overall scores, calibration, and breakdowns."""
+    overall = report["overall"]
+    source = report.get("source", {})
+    sections = [
+        f"<h1>{html.escape(title)}</h1>",
+        "<p>{count} forecasts{dates}. Intervals are 95% bootstrap intervals from "
+        "{resamples} resamples.</p>".format(
+            count=overall["count"],
+            dates=(
+                f", {html.escape(source['first_date'])} to {html.escape(source['last_date'])}"
+                if source.get("first_date") else ""
+            ),
+            resamples=report["bootstrap"]["resamples"],
+        ),
+        _scores_table({"All": overall}, "Forecasts"),
+    ]
+    if overall.get("calibration"):
+        rows = "".join(
+            f"<tr><td>{row['bin_low']:.2f}-{row['bin_high']:.2f}</td><td>{row['count']}</td>"
+            f"<td>{_number(row['mean_predicted'], 3)}</td><td>{_number(row['observed_rate'], 3)}</td></tr>"
+            for row in overall["calibration"]
+        )
+        sections += [
+            "<h2>Calibration</h2>",
+            f'<div class="calibration">{_calibration_svg(overall["calibration"])}'
+            "<table><thead><tr><th>Bin</th><th>Matches</th><th>Predicted</th>"
+            f"<th>Observed</th></tr></thead><tbody>{rows}</tbody></table></div>",
+        ]
+    for name, groups in report["breakdowns"].items():
+        label = name.replace("_", " ").capitalize()
+        sections += [f"<h2>By {label.lower()}</h2>", _scores_table(groups, label)]
+    generated = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    return (
+        "<!DOCTYPE html>\n<html lang=\"en\"><head><meta charset=\"utf-8\">"
+        f"<title>{html.escape(title)}</title><style>"
+        "body{font-family:system-ui,sans-serif;margin:2rem auto;max-width:60rem;color:#222}"
+        "table{border-collapse:collapse;margin:0.5rem 0 1.5rem}"
+        "th,td{border-bottom:1px solid #ddd;padding:0.3rem 0.8rem;text-align:right}"
+        "th:first-child,td:first-child{text-align:left}.ci{color:#777;font-size:0.85em}"
+        ".calibration{display:flex;gap:2rem;align-items:flex-start}"
+        ".frame{fill:none;stroke:#ccc}.diagonal{stroke:#aaa;stroke-dasharray:4}"
+        ".curve{fill:none;stroke:#1f6feb;stroke-width:2}circle{fill:#1f6feb;opacity:0.7}"
+        "</style></head><body>\n"
+        + "\n".join(sections)
+        + f"\n<footer><p>Generated {generated}.</p></footer>\n</body></html>\n"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("results", type=Path, nargs="?", default=DEFAULT_RESULTS)
+    parser.add_argument("--json", type=Path, default=DEFAULT_JSON)
+    parser.add_argument("--html", type=Path, default=DEFAULT_HTML)
+    parser.add_argument("--bins", type=int, default=DEFAULT_BINS)
+    parser.add_argument("--resamples", type=int, default=DEFAULT_RESAMPLES)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument(
+        "--column", default=DEFAULT_COLUMN,
+        help="probability column to score, e.g. elo_probability for a baseline",
+    )
+    args = parser.parse_args()
+    if args.bins < 1 or args.resamples < 0:
+        parser.error("--bins must be >= 1 and --resamples must be >= 0")
+
+    report = report_backtest(args.results, args.bins, args.resamples, args.seed, args.column)
+    replace_file(args.json, (json.dumps(report, indent=2) + "\n").encode("utf-8"))
+    replace_file(args.html, render_html(report, f"Forecast scoring report: {args.column}").encode("utf-8"))
+    overall = report["overall"]
+    print(
+        f"Scored {overall['count']} forecasts: log loss {_number(overall.get('log_loss'))}, "
+        f"Brier {_number(overall.get('brier'))}, accuracy {_number(overall.get('accuracy'))}; "
+        f"wrote {args.json} and {args.html}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Measure cold dashboard fill time for different simulation pool sizes.
+
+Each simulated browser mirrors ``loadDashboardSimulations`` in
+``static/script.js``: two concurrent workers draining the dashboard's match
+list one simulation request at a time.
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from data_loader import TennisDataLoader  # noqa: E402
+from market_odds import build_market_comparison  # noqa: E402
+from simulation_service import SimulationPool  # noqa: E402
+from upcoming_service import UpcomingMatchService  # noqa: E402
+
+
+WORKERS_PER_BROWSER = 2
+
+
+def synthetic_schedule(loader, count):
+    names = [player["name"] for player in loader.get_all_players()]
+    matches = []
+    for index in range(count):
+        player1, player2 = names[2 * index], names[2 * index + 1]
+        matches.append({
+            "id": f"load-{index:03d}",
+            "player1": player1,
+            "player2": player2,
+            "player1_in_model": True,
+            "player2_in_model": True,
+            "start_time": f"2026-08-{11 + index % 7:02d}T18:00:00Z",
+            "tournament": "US Open" if index % 4 == 0 else "Cincinnati Open",
+            "round": None,
+            "market_comparison": build_market_comparison(player1, player2, []),
+        })
+
+    def discoverer(_known_names, days):
+        return {
+            "matches": [dict(match) for match in matches],
+            "errors": [],
+            "generated_at": "2026-08-11T00:00:00Z",
+            "window_end": "2026-08-18T00:00:00Z",
+        }
+    return discoverer
+
+
+def fill_dashboard(service, browsers):
+    match_ids = [match["id"] for match in service.get_upcoming()["matches"]]
+    pending = iter(match_ids)
+
+    def client():
+        for match_id in pending:
+            service.get_simulation(match_id)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=browsers * WORKERS_PER_BROWSER) as clients:
+        for future in [clients.submit(client) for _ in range(browsers * WORKERS_PER_BROWSER)]:
+            future.result()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--matches", type=int, default=40)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--browsers", type=int, default=1)
+    args = parser.parse_args()
+
+    loader = TennisDataLoader()
+    discoverer = synthetic_schedule(loader, args.matches)
+    names = [player["name"] for player in loader.get_all_players()[:2]]
+    warm_up = {
+        "player1": names[0], "player2": names[1],
+        "format": "best3", "num_simulations": 1, "surfaces": ["hard"],
+    }
+    print(f"{'workers':>7}  {'fill seconds':>12}  {'matches/s':>9}")
+    for workers in args.workers:
+        pool = SimulationPool(loader, workers)
+        try:
+            # Start every worker before timing so spawn cost is not measured.
+            for future in [pool.submit(warm_up) for _ in range(workers)]:
+                future.result()
+            service = UpcomingMatchService(
+                loader, discoverer=discoverer, simulation_pool=pool
+            )
+            elapsed = fill_dashboard(service, args.browsers)
+        finally:
+            pool.shutdown()
+        print(f"{workers:>7}  {elapsed:>12.2f}  {args.matches / elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,26 @@
 """Build simulator inputs from TennisMyLife's MIT-licensed match CSVs."""
 
 import argparse
+from array import array
 import csv
+import gzip
 import hashlib
 import io
 import json
+import os
 import re
 import statistics
 import sys
 import tempfile
-from collections import defaultdict
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import accumulate
 from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
+from typing import Optional
+from urllib.error import HTTPError
 from urllib.request import Request, urlopen
 
 
@@ -35,6 +44,24 @@ STAT_FIELDS = (
 )
 SURFACES = ("hard", "clay", "grass")
 USER_AGENT = "tennis-simulator-refresh/1.0"
+# Everything ``add_player`` sums, in the order contribution records store it.
+COUNTER_FIELDS = (
+    *STAT_FIELDS, *(f"opp_{field}" for field in STAT_FIELDS),
+    "matches", "wins", "games_won", "games_lost", "sets_won", "sets_lost",
+    "tiebreaks", "tiebreaks_won",
+)
+CONTRIBUTION_STORE_VERSION = 2
+REQUIRED_COLUMNS = ("tourney_id", "tourney_date", "match_num", "winner_name", "loser_name", "surface")
+# Only these columns of an in-window row are kept in memory.
+KEPT_COLUMNS = (
+    *REQUIRED_COLUMNS, "tourney_level", "score", "best_of",
+    "winner_rank", "loser_rank", "winner_ioc", "loser_ioc",
+    *(f"{prefix}_{field}" for prefix in ("w", "l") for field in STAT_FIELDS),
+)
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+DOWNLOAD_WORKERS = 6
+DEFAULT_STATE_FILE = PROJECT_ROOT / ".refresh-state" / "contributions.json.gz"
+DEFAULT_CACHE_DIR = PROJECT_ROOT / ".refresh-state" / "downloads"
 
 
 def fetch(url):
@@ -51,6 +78,11 @@ def ratio(numerator, denominator):
     return "" if not denominator else f"{numerator / denominator:.3f}"
 
 
+def count(value):
+    """Format a summed counter; recency-weighted sums are rounded."""
+    return int(round(value))
+
+
 def number(value, digits=2):
     return "" if value is None else f"{value:.{digits}f}".rstrip("0").rstrip(".")
 
@@ -92,26 +124,30 @@ def empty_stats():
     return values
 
 
+def plausible_counters(candidate):
+    """Reject missing or impossible serve counters for one side of a match."""
+    if any(value is None for value in candidate.values()):
+        return False
+    second_attempts = candidate["svpt"] - candidate["1stIn"]
+    return not (
+        min(candidate.values()) < 0
+        or candidate["svpt"] <= 0
+        or candidate["SvGms"] <= 0
+        or candidate["1stIn"] > candidate["svpt"]
+        or candidate["1stWon"] > candidate["1stIn"]
+        or candidate["2ndWon"] > second_attempts
+        or candidate["df"] > second_attempts
+        or candidate["bpSaved"] > candidate["bpFaced"]
+    )
+
+
 def add_player(stats, row, prefix, opponent_prefix, won):
     values = {field: parse_int(row, f"{prefix}_{field}") for field in STAT_FIELDS}
     opponent = {
         field: parse_int(row, f"{opponent_prefix}_{field}") for field in STAT_FIELDS
     }
-    if any(value is None for value in (*values.values(), *opponent.values())):
+    if not (plausible_counters(values) and plausible_counters(opponent)):
         return False
-    for candidate in (values, opponent):
-        second_attempts = candidate["svpt"] - candidate["1stIn"]
-        if (
-            min(candidate.values()) < 0
-            or candidate["svpt"] <= 0
-            or candidate["SvGms"] <= 0
-            or candidate["1stIn"] > candidate["svpt"]
-            or candidate["1stWon"] > candidate["1stIn"]
-            or candidate["2ndWon"] > second_attempts
-            or candidate["df"] > second_attempts
-            or candidate["bpSaved"] > candidate["bpFaced"]
-        ):
-            return False
 
     for field, value in values.items():
         stats[field] += value
@@ -126,66 +162,782 @@ def add_player(stats, row, prefix, opponent_prefix, won):
     return True
 
 
-def read_matches(blobs, cutoff):
+@dataclass
+class SourceFile:
+    """One ingested source CSV: its raw-byte hash and in-window matches.
+
+    ``matches`` is ``None`` when the file was not parsed because the
+    contribution store already holds its records.
+    """
+
+    name: str
+    sha256: str
+    size: int
+    matches: Optional[list]
+    retrieved: str = "downloaded"
+
+
+class HashingReader(io.RawIOBase):
+    """Pass bytes through from ``stream`` while hashing and counting them.
+
+    Every chunk is also written to ``sink`` when one is given.
+    """
+
+    def __init__(self, stream, sink=None):
+        self._stream = stream
+        self._sink = sink
+        self._digest = hashlib.sha256()
+        self.size = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._stream.read(len(buffer))
+        count = len(data)
+        buffer[:count] = data
+        self._digest.update(data)
+        if self._sink is not None:
+            self._sink.write(data)
+        self.size += count
+        return count
+
+    def hexdigest(self):
+        return self._digest.hexdigest()
+
+
+def iter_source_rows(name, text):
+    """Yield ``(match_date, row)`` for dated rows on a supported surface."""
+    reader = csv.DictReader(text)
+    missing = set(REQUIRED_COLUMNS).difference(reader.fieldnames or [])
+    if missing:
+        raise ValueError(f"{name} missing required columns: {sorted(missing)}")
+    for row in reader:
+        try:
+            match_date = parse_match_date(row["tourney_date"])
+        except (TypeError, ValueError):
+            continue
+        if row["surface"].strip().lower() in SURFACES:
+            yield match_date, row
+
+
+def ingest_source(name, stream, cutoff, sink=None):
+    """Parse a binary CSV stream as it arrives and hash it in the same pass.
+
+    Rows before ``cutoff`` are dropped as they are read, and kept rows are
+    trimmed to ``KEPT_COLUMNS``, so memory grows with the window rather than
+    the file.
+    """
+    hashing = HashingReader(stream, sink)
+    text = io.TextIOWrapper(
+        io.BufferedReader(hashing, DOWNLOAD_CHUNK_BYTES), encoding="utf-8-sig", newline=""
+    )
+    matches = [
+        (match_date, {column: row.get(column, "") for column in KEPT_COLUMNS})
+        for match_date, row in iter_source_rows(name, text)
+        if match_date >= cutoff
+    ]
+    return SourceFile(name, hashing.hexdigest(), hashing.size, matches)
+
+
+class DownloadCache:
+    """Content-addressed copies of source downloads, indexed by URL.
+
+    Objects live under ``objects/<sha256>``; ``index.json`` maps each URL to
+    the object's hash, the registry's modified time, and the ETag and
+    Last-Modified validators for conditional requests.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.index_path = self.directory / "index.json"
+        self._lock = threading.Lock()
+        try:
+            self.index = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.index = {}
+
+    def object_path(self, sha256):
+        return self.directory / "objects" / sha256[:2] / sha256
+
+    def entry(self, url):
+        """Return the index entry for ``url`` if its object is still on disk."""
+        entry = self.index.get(url)
+        if entry is not None and self.object_path(entry["sha256"]).exists():
+            return entry
+        return None
+
+    def record(self, url, **entry):
+        with self._lock:
+            self.index[url] = entry
+
+    def staging_file(self):
+        objects = self.directory / "objects"
+        objects.mkdir(parents=True, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=objects, prefix="download-", delete=False)
+
+    def commit(self, staged_path, sha256):
+        destination = self.object_path(sha256)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staged_path, destination)
+
+    def put_bytes(self, url, data, **entry):
+        sha256 = hashlib.sha256(data).hexdigest()
+        with self.staging_file() as staged:
+            staged.write(data)
+        self.commit(staged.name, sha256)
+        self.record(url, sha256=sha256, size=len(data), **entry)
+        return sha256
+
+    def read_bytes(self, url):
+        entry = self.entry(url)
+        return None if entry is None else self.object_path(entry["sha256"]).read_bytes()
+
+    def save(self):
+        """Write the index and delete objects no URL refers to any more."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            index = dict(self.index)
+        replace_file(
+            self.index_path,
+            (json.dumps(index, indent=2, sort_keys=True) + "\n").encode("utf-8"),
+        )
+        referenced = {self.object_path(entry["sha256"]) for entry in index.values()}
+        for path in (self.directory / "objects").glob("*/*"):
+            if path not in referenced:
+                path.unlink()
+
+
+def ingest_cached(cache, name, entry, cutoff, retrieved, reusable=None):
+    """Ingest a cached object, or skip parsing when ``reusable`` allows it."""
+    if reusable is not None and reusable(name, entry["sha256"]):
+        return SourceFile(name, entry["sha256"], entry["size"], None, retrieved)
+    with open(cache.object_path(entry["sha256"]), "rb") as handle:
+        source = ingest_source(name, handle, cutoff)
+    if source.sha256 != entry["sha256"]:
+        raise RuntimeError(f"Cached copy of {name} does not match its recorded sha256")
+    source.retrieved = retrieved
+    return source
+
+
+def retrieve_source(cache, name, url, modified, cutoff, offline=False, reusable=None,
+                    opener=urlopen):
+    """Return ``name`` as a ``SourceFile``, touching the network only when needed.
+
+    A cached copy is used without a request when the registry's modified time
+    still matches the one recorded with it, or in offline mode. Otherwise the
+    request carries the cached ETag and Last-Modified validators, and a 304
+    reuses the cached copy.
+    """
+    entry = cache.entry(url)
+    if entry is not None and (offline or (modified is not None and entry.get("modified") == modified)):
+        return ingest_cached(cache, name, entry, cutoff, "cached", reusable)
+    if offline:
+        raise RuntimeError(f"{name} is not in the download cache; run once without --offline")
+
+    headers = {"User-Agent": USER_AGENT}
+    if entry is not None and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry is not None and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    try:
+        response = opener(Request(url, headers=headers), timeout=30)
+    except HTTPError as error:
+        if error.code != 304 or entry is None:
+            raise
+        cache.record(url, **dict(entry, modified=modified))
+        return ingest_cached(cache, name, entry, cutoff, "not_modified", reusable)
+
+    staged = cache.staging_file()
+    try:
+        with response, staged:
+            source = ingest_source(name, response, cutoff, sink=staged)
+        cache.commit(staged.name, source.sha256)
+    except BaseException:
+        Path(staged.name).unlink(missing_ok=True)
+        raise
+    cache.record(
+        url, sha256=source.sha256, size=source.size, modified=modified,
+        etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"),
+    )
+    return source
+
+
+def download_sources(files, cutoff, cache, offline=False, reusable=None,
+                     max_workers=DOWNLOAD_WORKERS, opener=urlopen):
+    """Retrieve registry ``files`` (name -> item) concurrently, preserving order."""
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="download") as pool:
+        futures = {
+            name: pool.submit(
+                retrieve_source, cache, name, item["url"], item.get("mtime"), cutoff,
+                offline, reusable, opener,
+            )
+            for name, item in files.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+def load_registry(cache, offline=False):
+    """Fetch the source registry, keeping a copy so ``--offline`` can reuse it."""
+    if offline:
+        blob = cache.read_bytes(REGISTRY_URL)
+        if blob is None:
+            raise RuntimeError("The source registry is not cached; run once without --offline")
+        return json.loads(blob)
+    blob = fetch(REGISTRY_URL)
+    registry = json.loads(blob)
+    cache.put_bytes(REGISTRY_URL, blob)
+    return registry
+
+
+def read_sources(blobs, cutoff):
+    return {name: ingest_source(name, io.BytesIO(blob), cutoff) for name, blob in blobs.items()}
+
+
+def match_key(row):
+    return (
+        row["tourney_id"], row["match_num"], row["winner_name"],
+        row["loser_name"], row.get("score", ""),
+    )
+
+
+def select_matches(sources):
+    """Deduplicate in-window matches across sources, first occurrence wins."""
     matches = []
     seen = set()
-    for name, blob in blobs.items():
-        reader = csv.DictReader(io.StringIO(blob.decode("utf-8-sig")))
-        required = {"tourney_id", "tourney_date", "match_num", "winner_name", "loser_name", "surface"}
-        missing = required.difference(reader.fieldnames or [])
-        if missing:
-            raise ValueError(f"{name} missing required columns: {sorted(missing)}")
-        for row in reader:
-            try:
-                match_date = parse_match_date(row["tourney_date"])
-            except (TypeError, ValueError):
-                continue
-            if match_date < cutoff or row["surface"].strip().lower() not in SURFACES:
-                continue
-            key = (
-                row["tourney_id"], row["match_num"], row["winner_name"],
-                row["loser_name"], row.get("score", ""),
-            )
+    for source in sources.values():
+        for match_date, row in source.matches:
+            key = match_key(row)
             if key not in seen:
                 seen.add(key)
                 matches.append((match_date, row))
     return matches
 
 
-def aggregate(matches, min_matches=5):
-    grouped = defaultdict(empty_stats)
-    profiles = {}
-    for match_date, row in sorted(matches, key=lambda item: item[0]):
-        surface = row["surface"].strip().lower()
-        for prefix, opponent_prefix, won in (("w", "l", True), ("l", "w", False)):
-            player = row[f"{prefix}inner_name" if prefix == "w" else "loser_name"].strip()
+def read_matches(blobs, cutoff):
+    return select_matches(read_sources(blobs, cutoff))
+
+
+def decay_factor(elapsed_days, half_life_days):
+    return 0.5 ** (elapsed_days / half_life_days)
+
+
+class DecayedCounters:
+    """Exponentially decayed counter sums that age forward in closed form.
+
+    ``values`` are valued as of ``day`` (a date ordinal) and halve every
+    ``half_life_days``. Adding a match costs O(width) regardless of how
+    many matches came before, and :meth:`at` revalues the sums for any
+    later day with one multiplication per counter.
+    """
+
+    __slots__ = ("half_life_days", "day", "values")
+
+    def __init__(self, half_life_days, width=len(COUNTER_FIELDS)):
+        self.half_life_days = half_life_days
+        self.day = None
+        self.values = [0.0] * width
+
+    def add(self, day, counters):
+        if self.day is None:
+            self.day = day
+        if day > self.day:
+            factor = decay_factor(day - self.day, self.half_life_days)
+            self.values = [value * factor for value in self.values]
+            self.day = day
+        weight = decay_factor(self.day - day, self.half_life_days)
+        self.values = [value + weight * counter for value, counter in zip(self.values, counters)]
+
+    def at(self, day):
+        """Return the sums valued as of ``day``, which must not precede ``self.day``."""
+        if self.day is None:
+            return list(self.values)
+        if day < self.day:
+            raise ValueError("Decayed counters cannot be valued before their latest match")
+        factor = decay_factor(day - self.day, self.half_life_days)
+        return [value * factor for value in self.values]
+
+
+class MatchTable:
+    """Validated matches as typed columns, one row per player side.
+
+    Each source row is parsed once: both sides share the same 18 serve
+    counters, and the score is read once and mirrored for the loser. The
+    ``COUNTER_FIELDS`` of every side are appended to one row-major int32
+    array; :meth:`column` slices out a field with a stride. ``aggregate``
+    then reduces the table with grouped sums instead of updating a dict
+    per player and surface.
+    """
+
+    def __init__(self):
+        self.players = []
+        self._player_ids = {}
+        self.iocs = []
+        self._ioc_ids = {}
+        self.player = array("i")
+        # The other side's player, or -1 when that side has no name.
+        self.opponent = array("i")
+        self.surface = array("B")
+        self.date = array("i")
+        self.counters = array("i")
+        self.opponent_rank = array("i")
+        self.rank = array("i")
+        self.ioc = array("H")
+
+    def __len__(self):
+        return len(self.player)
+
+    @classmethod
+    def from_matches(cls, matches):
+        table = cls()
+        for match_date, row in matches:
+            table.add_match(match_date, row)
+        return table
+
+    def column(self, field):
+        """Return one counter for every side as a contiguous int32 array."""
+        return self.counters[COUNTER_FIELDS.index(field)::len(COUNTER_FIELDS)]
+
+    def _intern(self, ids, values, value):
+        index = ids.get(value)
+        if index is None:
+            index = ids[value] = len(values)
+            values.append(value)
+        return index
+
+    def add_match(self, match_date, row):
+        """Append both sides of one match; return ``False`` if it is rejected."""
+        winner = {field: parse_int(row, f"w_{field}") for field in STAT_FIELDS}
+        loser = {field: parse_int(row, f"l_{field}") for field in STAT_FIELDS}
+        if not (plausible_counters(winner) and plausible_counters(loser)):
+            return False
+        score = defaultdict(int)
+        add_score(score, row.get("score", ""), True)
+        surface = SURFACES.index(row["surface"].strip().lower())
+        sides = (
+            ("winner", "loser", winner, loser, 1, (
+                score["games_won"], score["games_lost"], score["sets_won"],
+                score["sets_lost"], score["tiebreaks"], score["tiebreaks_won"],
+            )),
+            ("loser", "winner", loser, winner, 0, (
+                score["games_lost"], score["games_won"], score["sets_lost"],
+                score["sets_won"], score["tiebreaks"], score["tiebreaks"] - score["tiebreaks_won"],
+            )),
+        )
+        for own, other, values, opponent, won, score_counters in sides:
+            player = row[f"{own}_name"].strip()
             if not player:
                 continue
-            before = grouped[(player, surface)]["matches"]
-            if not add_player(grouped[(player, surface)], row, prefix, opponent_prefix, won):
+            self.player.append(self._intern(self._player_ids, self.players, player))
+            opponent_name = row[f"{other}_name"].strip()
+            self.opponent.append(
+                self._intern(self._player_ids, self.players, opponent_name) if opponent_name else -1
+            )
+            self.surface.append(surface)
+            self.date.append(match_date.toordinal())
+            self.counters.extend((*values.values(), *opponent.values(), 1, won, *score_counters))
+            self.opponent_rank.append(parse_int(row, f"{other}_rank") or 0)
+            rank = parse_int(row, f"{own}_rank")
+            self.rank.append(-1 if rank is None else rank)
+            ioc = row.get(f"{own}_ioc", "").strip()
+            self.ioc.append(self._intern(self._ioc_ids, self.iocs, ioc))
+        return True
+
+    def aggregate(self, min_matches=5, half_life_days=None, as_of=None):
+        """Return ``(grouped, profiles)`` from grouped sums over the columns.
+
+        Rows are ordered by ``(player, surface)`` once; each column is then
+        summed per group as differences of its prefix sums. With
+        ``half_life_days``, eligibility still uses the raw match count but
+        the reported counters are decayed to ``as_of``.
+        """
+        groups = [player * len(SURFACES) + surface for player, surface in zip(self.player, self.surface)]
+        order = sorted(range(len(groups)), key=groups.__getitem__)
+        counts = Counter(groups)
+        keys = sorted(counts)
+        bounds = list(accumulate((counts[key] for key in keys), initial=0))
+
+        sums = {}
+        for field in COUNTER_FIELDS:
+            prefix = list(accumulate(map(self.column(field).__getitem__, order), initial=0))
+            sums[field] = [prefix[end] - prefix[start] for start, end in zip(bounds, bounds[1:])]
+        opponent_ranks = [
+            sorted(rank for rank in map(self.opponent_rank.__getitem__, order[start:end]) if rank)
+            for start, end in zip(bounds, bounds[1:])
+        ]
+
+        totals = {}
+        for position, key in enumerate(keys):
+            player, surface = divmod(key, len(SURFACES))
+            values = [sums[field][position] for field in COUNTER_FIELDS]
+            totals[(player, SURFACES[surface])] = (values, opponent_ranks[position])
+            combined = totals.get((player, "all"))
+            if combined is None:
+                totals[(player, "all")] = (list(values), list(opponent_ranks[position]))
+            else:
+                combined[0][:] = [left + right for left, right in zip(combined[0], values)]
+                combined[1].extend(opponent_ranks[position])
+
+        matches = COUNTER_FIELDS.index("matches")
+        grouped = {}
+        for (player, surface), (values, ranks) in totals.items():
+            if values[matches] >= min_matches:
+                stats = dict(zip(COUNTER_FIELDS, values))
+                stats["opponent_ranks"] = ranks
+                grouped[(self.players[player], surface)] = stats
+        if half_life_days is not None:
+            self._apply_recency_weights(grouped, half_life_days, as_of)
+
+        latest = {}
+        for index, (player, day) in enumerate(zip(self.player, self.date)):
+            # Later rows win ties, as in a stable sort by date.
+            if day >= latest.get(player, (day, index))[0]:
+                latest[player] = (day, index)
+        profiles = {
+            self.players[player]: {
+                "ranking": None if self.rank[index] == -1 else self.rank[index],
+                "ioc": self.iocs[self.ioc[index]],
+                "date": date.fromordinal(day).isoformat(),
+            }
+            for player, (day, index) in latest.items()
+        }
+        return grouped, profiles
+
+    def opponent_adjusted_rates(self, keys, half_life_days=None, as_of=None):
+        """Fit opponent-adjusted rates for ``keys`` from the serve counter columns."""
+        columns = [self.column(field) for field in SERVE_POINT_FIELDS]
+        points = (
+            (day, SURFACES[surface], player, opponent, *counters)
+            for day, surface, player, opponent, *counters
+            in zip(self.date, self.surface, self.player, self.opponent, *columns)
+            if opponent >= 0
+        )
+        return fit_opponent_adjustment(points, self.players, keys, half_life_days, as_of)
+
+    def _apply_recency_weights(self, grouped, half_life_days, as_of):
+        """Replace the counters in ``grouped`` with sums decayed to ``as_of``.
+
+        Matches after ``as_of`` carry no weight; they can only reach the table
+        when a historical ``as_of`` is rebuilt from newer source files.
+        """
+        as_of = as_of.toordinal()
+        width = len(COUNTER_FIELDS)
+        decayed = {}
+        ranks = defaultdict(list)
+        for index in sorted(range(len(self)), key=self.date.__getitem__):
+            player, day = self.player[index], self.date[index]
+            if day > as_of:
+                break
+            key = (self.players[player], SURFACES[self.surface[index]])
+            if key not in grouped and (key[0], "all") not in grouped:
                 continue
-            add_player(grouped[(player, "all")], row, prefix, opponent_prefix, won)
-            if grouped[(player, surface)]["matches"] > before:
-                rank = parse_int(row, "winner_rank" if prefix == "w" else "loser_rank")
-                profiles[player] = {
-                    "ranking": rank,
-                    "ioc": row.get("winner_ioc" if prefix == "w" else "loser_ioc", "").strip(),
-                    "date": match_date.isoformat(),
+            counters = decayed.get(key)
+            if counters is None:
+                counters = decayed[key] = DecayedCounters(half_life_days, width)
+            counters.add(day, self.counters[index * width:(index + 1) * width])
+            if self.opponent_rank[index]:
+                ranks[key].append((self.opponent_rank[index], day))
+
+        combined = defaultdict(lambda: [0.0] * width)
+        for (player, surface), counters in decayed.items():
+            values = counters.at(as_of)
+            combined[(player, "all")] = [
+                left + right for left, right in zip(combined[(player, "all")], values)
+            ]
+            combined[(player, surface)] = values
+            ranks[(player, "all")].extend(ranks[(player, surface)])
+        for key, stats in grouped.items():
+            stats.update(zip(COUNTER_FIELDS, combined[key]))
+            stats["opponent_ranks"] = [rank for rank, _ in ranks[key]]
+            stats["opponent_rank_weights"] = [
+                decay_factor(as_of - day, half_life_days) for _, day in ranks[key]
+            ]
+
+
+def aggregate(matches, min_matches=5, half_life_days=None, as_of=None):
+    table = MatchTable.from_matches(matches)
+    return table.aggregate(min_matches, half_life_days, as_of)
+
+
+def match_contribution(row):
+    """Return the per-player counters ``aggregate`` would add for one match.
+
+    Each side is ``[player, counters, opponent_rank, rank, ioc]`` with the
+    counters in ``COUNTER_FIELDS`` order; sides ``add_player`` rejects are
+    left out.
+    """
+    sides = []
+    for prefix, opponent_prefix, won in (("w", "l", True), ("l", "w", False)):
+        player = row["winner_name" if prefix == "w" else "loser_name"].strip()
+        stats = empty_stats()
+        if not player or not add_player(stats, row, prefix, opponent_prefix, won):
+            continue
+        ranks = stats["opponent_ranks"]
+        sides.append([
+            player,
+            [int(stats[field]) for field in COUNTER_FIELDS],
+            ranks[0] if ranks else None,
+            parse_int(row, "winner_rank" if prefix == "w" else "loser_rank"),
+            row.get("winner_ioc" if prefix == "w" else "loser_ioc", "").strip(),
+        ])
+    return sides
+
+
+def contribution_records(matches):
+    """Turn ``(match_date, row)`` pairs into ``[id, key, date, surface, sides]`` records."""
+    records = []
+    for match_date, row in matches:
+        key = list(match_key(row))
+        surface = row["surface"].strip().lower()
+        sides = match_contribution(row)
+        identifier = hashlib.sha256(
+            json.dumps([key, match_date.isoformat(), surface, sides]).encode("utf-8")
+        ).hexdigest()[:32]
+        records.append([identifier, key, match_date.isoformat(), surface, sides])
+    return records
+
+
+# The serve counters the opponent adjustment fits, in the order it reads them.
+SERVE_POINT_FIELDS = ("svpt", "1stIn", "1stWon", "2ndWon")
+# Percentage points within which the full and incremental opponent-adjusted
+# fits must agree. They can number players differently, so each may stop at
+# its own point within the solver tolerance and round to a different cent.
+ADJUSTED_TOLERANCE = 0.05
+
+
+def fit_opponent_adjustment(points, players, keys, half_life_days=None, as_of=None):
+    """Fit opponent-adjusted serve and return rates for each ``(player, surface)`` in ``keys``.
+
+    ``points`` yields ``(day, surface, server, returner, *counters)`` for
+    each serving side, with ``day`` a date ordinal, players as positions in
+    ``players``, and the ``SERVE_POINT_FIELDS`` counters. With
+    ``half_life_days`` each side's points are decayed to ``as_of``, and
+    points after ``as_of`` are left out.
+    """
+    from scripts.opponent_adjustment import GROUPS, ServeObservations, adjusted_rates
+    observations = {"first": ServeObservations(), "second": ServeObservations()}
+    for day, surface, server, returner, svpt, first_in, first_won, second_won in points:
+        weight = 1.0
+        if half_life_days is not None:
+            if day > as_of.toordinal():
+                continue
+            weight = decay_factor(as_of.toordinal() - day, half_life_days)
+        for group in (GROUPS.index(surface), GROUPS.index("all")):
+            observations["first"].add(group, server, returner, weight * first_won, weight * first_in)
+            observations["second"].add(
+                group, server, returner, weight * second_won, weight * (svpt - first_in)
+            )
+    return adjusted_rates(observations, players, keys)
+
+
+def opponent_adjusted_rates(records, keys, half_life_days=None, as_of=None):
+    """Fit opponent-adjusted rates from ``[id, key, date, surface, sides]`` records.
+
+    Matches missing a side are skipped, as ``MatchTable.opponent_adjusted_rates``
+    skips sides without an opponent.
+    """
+    fields = [COUNTER_FIELDS.index(field) for field in SERVE_POINT_FIELDS]
+    players = []
+    ids = {}
+
+    def points():
+        for _, _, match_date, surface, sides in records:
+            if len(sides) != 2:
+                continue
+            for player, _, _, _, _ in sides:
+                if player not in ids:
+                    ids[player] = len(players)
+                    players.append(player)
+            codes = [ids[player] for player, _, _, _, _ in sides]
+            day = date.fromisoformat(match_date).toordinal()
+            for (_, counters, _, _, _), server, returner in zip(sides, codes, reversed(codes)):
+                yield (day, surface, server, returner, *(counters[index] for index in fields))
+
+    return fit_opponent_adjustment(points(), players, keys, half_life_days, as_of)
+
+
+class ContributionStore:
+    """Per-match contributions and rolling-window totals kept between runs.
+
+    Source files whose SHA-256 is unchanged, and whose records were kept
+    with a cutoff no later than this run's, reuse those records. Each
+    update selects the window exactly as ``read_matches`` does, then adds the
+    contributions of newly selected matches to the running totals and
+    subtracts those that expired or changed, instead of re-aggregating.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.files = {}
+        self.window = set()
+        self.selected = []
+        self.totals = {}
+        self.load()
+
+    def load(self):
+        try:
+            state = json.loads(gzip.decompress(self.path.read_bytes()))
+        except (OSError, ValueError, EOFError):
+            return
+        if state.get("version") != CONTRIBUTION_STORE_VERSION:
+            return
+        self.files = state["files"]
+        self.window = set(state["window"])
+        self.totals = {
+            (player, surface): (counters, Counter({int(rank): count for rank, count in ranks.items()}))
+            for player, surface, counters, ranks in state["totals"]
+        }
+
+    def save(self):
+        state = {
+            "version": CONTRIBUTION_STORE_VERSION,
+            "files": self.files,
+            "window": sorted(self.window),
+            "totals": [
+                [player, surface, counters, {str(rank): count for rank, count in ranks.items()}]
+                for (player, surface), (counters, ranks) in sorted(self.totals.items())
+            ],
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        replace_file(self.path, gzip.compress(json.dumps(state, separators=(",", ":")).encode("utf-8")))
+
+    def _apply(self, record, sign):
+        surface = record[3]
+        for player, counters, opponent_rank, _, _ in record[4]:
+            for group in (surface, "all"):
+                totals, ranks = self.totals.setdefault((player, group), ([0] * len(COUNTER_FIELDS), Counter()))
+                for index, value in enumerate(counters):
+                    totals[index] += sign * value
+                if opponent_rank:
+                    ranks[opponent_rank] += sign
+                    if not ranks[opponent_rank]:
+                        del ranks[opponent_rank]
+                if not any(totals) and not ranks:
+                    del self.totals[(player, group)]
+
+    def reusable(self, name, sha256, cutoff):
+        """Whether ``name`` with this hash can skip parsing on this run."""
+        entry = self.files.get(name)
+        return entry is not None and entry["sha256"] == sha256 and entry["cutoff"] <= cutoff.isoformat()
+
+    def update(self, sources, cutoff):
+        """Bring the totals in line with ``sources`` and return a change report."""
+        known = {record[0]: record for entry in self.files.values() for record in entry["records"]}
+        cutoff = cutoff.isoformat()
+        files = {}
+        parsed = 0
+        for name, source in sources.items():
+            entry = self.files.get(name)
+            if entry is None or entry["sha256"] != source.sha256 or entry["cutoff"] > cutoff:
+                if source.matches is None:
+                    raise ValueError(f"{name} was not parsed and has no stored records")
+                entry = {
+                    "sha256": source.sha256,
+                    "cutoff": cutoff,
+                    "records": contribution_records(source.matches),
                 }
-    return {
-        key: stats for key, stats in grouped.items()
-        if stats["matches"] >= min_matches
-    }, profiles
+                parsed += 1
+            files[name] = entry
+
+        selected = []
+        seen = set()
+        for entry in files.values():
+            for record in entry["records"]:
+                key = tuple(record[1])
+                if record[2] >= cutoff and key not in seen:
+                    seen.add(key)
+                    selected.append(record)
+        window = {record[0] for record in selected}
+        added = [record for record in selected if record[0] not in self.window]
+        removed = self.window - window
+        for identifier in removed:
+            self._apply(known[identifier], -1)
+        for record in added:
+            self._apply(record, 1)
+
+        self.files = files
+        self.window = window
+        self.selected = selected
+        return {
+            "parsed_files": parsed,
+            "reused_files": len(files) - parsed,
+            "added_matches": len(added),
+            "removed_matches": len(removed),
+        }
+
+    def aggregate(self, min_matches=5):
+        """Return ``(grouped, profiles)`` in the shape ``aggregate`` produces."""
+        grouped = {}
+        for key, (counters, ranks) in self.totals.items():
+            if counters[COUNTER_FIELDS.index("matches")] >= min_matches:
+                stats = empty_stats()
+                stats.update((field, float(value)) for field, value in zip(COUNTER_FIELDS, counters))
+                stats["opponent_ranks"] = sorted(ranks.elements())
+                grouped[key] = stats
+        profiles = {}
+        for record in sorted(self.selected, key=lambda item: item[2]):
+            for player, _, _, rank, ioc in record[4]:
+                profiles[player] = {"ranking": rank, "ioc": ioc, "date": record[2]}
+        return grouped, profiles
+
+
+def _within(expected, actual, tolerance):
+    """Whether two formatted percentages differ by at most ``tolerance`` points."""
+    if expected == actual:
+        return True
+    try:
+        return abs(float(expected.rstrip("%")) - float(actual.rstrip("%"))) <= tolerance
+    except (AttributeError, ValueError):
+        return False
+
+
+def diff_outputs(expected, actual, limit=5, adjusted_tolerance=0.0):
+    """Describe up to ``limit`` rows where two ``build_rows`` results differ.
+
+    Opponent-adjusted columns may differ by ``adjusted_tolerance``
+    percentage points; every other cell must match exactly.
+    """
+    differences = []
+    for kind in OUTPUT_FILES:
+        expected_rows, actual_rows = expected[kind], actual[kind]
+        if len(expected_rows) != len(actual_rows):
+            differences.append(f"{kind}: {len(expected_rows)} rows != {len(actual_rows)} rows")
+        adjusted = [column.startswith("adjusted_") for column in HEADERS[kind]]
+        for expected_row, actual_row in zip(expected_rows, actual_rows):
+            if expected_row != actual_row and not all(
+                left == right or (tolerant and _within(left, right, adjusted_tolerance))
+                for left, right, tolerant in zip(expected_row, actual_row, adjusted)
+            ):
+                differences.append(f"{kind}: {expected_row} != {actual_row}")
+    return differences[:limit]
+
+
+def opponent_rank_summary(ranks, weights=None):
+    """Return the (median, mean) opponent rank, weighted when ``weights`` is given."""
+    if not ranks:
+        return None, None
+    if weights is None:
+        return statistics.median(ranks), statistics.mean(ranks)
+    total = sum(weights)
+    mean = sum(rank * weight for rank, weight in zip(ranks, weights)) / total
+    cumulative = 0.0
+    for rank, weight in sorted(zip(ranks, weights)):
+        cumulative += weight
+        if cumulative >= total / 2:
+            return rank, mean
+    return rank, mean
 
 
 def common(stats, profile, surface):
-    return [surface, profile.get("ranking") or "", profile["name"], int(stats["matches"])]
+    return [surface, profile.get("ranking") or "", profile["name"], count(stats["matches"])]
 
 
-def build_rows(grouped, profiles):
+def build_rows(grouped, profiles, adjusted=None):
+    """CSV rows per output file; ``adjusted`` fills the opponent-adjusted columns."""
     outputs = {key: [] for key in OUTPUT_FILES}
     for (player, surface), stats in sorted(grouped.items(), key=lambda item: (item[0][1], item[0][0])):
         profile = {**profiles.get(player, {}), "name": player}
+        rates = (adjusted or {}).get((player, surface), {})
         base = common(stats, profile, surface)
         service_won = stats["1stWon"] + stats["2ndWon"]
         service_lost = stats["svpt"] - service_won
@@ -197,19 +949,23 @@ def build_rows(grouped, profiles):
         breaks_made = stats["opp_bpFaced"] - stats["opp_bpSaved"]
         sets = stats["sets_won"] + stats["sets_lost"]
         games = stats["games_won"] + stats["games_lost"]
-        record = f"{int(stats['wins'])}-{int(stats['matches'] - stats['wins'])}"
-        opponents = stats["opponent_ranks"]
+        record = f"{count(stats['wins'])}-{count(stats['matches'] - stats['wins'])}"
+        median_rank, mean_rank = opponent_rank_summary(
+            stats["opponent_ranks"], stats.get("opponent_rank_weights")
+        )
 
         outputs["serve"].append(base + [
             record, pct(stats["wins"], stats["matches"]), pct(service_won, stats["svpt"]),
             pct(service_won - stats["ace"], stats["svpt"] - stats["ace"] - stats["df"]),
-            int(stats["ace"]), pct(stats["ace"], stats["svpt"]), int(stats["df"]),
+            count(stats["ace"]), pct(stats["ace"], stats["svpt"]), count(stats["df"]),
             pct(stats["df"], stats["svpt"]), pct(stats["df"], second_attempts),
             pct(stats["1stIn"], stats["svpt"]), pct(stats["1stWon"], stats["1stIn"]),
             pct(stats["2ndWon"], second_attempts), pct(stats["2ndWon"], second_in_play),
             pct(stats["SvGms"] - breaks_allowed, stats["SvGms"]),
             number(stats["svpt"] / stats["SvGms"] if stats["SvGms"] else None),
             number(service_lost / stats["SvGms"] if stats["SvGms"] else None),
+            *(pct(rates[field], 1) if field in rates else ""
+              for field in ("adjusted_first_serve_win_pct", "adjusted_second_serve_win_pct")),
         ])
         outputs["return"].append(base + [
             pct(return_won, stats["opp_svpt"]),
@@ -220,53 +976,129 @@ def build_rows(grouped, profiles):
             pct(breaks_made, stats["opp_bpFaced"]),
             number(stats["opp_svpt"] / stats["opp_SvGms"] if stats["opp_SvGms"] else None),
             number(return_won / stats["opp_SvGms"] if stats["opp_SvGms"] else None),
-            number(statistics.median(opponents), 1) if opponents else "",
-            number(statistics.mean(opponents), 1) if opponents else "",
+            number(median_rank, 1), number(mean_rank, 1),
+            *(pct(rates[field], 1) if field in rates else ""
+              for field in ("adjusted_vs_first_serve_win_pct", "adjusted_vs_second_serve_win_pct")),
         ])
         outputs["breaks"].append(base + [
-            pct(breaks_made, stats["opp_bpFaced"]), int(breaks_made), int(stats["opp_bpFaced"]),
+            pct(breaks_made, stats["opp_bpFaced"]), count(breaks_made), count(stats["opp_bpFaced"]),
             number(stats["opp_bpFaced"] / stats["opp_SvGms"] if stats["opp_SvGms"] else None),
             number(stats["opp_bpFaced"] / sets if sets else None),
             number(stats["opp_bpFaced"] / stats["matches"]),
             number(breaks_made / sets if sets else None), number(breaks_made / stats["matches"]),
-            pct(stats["bpSaved"], stats["bpFaced"]), int(stats["bpSaved"]), int(stats["bpFaced"]),
+            pct(stats["bpSaved"], stats["bpFaced"]), count(stats["bpSaved"]), count(stats["bpFaced"]),
             number(stats["bpFaced"] / stats["SvGms"] if stats["SvGms"] else None),
             number(stats["bpFaced"] / sets if sets else None), number(stats["bpFaced"] / stats["matches"]),
             number(breaks_allowed / sets if sets else None), number(breaks_allowed / stats["matches"]),
         ])
         outputs["more"].append(base + [
-            ratio(return_won, service_lost), int(stats["svpt"] + stats["opp_svpt"]),
+            ratio(return_won, service_lost), count(stats["svpt"] + stats["opp_svpt"]),
             pct(service_won + return_won, stats["svpt"] + stats["opp_svpt"]),
-            int(stats["tiebreaks"]),
-            f"{int(stats['tiebreaks_won'])}-{int(stats['tiebreaks'] - stats['tiebreaks_won'])}",
+            count(stats["tiebreaks"]),
+            f"{count(stats['tiebreaks_won'])}-{count(stats['tiebreaks'] - stats['tiebreaks_won'])}",
             pct(stats["tiebreaks_won"], stats["tiebreaks"]),
-            ratio(stats["tiebreaks"], sets), int(sets),
-            f"{int(stats['sets_won'])}-{int(stats['sets_lost'])}", pct(stats["sets_won"], sets),
-            int(games), f"{int(stats['games_won'])}-{int(stats['games_lost'])}",
+            ratio(stats["tiebreaks"], sets), count(sets),
+            f"{count(stats['sets_won'])}-{count(stats['sets_lost'])}", pct(stats["sets_won"], sets),
+            count(games), f"{count(stats['games_won'])}-{count(stats['games_lost'])}",
             pct(stats["games_won"], games), "", "", "",
         ])
     return outputs
 
 
 HEADERS = {
-    "serve": "surface,ranking,player_name,matches_played,match_record,match_win_pct,service_points_won,service_points_won_in_play,total_aces,ace_pct,double_faults,double_fault_pct,double_fault_per_second_serve,first_serve_in_pct,first_serve_win_pct,second_serve_win_pct,second_serve_win_pct_in_play,service_hold_pct,points_per_service_game,points_lost_per_service_game".split(","),
-    "return": "surface,ranking,player_name,matches_played,return_points_won,return_points_won_in_play,vs_ace_pct,vs_double_fault_pct,vs_first_serve_win_pct,vs_second_serve_win_pct,break_point_conversion_pct,points_per_return_game,points_won_per_return_game,median_opponent_rank,mean_opponent_rank".split(","),
+    "serve": "surface,ranking,player_name,matches_played,match_record,match_win_pct,service_points_won,service_points_won_in_play,total_aces,ace_pct,double_faults,double_fault_pct,double_fault_per_second_serve,first_serve_in_pct,first_serve_win_pct,second_serve_win_pct,second_serve_win_pct_in_play,service_hold_pct,points_per_service_game,points_lost_per_service_game,adjusted_first_serve_win_pct,adjusted_second_serve_win_pct".split(","),
+    "return": "surface,ranking,player_name,matches_played,return_points_won,return_points_won_in_play,vs_ace_pct,vs_double_fault_pct,vs_first_serve_win_pct,vs_second_serve_win_pct,break_point_conversion_pct,points_per_return_game,points_won_per_return_game,median_opponent_rank,mean_opponent_rank,adjusted_vs_first_serve_win_pct,adjusted_vs_second_serve_win_pct".split(","),
     "breaks": "surface,ranking,player_name,matches_played,break_point_conversion_pct,break_points_converted,break_point_chances,break_points_per_game,break_points_per_set,break_points_per_match,breaks_per_set,breaks_per_match,break_point_save_pct,break_points_saved,break_points_faced,break_points_faced_per_game,break_points_faced_per_set,break_points_faced_per_match,times_broken_per_set,times_broken_per_match".split(","),
     "more": "surface,ranking,player_name,matches_played,dominance_ratio,points,total_points_won_pct,tiebreaks_played,tiebreak_record,tiebreak_win_pct,tiebreaks_per_set,sets_played,set_record,set_win_pct,games_played,game_record,game_win_pct,time_per_match,minutes_per_set,seconds_per_point".split(","),
 }
 
 
-def write_outputs(outputs, output_dir, metadata):
+def replace_file(destination, data):
+    """Write ``data`` beside ``destination`` and rename it into place.
+
+    A running server that reloads on ``metadata.json`` never reads a
+    half-written file, and the metadata is always written last.
+    """
+    staged = destination.with_name(destination.name + ".tmp")
+    staged.write_bytes(data)
+    os.replace(staged, destination)
+
+
+def write_metadata(metadata, output_dir):
+    replace_file(
+        output_dir / "metadata.json",
+        (json.dumps(metadata, indent=2, sort_keys=True) + "\n").encode("utf-8"),
+    )
+
+
+def snapshot_metadata(snapshot, output_dir):
+    from data_loader import SNAPSHOT_FILE, SNAPSHOT_FORMAT_VERSION
+    return {
+        "file": SNAPSHOT_FILE,
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "sha256": hashlib.sha256(snapshot).hexdigest(),
+        "csv_sha256": {
+            filename: hashlib.sha256((output_dir / filename).read_bytes()).hexdigest()
+            for filename in OUTPUT_FILES.values()
+        },
+    }
+
+
+def precompute_probabilities(loader, snapshot, top_n):
+    """Exact probabilities for every pair of the ``top_n`` ranked players, as table bytes."""
+    from probability_table import ProbabilityTable
+    return ProbabilityTable.build(loader, top_n, hashlib.sha256(snapshot).hexdigest()).to_bytes()
+
+
+def write_snapshot(snapshot, output_dir, metadata, probability_table=None):
+    """Write the loader's binary snapshot and record its hashes in the metadata.
+
+    The CSV hashes let the loader ignore a snapshot the CSVs have moved past.
+    ``probability_table`` bytes, when given, are written and recorded beside it.
+    """
+    metadata["snapshot"] = snapshot_metadata(snapshot, output_dir)
+    replace_file(output_dir / metadata["snapshot"]["file"], snapshot)
+    if probability_table is not None:
+        from probability_table import (
+            PROBABILITY_TABLE_FILE,
+            PROBABILITY_TABLE_FORMAT_VERSION,
+            ProbabilityTable,
+        )
+        metadata["probability_table"] = {
+            "file": PROBABILITY_TABLE_FILE,
+            "format_version": PROBABILITY_TABLE_FORMAT_VERSION,
+            "sha256": hashlib.sha256(probability_table).hexdigest(),
+            "players": len(ProbabilityTable.from_bytes(probability_table)),
+            # Built from a loader serving the raw rates.
+            "opponent_adjusted": False,
+        }
+        replace_file(output_dir / PROBABILITY_TABLE_FILE, probability_table)
+    write_metadata(metadata, output_dir)
+
+
+def rebuild_snapshot(output_dir, precompute_top=0):
+    """Regenerate only the binary snapshot from the CSVs already in ``output_dir``."""
+    from data_loader import TennisDataLoader, read_metadata
+    loader = TennisDataLoader(str(output_dir), use_snapshot=False)
+    snapshot = loader.snapshot_bytes()
+    write_snapshot(
+        snapshot, output_dir, read_metadata(output_dir / "metadata.json"),
+        precompute_probabilities(loader, snapshot, precompute_top) if precompute_top else None,
+    )
+
+
+def write_outputs(outputs, output_dir, metadata, snapshot=None, probability_table=None):
     output_dir.mkdir(parents=True, exist_ok=True)
     for kind, filename in OUTPUT_FILES.items():
-        destination = output_dir / filename
-        with destination.open("w", newline="", encoding="utf-8") as handle:
-            writer = csv.writer(handle, lineterminator="\n")
-            writer.writerow(HEADERS[kind])
-            writer.writerows(outputs[kind])
-    (output_dir / "metadata.json").write_text(
-        json.dumps(metadata, indent=2, sort_keys=True) + "\n", encoding="utf-8"
-    )
+        handle = io.StringIO(newline="")
+        writer = csv.writer(handle, lineterminator="\n")
+        writer.writerow(HEADERS[kind])
+        writer.writerows(outputs[kind])
+        replace_file(output_dir / filename, handle.getvalue().encode("utf-8"))
+    if snapshot is not None:
+        write_snapshot(snapshot, output_dir, metadata, probability_table)
+    else:
+        write_metadata(metadata, output_dir)
 
 
 def main():
@@ -275,25 +1107,99 @@ def main():
     parser.add_argument("--days", type=int, default=365)
     parser.add_argument("--min-matches", type=int, default=5)
     parser.add_argument("--output-dir", type=Path, default=PROJECT_ROOT / "data")
+    parser.add_argument(
+        "--snapshot-only", action="store_true",
+        help="rebuild the binary loader snapshot from the existing CSVs and exit",
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="update per-match contributions kept in --state-file instead of re-aggregating",
+    )
+    parser.add_argument(
+        "--verify-incremental", action="store_true",
+        help="run the incremental and full aggregation and fail unless they match",
+    )
+    parser.add_argument("--state-file", type=Path, default=DEFAULT_STATE_FILE)
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR)
+    parser.add_argument(
+        "--offline", action="store_true",
+        help="build only from the download cache without any network access",
+    )
+    parser.add_argument(
+        "--half-life-days", type=float,
+        help="weight each match by 0.5 ** (age / half-life) instead of counting it fully",
+    )
+    parser.add_argument(
+        "--precompute-top", type=int, default=0, metavar="N",
+        help="also write exact match probabilities for every pair of the top N ranked players",
+    )
     args = parser.parse_args()
+    if args.precompute_top < 0:
+        parser.error("--precompute-top must be >= 0")
+    if args.snapshot_only:
+        rebuild_snapshot(args.output_dir, args.precompute_top)
+        print(f"Rebuilt loader snapshot in {args.output_dir}")
+        return
     if args.days < 30 or args.min_matches < 1:
         parser.error("--days must be >= 30 and --min-matches must be >= 1")
+    if args.half_life_days is not None:
+        if args.half_life_days <= 0:
+            parser.error("--half-life-days must be positive")
+        if args.incremental or args.verify_incremental:
+            parser.error("--half-life-days cannot be combined with --incremental")
 
-    registry = json.loads(fetch(REGISTRY_URL))
+    cache = DownloadCache(args.cache_dir)
+    registry = load_registry(cache, args.offline)
     by_name = {item["name"]: item for item in registry["files"]}
+    cutoff = args.as_of - timedelta(days=args.days)
+    # Always the prior and current season, plus older ones a long --days reaches.
+    years = range(min(cutoff.year, args.as_of.year - 1), args.as_of.year + 1)
     wanted = [
-        f"{args.as_of.year - 1}.csv", f"{args.as_of.year}.csv",
-        f"{args.as_of.year - 1}_challenger.csv", f"{args.as_of.year}_challenger.csv",
+        *(f"{year}.csv" for year in years),
+        *(f"{year}_challenger.csv" for year in years),
         "ongoing_tourneys.csv", "challenger_ongoing_tourneys.csv",
     ]
     missing = [name for name in wanted if name not in by_name]
     if missing:
         raise RuntimeError(f"Source registry missing files: {missing}")
 
-    blobs = {name: fetch(by_name[name]["url"]) for name in wanted}
-    matches = read_matches(blobs, args.as_of - timedelta(days=args.days))
-    grouped, profiles = aggregate(matches, args.min_matches)
-    outputs = build_rows(grouped, profiles)
+    store = None
+    reusable = None
+    if args.incremental or args.verify_incremental:
+        store = ContributionStore(args.state_file)
+        if not args.verify_incremental:
+            def reusable(name, sha256):
+                return store.reusable(name, sha256, cutoff)
+    sources = download_sources(
+        {name: by_name[name] for name in wanted}, cutoff, cache, args.offline, reusable
+    )
+    cache.save()
+    if store is not None:
+        report = store.update(sources, cutoff)
+        print(
+            "Incremental update: {parsed_files} files parsed, {reused_files} reused, "
+            "{added_matches} matches added, {removed_matches} removed".format(**report)
+        )
+        match_count = len(store.selected)
+        grouped, profiles = store.aggregate(args.min_matches)
+        adjusted = opponent_adjusted_rates(store.selected, grouped)
+        outputs = build_rows(grouped, profiles, adjusted)
+    if store is None or args.verify_incremental:
+        matches = select_matches(sources)
+        match_count = len(matches)
+        table = MatchTable.from_matches(matches)
+        grouped, profiles = table.aggregate(args.min_matches, args.half_life_days, args.as_of)
+        adjusted = table.opponent_adjusted_rates(grouped, args.half_life_days, args.as_of)
+        full_outputs = build_rows(grouped, profiles, adjusted)
+        if store is not None:
+            differences = diff_outputs(full_outputs, outputs, adjusted_tolerance=ADJUSTED_TOLERANCE)
+            if differences or match_count != len(store.selected):
+                raise RuntimeError(
+                    "Incremental aggregation differs from a full rebuild: "
+                    + "; ".join(differences or [f"{len(store.selected)} != {match_count} matches"])
+                )
+            print("Incremental aggregation matches a full rebuild")
+        outputs = full_outputs
     if not outputs["serve"] or not all(len(rows) == len(outputs["serve"]) for rows in outputs.values()):
         raise RuntimeError("Generated datasets are empty or inconsistent")
 
@@ -301,6 +1207,7 @@ def main():
         "generated_at": datetime.now(timezone.utc).isoformat(),
         "as_of": args.as_of.isoformat(),
         "window_days": args.days,
+        "half_life_days": args.half_life_days,
         "minimum_complete_matches": args.min_matches,
         "source": SOURCE_PAGE,
         "source_license": "MIT",
@@ -309,24 +1216,35 @@ def main():
                 "name": name,
                 "url": by_name[name]["url"],
                 "modified": by_name[name].get("mtime"),
-                "sha256": hashlib.sha256(blobs[name]).hexdigest(),
+                "sha256": sources[name].sha256,
+                "retrieved": sources[name].retrieved,
             }
             for name in wanted
         ],
-        "unique_matches": len(matches),
+        "unique_matches": match_count,
         "player_surface_rows": len(outputs["serve"]),
     }
+    # scripts/elo_baselines.py maintains the Elo ratings beside these files.
+    from data_loader import read_metadata
+    baselines = read_metadata(args.output_dir / "metadata.json").get("baselines")
+    if baselines:
+        metadata["baselines"] = baselines
 
     with tempfile.TemporaryDirectory() as temporary:
         staged = Path(temporary)
         write_outputs(outputs, staged, metadata)
         # Validate through the production loader before replacing reviewed files.
-        from data_loader import TennisDataLoader
+        from data_loader import TennisDataLoader, validate_loader
         loader = TennisDataLoader(str(staged))
-        if len(loader.get_all_players()) < 50:
-            raise RuntimeError("Refresh produced fewer than 50 usable players")
-        write_outputs(outputs, args.output_dir, metadata)
-    print(f"Wrote {len(outputs['serve'])} player/surface rows from {len(matches)} matches")
+        validate_loader(loader)
+        snapshot = loader.snapshot_bytes()
+        probability_table = None
+        if args.precompute_top:
+            probability_table = precompute_probabilities(loader, snapshot, args.precompute_top)
+        write_outputs(outputs, args.output_dir, metadata, snapshot, probability_table)
+    if store is not None:
+        store.save()
+    print(f"Wrote {len(outputs['serve'])} player/surface rows from {match_count} matches")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,147 @@
+"""Point-in-time player statistics from cumulative per-surface counters.
+
+``refresh_data.py --as-of D`` answers one date per run. This index is built
+once from the whole match history and answers any ``[D - window, D)`` with two
+binary searches and a subtraction per counter, returning the same stats dicts
+``TennisDataLoader`` would load from a refresh at ``D`` that saw only matches
+played before ``D``.
+"""
+
+from array import array
+from bisect import bisect_left
+from datetime import date, timedelta
+from itertools import accumulate
+import sys
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from data_loader import TennisDataLoader  # noqa: E402
+from scripts.refresh_data import (  # noqa: E402
+    COUNTER_FIELDS,
+    HEADERS,
+    SURFACES,
+    MatchTable,
+    build_rows,
+)
+
+
+class _Group:
+    """One (player, surface) history: dates plus prefix sums of every counter."""
+
+    __slots__ = ("dates", "prefix", "opponent_ranks", "ranks", "iocs")
+
+    def __init__(self, table: MatchTable, rows):
+        width = len(COUNTER_FIELDS)
+        self.dates = array("i", (table.date[row] for row in rows))
+        self.prefix = [
+            array("q", accumulate((table.counters[row * width + offset] for row in rows), initial=0))
+            for offset in range(width)
+        ]
+        self.opponent_ranks = array("i", (table.opponent_rank[row] for row in rows))
+        self.ranks = array("i", (table.rank[row] for row in rows))
+        self.iocs = array("H", (table.ioc[row] for row in rows))
+
+    def span(self, start: int, end: int) -> Tuple[int, int]:
+        return bisect_left(self.dates, start), bisect_left(self.dates, end)
+
+
+class PointInTimeIndex:
+    """Answer per-player, per-surface statistics for any as-of date.
+
+    Groups keep their rows in ``(date, source order)`` order, the order the
+    refresh job aggregates in, so the latest row in a window is the one that
+    sets the player's profile.
+    """
+
+    def __init__(self, table: MatchTable, window_days: int = 365, min_matches: int = 5):
+        self.table = table
+        self.window_days = window_days
+        self.min_matches = min_matches
+        rows_by_group = {}
+        for row in sorted(range(len(table)), key=table.date.__getitem__):
+            player = table.players[table.player[row]]
+            surface = SURFACES[table.surface[row]]
+            rows_by_group.setdefault((player, surface), []).append(row)
+            rows_by_group.setdefault((player, "all"), []).append(row)
+        self._groups = {key: _Group(table, rows) for key, rows in rows_by_group.items()}
+
+    @classmethod
+    def from_matches(cls, matches, window_days: int = 365, min_matches: int = 5):
+        return cls(MatchTable.from_matches(matches), window_days, min_matches)
+
+    def window(self, as_of: date) -> Tuple[int, int]:
+        """Date ordinals bounding ``[as_of - window_days, as_of)``."""
+        return (as_of - timedelta(days=self.window_days)).toordinal(), as_of.toordinal()
+
+    def totals(self, player: str, surface: str, as_of: date) -> Optional[Dict]:
+        """Summed counters for one group in the window, or ``None`` below ``min_matches``."""
+        group = self._groups.get((player, surface))
+        if group is None:
+            return None
+        low, high = group.span(*self.window(as_of))
+        stats = {
+            field: prefix[high] - prefix[low]
+            for field, prefix in zip(COUNTER_FIELDS, group.prefix)
+        }
+        if stats["matches"] < self.min_matches:
+            return None
+        stats["opponent_ranks"] = [rank for rank in group.opponent_ranks[low:high] if rank]
+        return stats
+
+    def profile(self, player: str, as_of: date) -> Optional[Dict]:
+        """Ranking and nationality from the player's latest match in the window."""
+        group = self._groups.get((player, "all"))
+        if group is None:
+            return None
+        low, high = group.span(*self.window(as_of))
+        if high == low:
+            return None
+        rank = group.ranks[high - 1]
+        return {
+            "ranking": None if rank == -1 else rank,
+            "ioc": self.table.iocs[group.iocs[high - 1]],
+            "date": date.fromordinal(group.dates[high - 1]).isoformat(),
+        }
+
+    def surface_stats(self, player: str, surface: str, as_of: date) -> Optional[Dict]:
+        """Loader stats dict for one source surface, or ``None`` if unavailable."""
+        totals = self.totals(player, surface, as_of)
+        if totals is None:
+            return None
+        profile = self.profile(player, as_of) or {}
+        outputs = build_rows({(player, surface): totals}, {player: profile})
+        rows = {kind: dict(zip(HEADERS[kind], outputs[kind][0])) for kind in outputs}
+        stats = TennisDataLoader.stats_from_rows(
+            rows["serve"], rows["return"], rows["breaks"], rows["more"]
+        )
+        if stats is not None:
+            stats["source_surface"] = surface
+        return stats
+
+    def get_player_stats(self, player: str, surface: str, as_of: date) -> Tuple[Dict, bool]:
+        """Mirror ``TennisDataLoader.get_player_stats`` as of ``as_of``.
+
+        The first of ``surface``, ``"all"``, ``"hard"`` with enough matches is
+        the source, as in the loader, and the same ``ValueError`` is raised
+        when the player or surface is unavailable.
+        """
+        if (player, "all") not in self._groups:
+            raise ValueError(f"Player {player} not found in data")
+        surface = surface.lower()
+        candidates = [surface] if surface == "all" else [surface, "all", "hard"]
+        for candidate in dict.fromkeys(candidates):
+            if self.totals(player, candidate, as_of) is not None:
+                stats = self.surface_stats(player, candidate, as_of)
+                if stats is None:
+                    break
+                return stats, candidate != surface
+        raise ValueError(f"Surface {surface} not available for player {player}")
+
+    def players(self):
+        return sorted({player for player, _ in self._groups})
+
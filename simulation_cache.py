@@ -0,0 +1,109 @@
+"""Bounded, thread-safe LRU cache for simulation results."""
+
+from collections import OrderedDict
+from collections.abc import Mapping
+import sys
+import threading
+
+
+def estimate_size(value) -> int:
+    """Approximate the resident bytes of a JSON-like value, shared objects once.
+
+    Plain objects such as dataclasses are followed through their attributes.
+    """
+    seen = set()
+    pending = [value]
+    total = 0
+    while pending:
+        item = pending.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, Mapping):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            pending.extend(item)
+        elif hasattr(item, "__dict__") and not isinstance(item, type):
+            pending.append(vars(item))
+    return total
+
+
+class BoundedLRUCache:
+    """Least-recently-used cache capped by entry count and estimated memory.
+
+    Every operation takes the cache's own lock, so it is safe to share across
+    the request threads of one gunicorn worker.
+    """
+
+    def __init__(self, max_entries=2000, max_bytes=16 * 1024 * 1024):
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("Cache limits must be positive")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = {}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._count_eviction("capacity")
+
+    def purge(self, predicate, reason):
+        """Drop every entry whose key satisfies ``predicate``; return the count."""
+        with self._lock:
+            doomed = [key for key in self._entries if predicate(key)]
+            for key in doomed:
+                _, size = self._entries.pop(key)
+                self._bytes -= size
+            if doomed:
+                self._count_eviction(reason, len(doomed))
+            return len(doomed)
+
+    def items(self):
+        with self._lock:
+            return [(key, value) for key, (value, _) in self._entries.items()]
+
+    def _count_eviction(self, reason, count=1):
+        self._evictions[reason] = self._evictions.get(reason, 0) + count
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "estimated_bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": dict(self._evictions),
+            }
@@ -541,3 +541,179 @@ class TennisSimulator:
             result_dict["observed_stats"] = observed_stats
             
         return result_dict
+
+    @classmethod
+    def serve_point_probability(cls, server_stats: Dict, returner_stats: Dict) -> float:
+        """
+        Probability that the server wins a point as simulate_point plays it.
+        Double faults only split the server's losses, so they do not change it.
+        """
+        first_serve_in = min(1.0, max(0.0, server_stats['first_serve_in_pct']))
+        first = cls._matchup_win_probability(
+            server_stats['first_serve_win_pct'],
+            returner_stats['vs_first_serve_win_pct'],
+            server_stats['dominance_ratio'],
+            returner_stats['dominance_ratio'],
+        )
+        second = cls._matchup_win_probability(
+            server_stats['second_serve_win_pct'],
+            returner_stats['vs_second_serve_win_pct'],
+            server_stats['dominance_ratio'],
+            returner_stats['dominance_ratio'],
+        )
+        return first_serve_in * first + (1.0 - first_serve_in) * second
+
+    @classmethod
+    def exact_match_probabilities(cls, p1_stats: Dict, p2_stats: Dict,
+                                  format_type: str = "best3") -> Dict:
+        """
+        The limit of run_monte_carlo_simulation as num_simulations grows:
+        player 1's win probability and the probability of each set score,
+        computed from the same point model without sampling.
+        """
+        p1_serve = cls.serve_point_probability(p1_stats, p2_stats)
+        p2_serve = cls.serve_point_probability(p2_stats, p1_stats)
+        # (p1 wins set, p1 serves next set) -> probability, per set starter.
+        set_outcomes = {}
+        for starter, (serve_a, serve_b) in ((1, (p1_serve, p2_serve)), (2, (p2_serve, p1_serve))):
+            outcomes = _set_outcomes(serve_a, serve_b)
+            set_outcomes[starter] = {
+                ((a_wins if starter == 1 else not a_wins), (a_next if starter == 1 else not a_next)): probability
+                for (a_wins, a_next), probability in outcomes.items()
+            }
+
+        sets_to_win = 3 if format_type == "best5" else 2
+        states = {(0, 0, 1): 0.5, (0, 0, 2): 0.5}
+        set_distributions = {}
+        while states:
+            next_states = {}
+            for (p1_sets, p2_sets, server), probability in states.items():
+                for (p1_wins, p1_next), outcome in set_outcomes[server].items():
+                    sets = (p1_sets + p1_wins, p2_sets + (not p1_wins))
+                    reached = probability * outcome
+                    if max(sets) == sets_to_win:
+                        key = f"{sets[0]}-{sets[1]}"
+                        set_distributions[key] = set_distributions.get(key, 0.0) + reached
+                    else:
+                        state = (*sets, 1 if p1_next else 2)
+                        next_states[state] = next_states.get(state, 0.0) + reached
+            states = next_states
+
+        p1_win_pct = sum(
+            probability for key, probability in set_distributions.items()
+            if int(key.split("-")[0]) == sets_to_win
+        )
+        return {
+            "player1_win_pct": p1_win_pct,
+            "player2_win_pct": 1.0 - p1_win_pct,
+            "set_distributions": set_distributions,
+        }
+
+    @classmethod
+    def expected_observed_stats(cls, p1_stats: Dict, p2_stats: Dict) -> Dict:
+        """
+        The limit of the observed_stats run_monte_carlo_simulation aggregates.
+        Every point is independent given its server, so each ratio converges
+        to the matching per-point probability.
+        """
+        observed = {}
+        lost_in_play = {}
+        for player, server, returner in (("player1", p1_stats, p2_stats), ("player2", p2_stats, p1_stats)):
+            first = cls._matchup_win_probability(
+                server['first_serve_win_pct'], returner['vs_first_serve_win_pct'],
+                server['dominance_ratio'], returner['dominance_ratio'],
+            )
+            second = cls._matchup_win_probability(
+                server['second_serve_win_pct'], returner['vs_second_serve_win_pct'],
+                server['dominance_ratio'], returner['dominance_ratio'],
+            )
+            double_fault = min(max(0.0, server['double_fault_per_second_serve']), 1.0 - second)
+            observed[player] = {
+                'first_serve_in_pct': min(1.0, max(0.0, server['first_serve_in_pct'])),
+                'first_serve_win_pct': first,
+                'second_serve_in_pct': 1.0 - double_fault,
+                'second_serve_win_pct': second,
+                'break_point_save_pct': cls.serve_point_probability(server, returner),
+                'double_fault_per_second_serve': double_fault,
+            }
+            lost_in_play[player] = 1.0 - second - double_fault
+        for player, opponent in (("player1", "player2"), ("player2", "player1")):
+            observed[player].update({
+                'vs_first_serve_win_pct': 1.0 - observed[opponent]['first_serve_win_pct'],
+                # Double faults are not counted as return points won.
+                'vs_second_serve_win_pct': lost_in_play[opponent],
+                'break_point_conversion_pct': 1.0 - observed[opponent]['break_point_save_pct'],
+            })
+        return observed
+
+
+def _hold_probability(serve: float) -> float:
+    """Probability that a server winning each point with ``serve`` holds."""
+    lose = 1.0 - serve
+    deuce = serve * serve / (serve * serve + lose * lose) if serve * serve + lose * lose else 0.5
+    return (
+        serve ** 4 * (1.0 + 4.0 * lose + 10.0 * lose * lose)
+        + 20.0 * (serve * lose) ** 3 * deuce
+    )
+
+
+def _tiebreak_probability(serve_a: float, serve_b: float) -> float:
+    """Probability that the tiebreak's first server, A, wins it."""
+    # Point 0 is A's, then each player serves two points in turn.
+    def a_wins_point(points):
+        serving_b = points > 0 and ((points - 1) // 2) % 2 == 0
+        return 1.0 - serve_b if serving_b else serve_a
+
+    # From 6-6 each pair of points has one serve each.
+    a_pair = serve_a * (1.0 - serve_b)
+    b_pair = (1.0 - serve_a) * serve_b
+    from_six_all = a_pair / (a_pair + b_pair) if a_pair + b_pair else 0.5
+
+    reach = {(0, 0): 1.0}
+    won = 0.0
+    for points in range(12):
+        for (a, b), probability in list(reach.items()):
+            if a + b != points:
+                continue
+            del reach[(a, b)]
+            win = a_wins_point(points)
+            for state, step in (((a + 1, b), win), ((a, b + 1), 1.0 - win)):
+                if state[0] == 7:
+                    won += probability * step
+                elif state[1] < 7:
+                    reach[state] = reach.get(state, 0.0) + probability * step
+    return won + reach.get((6, 6), 0.0) * from_six_all
+
+
+def _set_outcomes(serve_a: float, serve_b: float) -> Dict[Tuple[bool, bool], float]:
+    """
+    Outcomes of a set A serves first, as simulate_set plays it:
+    (A wins the set, A serves the next set) -> probability.
+    """
+    hold_a = _hold_probability(serve_a)
+    hold_b = _hold_probability(serve_b)
+    outcomes = {}
+
+    def add(key, probability):
+        outcomes[key] = outcomes.get(key, 0.0) + probability
+
+    reach = {(0, 0): 1.0}
+    for games in range(12):
+        a_serving = games % 2 == 0
+        win = hold_a if a_serving else 1.0 - hold_b
+        for (a, b), probability in list(reach.items()):
+            if a + b != games:
+                continue
+            del reach[(a, b)]
+            for (next_a, next_b), step in (((a + 1, b), win), ((a, b + 1), 1.0 - win)):
+                if max(next_a, next_b) >= 6 and abs(next_a - next_b) >= 2:
+                    # The player who did not serve the last game starts the next set.
+                    add((next_a > next_b, not a_serving), probability * step)
+                else:
+                    reach[(next_a, next_b)] = reach.get((next_a, next_b), 0.0) + probability * step
+    # Game 12 was B's, so A starts the tiebreak and B the next set.
+    tiebreak = reach.get((6, 6), 0.0)
+    a_wins_tiebreak = _tiebreak_probability(serve_a, serve_b)
+    add((True, False), tiebreak * a_wins_tiebreak)
+    add((False, False), tiebreak * (1.0 - a_wins_tiebreak))
+    return outcomes
@@ -1,7 +1,12 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
 import random
 from typing import Callable, Dict, Optional
 
+from baselines import baseline_comparison
 from data_loader import TennisDataLoader
+from result_store import canonical_request_key
 from simulation_engine import TennisSimulator
 
 
@@ -85,10 +90,79 @@ def _input_parameters(stats: Dict) -> Dict:
     }
 
 
-def run_simulation_request(payload: Dict, loader: TennisDataLoader,
-                           progress_callback: Optional[Callable] = None,
-                           market_odds_provider: Optional[Callable] = None) -> Dict:
-    request_data = validate_request(payload)
+def input_fingerprint(request_data: Dict, loader: TennisDataLoader) -> str:
+    """Hash every loader value the engine reads for a validated request.
+
+    This is both players' ``_input_parameters`` plus the dominance ratio, which
+    the point model also uses, so equal fingerprints mean equal simulations.
+    """
+    inputs = {}
+    for surface in request_data["surfaces"]:
+        player1_stats, _ = loader.get_player_stats(request_data["player1"], surface)
+        player2_stats, _ = loader.get_player_stats(request_data["player2"], surface)
+        inputs[surface] = [
+            {**_input_parameters(stats), "dominance_ratio": stats["dominance_ratio"]}
+            for stats in (player1_stats, player2_stats)
+        ]
+    return canonical_request_key({
+        "format": request_data["format"],
+        "num_simulations": request_data["num_simulations"],
+        "inputs": inputs,
+    })
+
+
+def _precomputed_cell(request_data: Dict, loader: TennisDataLoader, surface: str) -> Optional[Dict]:
+    table = getattr(loader, "probability_table", None)
+    if table is None:
+        return None
+    return table.lookup(
+        request_data["player1"], request_data["player2"], surface, request_data["format"]
+    )
+
+
+def is_precomputed(request_data: Dict, loader: TennisDataLoader) -> bool:
+    """Whether the loader's probability table answers every requested surface."""
+    return all(
+        _precomputed_cell(request_data, loader, surface) is not None
+        for surface in request_data["surfaces"]
+    )
+
+
+def _precomputed_results(cell: Dict, player1_stats: Dict, player2_stats: Dict,
+                         num_simulations: int, seed: int) -> Dict:
+    """Shape an exact table cell like ``run_monte_carlo_simulation`` output.
+
+    Counts are the expected counts over ``num_simulations`` matches, rounded
+    so they still add up, and the interval collapses to the exact probability.
+    """
+    probability = cell["player1_win_pct"]
+    expected = {
+        score: share * num_simulations for score, share in cell["set_distributions"].items()
+    }
+    counts = {score: int(value) for score, value in expected.items()}
+    by_remainder = sorted(expected, key=lambda score: counts[score] - expected[score])
+    for score in by_remainder[:num_simulations - sum(counts.values())]:
+        counts[score] += 1
+    player1_wins = sum(
+        count for score, count in counts.items()
+        if int(score.split("-")[0]) > int(score.split("-")[1])
+    )
+    return {
+        "player1_wins": player1_wins,
+        "player2_wins": num_simulations - player1_wins,
+        "player1_win_pct": probability,
+        "player2_win_pct": 1.0 - probability,
+        "player1_win_ci95": [probability, probability],
+        "set_distributions": {score: count for score, count in counts.items() if count},
+        "total_simulations": num_simulations,
+        "seed": seed,
+        "observed_stats": TennisSimulator.expected_observed_stats(player1_stats, player2_stats),
+        "precomputed": True,
+    }
+
+
+def _simulate(request_data: Dict, loader: TennisDataLoader,
+              progress_callback: Optional[Callable] = None) -> Dict:
     surfaces = request_data["surfaces"]
     num_simulations = request_data["num_simulations"]
     all_results = {}
@@ -111,15 +185,22 @@ def run_simulation_request(payload: Dict, loader: TennisDataLoader,
                 )
 
         surface_seed = (request_data["seed"] + surface_index) % (2**63)
-        results = TennisSimulator().run_monte_carlo_simulation(
-            player1_stats,
-            player2_stats,
-            request_data["format"],
-            num_simulations,
-            surface_progress if progress_callback else None,
-            track_detailed_stats=True,
-            seed=surface_seed,
-        )
+        cell = _precomputed_cell(request_data, loader, surface)
+        if cell is not None:
+            results = _precomputed_results(
+                cell, player1_stats, player2_stats, num_simulations, surface_seed
+            )
+            surface_progress(num_simulations, num_simulations)
+        else:
+            results = TennisSimulator().run_monte_carlo_simulation(
+                player1_stats,
+                player2_stats,
+                request_data["format"],
+                num_simulations,
+                surface_progress if progress_callback else None,
+                track_detailed_stats=True,
+                seed=surface_seed,
+            )
         all_results[surface] = {
             **results,
             "fallback_warnings": warnings,
@@ -130,7 +211,7 @@ def run_simulation_request(payload: Dict, loader: TennisDataLoader,
         }
         all_warnings.extend(warning for warning in warnings if warning)
 
-    response = {
+    return {
         "surfaces": all_results,
         "player1_name": request_data["player1"],
         "player2_name": request_data["player2"],
@@ -140,10 +221,60 @@ def run_simulation_request(payload: Dict, loader: TennisDataLoader,
         "seed": request_data["seed"],
         "fallback_warnings": list(dict.fromkeys(all_warnings)),
     }
+
+
+def run_simulation_request(payload: Dict, loader: TennisDataLoader,
+                           progress_callback: Optional[Callable] = None,
+                           market_odds_provider: Optional[Callable] = None,
+                           result_cache=None) -> Dict:
+    """Validate and run one request.
+
+    Surfaces the loader's probability table covers are answered from it
+    without simulating, and a request it covers entirely skips the cache.
+    Otherwise only requests with an explicit seed are deterministic, so only
+    those are read from or written to ``result_cache`` (keyed by the loader's
+    data version and the canonical request). Each cached record keeps its
+    input fingerprint, which is checked on every read, so it can outlive a
+    data refresh that left its players unchanged but is never served for
+    other inputs. The market comparison and Elo/ranking baselines are always
+    live.
+    """
+    request_data = validate_request(payload)
+    record = None
+    request_key = None
+    fingerprint = None
+    if (result_cache is not None and payload.get("seed") is not None
+            and not is_precomputed(request_data, loader)):
+        request_key = canonical_request_key(request_data)
+        fingerprint = input_fingerprint(request_data, loader)
+        record = result_cache.get(loader.data_version, request_key)
+        # The same data version can be served with raw or opponent-adjusted
+        # rates, so a record simulated from other inputs is recomputed.
+        if record is not None and record.get("fingerprint") != fingerprint:
+            record = None
+    if record is None:
+        record = {
+            "request": request_data,
+            "fingerprint": fingerprint,
+            "response": _simulate(request_data, loader, progress_callback),
+        }
+        if request_key is not None:
+            result_cache.put(loader.data_version, request_key, record)
+    response = dict(record["response"])
+    ratings = getattr(loader, "baselines", None)
+    if ratings is not None:
+        rankings = tuple(
+            loader.get_player_stats(request_data[player], request_data["surfaces"][0])[0].get("ranking")
+            for player in ("player1", "player2")
+        )
+        response["baselines"] = baseline_comparison(
+            ratings, request_data["player1"], request_data["player2"],
+            request_data["surfaces"], rankings,
+        )
     if market_odds_provider:
         model_probabilities = {
             surface: results["player1_win_pct"]
-            for surface, results in all_results.items()
+            for surface, results in response["surfaces"].items()
         }
         try:
             response["market_comparison"] = market_odds_provider(
@@ -158,3 +289,58 @@ def run_simulation_request(payload: Dict, loader: TennisDataLoader,
                 "notice": "Prediction-market comparison is temporarily unavailable.",
             }
     return response
+
+
+def unchanged_inputs(loader: TennisDataLoader) -> Callable[[Dict], bool]:
+    """Predicate for ``TieredResultCache`` records still valid under ``loader``."""
+    def unchanged(record: Dict) -> bool:
+        try:
+            return record["fingerprint"] == input_fingerprint(record["request"], loader)
+        except (KeyError, ValueError):
+            return False
+    return unchanged
+
+
+_pool_loader = None
+
+
+def _initialize_pool_worker(loader: TennisDataLoader) -> None:
+    global _pool_loader
+    _pool_loader = loader
+
+
+def _run_pooled_request(payload: Dict) -> Dict:
+    return run_simulation_request(payload, _pool_loader)
+
+
+def _pool_worker_ready() -> bool:
+    return _pool_loader is not None
+
+
+class SimulationPool:
+    """Shared process pool that runs simulation requests off the web threads.
+
+    Each worker receives one copy of the loader when it starts, so submitted
+    jobs only carry the small request payload across the process boundary.
+    """
+
+    def __init__(self, loader: TennisDataLoader, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # Spawned workers avoid forking a multi-threaded gunicorn process.
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialize_pool_worker,
+            initargs=(loader,),
+        )
+
+    def start(self) -> None:
+        """Spawn every worker now so the first real request does not wait."""
+        for future in [self._executor.submit(_pool_worker_ready) for _ in range(self.max_workers)]:
+            future.result()
+
+    def submit(self, payload: Dict):
+        return self._executor.submit(_run_pooled_request, payload)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
@@ -3,6 +3,9 @@
  * Uses simple fetch API instead of WebSockets
  */
 
+// Matches per streamed simulation request; upcoming_service.MAX_BATCH_SIMULATIONS.
+const MAX_BATCH_SIMULATIONS = 200;
+
 class TennisSimulator {
     constructor() {
         this.players = [];
@@ -600,39 +603,62 @@ class TennisSimulator {
     }
 
     async loadDashboardSimulations(tasks, generation, viewGeneration) {
-        let nextIndex = 0;
-        const worker = async () => {
-            while (
-                nextIndex < tasks.length &&
-                generation === this.dashboardGeneration &&
-                viewGeneration === this.dashboardViewGeneration
-            ) {
-                const task = tasks[nextIndex++];
-                try {
-                    const response = await fetch(`/api/upcoming/${encodeURIComponent(task.match.id)}/simulation`);
-                    const data = await response.json();
-                    if (!response.ok || data.error) throw new Error(data.error || 'Simulation unavailable');
-                    if (
-                        generation === this.dashboardGeneration &&
-                        viewGeneration === this.dashboardViewGeneration
-                    ) this.renderDashboardSimulation(task.target, data);
-                } catch (error) {
-                    if (
-                        generation === this.dashboardGeneration &&
-                        viewGeneration === this.dashboardViewGeneration
-                    ) {
-                        task.target.modelCells.forEach(cell => {
-                            cell.classList.remove('simulation-pending');
-                            cell.textContent = '—';
-                            cell.setAttribute('aria-label', 'Simulation unavailable');
-                        });
-                        task.target.footer.classList.add('dashboard-simulation-unavailable');
-                        task.target.footer.textContent = 'Simulation unavailable.';
+        if (tasks.length === 0) return;
+        const isCurrent = () => (
+            generation === this.dashboardGeneration &&
+            viewGeneration === this.dashboardViewGeneration
+        );
+        const pending = new Map(tasks.map(task => [task.match.id, task.target]));
+        const markUnavailable = target => {
+            target.modelCells.forEach(cell => {
+                cell.classList.remove('simulation-pending');
+                cell.textContent = '—';
+                cell.setAttribute('aria-label', 'Simulation unavailable');
+            });
+            target.footer.classList.add('dashboard-simulation-unavailable');
+            target.footer.textContent = 'Simulation unavailable.';
+        };
+        const handleLine = line => {
+            if (!line.trim()) return;
+            const item = JSON.parse(line);
+            const target = pending.get(item.id);
+            if (!target || !isCurrent()) return;
+            pending.delete(item.id);
+            if (item.simulation) this.renderDashboardSimulation(target, item.simulation);
+            else markUnavailable(target);
+        };
+
+        // Streamed requests of up to MAX_BATCH_SIMULATIONS matches fill the
+        // dashboard; each NDJSON line is rendered as soon as the server
+        // finishes that match.
+        const ids = tasks.map(task => task.match.id);
+        for (let start = 0; start < ids.length; start += MAX_BATCH_SIMULATIONS) {
+            try {
+                const batch = ids.slice(start, start + MAX_BATCH_SIMULATIONS).join(',');
+                const response = await fetch(`/api/upcoming/simulations/stream?ids=${encodeURIComponent(batch)}`);
+                if (!response.ok || !response.body) throw new Error('Simulations unavailable');
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffered = '';
+                while (true) {
+                    const {done, value} = await reader.read();
+                    if (done) break;
+                    if (!isCurrent()) {
+                        reader.cancel();
+                        return;
                     }
+                    buffered += decoder.decode(value, {stream: true});
+                    const lines = buffered.split('\n');
+                    buffered = lines.pop();
+                    lines.forEach(handleLine);
                 }
+                handleLine(buffered + decoder.decode());
+            } catch (error) {
+                console.error('Failed to load dashboard simulations:', error);
             }
-        };
-        await Promise.all([worker(), worker()]);
+            if (!isCurrent()) return;
+        }
+        pending.forEach(markUnavailable);
     }
 
     renderDashboardSimulation(target, data) {
@@ -1029,10 +1055,16 @@ class TennisSimulator {
 
             // Update win records
             const [p1Low, p1High] = surfaceData.player1_win_ci95;
-            results.player1Record.textContent =
-                `${surfaceData.player1_wins} wins · 95% MC CI ${(p1Low * 100).toFixed(1)}–${(p1High * 100).toFixed(1)}%`;
-            results.player2Record.textContent =
-                `${surfaceData.player2_wins} wins · 95% MC CI ${((1 - p1High) * 100).toFixed(1)}–${((1 - p1Low) * 100).toFixed(1)}%`;
+            if (surfaceData.precomputed) {
+                // Precomputed cells are exact, so there is no sampling interval.
+                results.player1Record.textContent = `${surfaceData.player1_wins} expected wins · exact`;
+                results.player2Record.textContent = `${surfaceData.player2_wins} expected wins · exact`;
+            } else {
+                results.player1Record.textContent =
+                    `${surfaceData.player1_wins} wins · 95% MC CI ${(p1Low * 100).toFixed(1)}–${(p1High * 100).toFixed(1)}%`;
+                results.player2Record.textContent =
+                    `${surfaceData.player2_wins} wins · 95% MC CI ${((1 - p1High) * 100).toFixed(1)}–${((1 - p1Low) * 100).toFixed(1)}%`;
+            }
 
             // Create mini chart for this surface
             this.createSurfaceChart(surface, surfaceData.set_distributions);
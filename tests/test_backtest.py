@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+from pathlib import Path
+import random
+import tempfile
+import unittest
+
+from scripts.backtest import completed, plan_matches, read_results, run_backtest, write_results
+from scripts.refresh_data import read_matches
+from scripts.stats_index import PointInTimeIndex
+from tests.test_refresh_data import synthetic_blob
+
+
+class WalkForwardBacktestTests(unittest.TestCase):
+    def setUp(self):
+        blob = synthetic_blob(random.Random(46), date(2025, 1, 1), 300, 500)
+        self.matches = read_matches({"history.csv": blob}, date(2025, 1, 1))
+        self.index = PointInTimeIndex.from_matches(self.matches)
+        self.start, self.end = date(2025, 7, 1), date(2025, 10, 27)
+
+    def test_inputs_use_only_earlier_days(self):
+        results, tasks, skipped = plan_matches(self.matches, self.index, self.start, self.end, 10)
+        eligible = [
+            row for match_date, row in self.matches
+            if self.start <= match_date <= self.end and completed(row)
+        ]
+        self.assertEqual(len(results) + skipped, len(eligible))
+        self.assertGreater(len(results), 50)
+        self.assertEqual([result["date"] for result in results], sorted(result["date"] for result in results))
+
+        first, (stats1, _, _, _, _) = results[0], tasks[0]
+        match_date = date.fromisoformat(first["date"])
+        # Matches on the day itself, including this one, must not change the inputs.
+        earlier = PointInTimeIndex.from_matches(
+            [(day, row) for day, row in self.matches if day < match_date]
+        )
+        self.assertEqual(earlier.get_player_stats(first["player1"], first["surface"], match_date)[0], stats1)
+        self.assertIn(first["player1_won"], (0, 1))
+        self.assertLess(first["player1"], first["player2"])
+
+    def test_results_do_not_depend_on_worker_count(self):
+        end = self.start + timedelta(days=20)
+        serial, skipped = run_backtest(self.matches, self.start, end, 20, seed=7, workers=1, index=self.index)
+        parallel, _ = run_backtest(self.matches, self.start, end, 20, seed=7, workers=2, index=self.index)
+        self.assertEqual(serial, parallel)
+        self.assertTrue(all(0 <= result["player1_win_probability"] <= 1 for result in serial))
+        self.assertTrue(all(0 < result["elo_probability"] < 1 for result in serial))
+        reseeded, _ = run_backtest(self.matches, self.start, end, 20, seed=8, workers=1, index=self.index)
+        self.assertNotEqual([result["seed"] for result in serial], [result["seed"] for result in reseeded])
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / "results.csv.gz"
+        write_results(serial, path)
+        first_bytes = path.read_bytes()
+        rows = read_results(path)
+        self.assertEqual(len(rows), len(serial))
+        self.assertEqual(float(rows[0]["player1_win_probability"]), serial[0]["player1_win_probability"])
+        write_results(parallel, path)
+        self.assertEqual(path.read_bytes(), first_bytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+from datetime import date
+import hashlib
+from pathlib import Path
+import random
+import shutil
+import tempfile
+import unittest
+
+from baselines import (
+    BASELINES_FILE,
+    EloRatings,
+    dump_checkpoints,
+    k_factor,
+    latest_checkpoint,
+    load_checkpoints,
+    ranking_probability,
+)
+from data_loader import TennisDataLoader, read_metadata
+from scripts.elo_baselines import update_checkpoints
+from scripts.refresh_data import read_matches, write_metadata
+from simulation_service import run_simulation_request
+from tests.test_refresh_data import synthetic_blob
+
+
+def record_baselines(data_dir, blob):
+    """Write ``blob`` as the Elo ratings and record its checksum in metadata.json."""
+    (data_dir / BASELINES_FILE).write_bytes(blob)
+    metadata = read_metadata(data_dir / "metadata.json")
+    metadata["baselines"] = {"file": BASELINES_FILE, "sha256": hashlib.sha256(blob).hexdigest()}
+    write_metadata(metadata, data_dir)
+
+
+class EloRatingsTests(unittest.TestCase):
+    def setUp(self):
+        blob = synthetic_blob(random.Random(48), date(2024, 1, 1), 700, 1500)
+        self.matches = read_matches({"history.csv": blob}, date(2024, 1, 1))
+
+    def test_update_moves_overall_and_surface_ratings(self):
+        ratings = EloRatings()
+        self.assertEqual(ratings.update("A", "B", "clay"), (0.5, 0.5))
+        step = k_factor(0) * 0.5
+        self.assertAlmostEqual(ratings.rating("A"), 1500 + step)
+        self.assertAlmostEqual(ratings.rating("B", "clay"), 1500 - step)
+        self.assertEqual(ratings.rating("A", "grass"), 1500)
+        elo, surface_elo = ratings.update("B", "A", "carpet")
+        self.assertLess(elo, 0.5)
+        self.assertIsNone(surface_elo)
+        self.assertGreater(ratings.probabilities("A", "B", "clay")["surface_elo"], 0.5)
+        self.assertIsNone(ratings.probabilities("A", "Nobody", "clay")["elo"])
+        self.assertAlmostEqual(ranking_probability(10, 30), 0.75)
+        self.assertIsNone(ranking_probability(None, 30))
+
+    def test_resuming_from_a_checkpoint_matches_one_pass(self):
+        through = date(2025, 11, 30)
+        full = EloRatings()
+        emitted = full.advance(self.matches, through)
+        self.assertEqual(len(emitted), len(self.matches))
+        self.assertEqual([item[0] for item in emitted], sorted(item[0] for item in emitted))
+
+        settled, latest, replayed = update_checkpoints([], self.matches, through, settle_days=90)
+        self.assertEqual(settled.through, date(2025, 9, 1))
+        self.assertEqual(latest.overall, full.overall)
+        resumed = update_checkpoints([settled], self.matches, through, settle_days=90)[1]
+        self.assertEqual(resumed.overall, full.overall)
+        self.assertEqual(resumed.surface, full.surface)
+        self.assertEqual(replayed, emitted)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / BASELINES_FILE
+        path.write_bytes(dump_checkpoints([latest, settled]))
+        stored = load_checkpoints(path)
+        self.assertEqual([ratings.through for ratings in stored], [settled.through, latest.through])
+        self.assertIs(latest_checkpoint(stored, date(2025, 10, 1)), stored[0])
+        restored = stored[1]
+        self.assertEqual(restored.players, latest.players)
+        for player in latest.players[:5]:
+            for surface in (None, "hard", "clay", "grass"):
+                self.assertAlmostEqual(restored.rating(player, surface), latest.rating(player, surface), places=2)
+        self.assertEqual(load_checkpoints(path.with_name("missing.json")), [])
+
+    def test_simulation_response_includes_loaded_baselines(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        data_dir = Path(directory.name) / "data"
+        shutil.copytree(TennisDataLoader().data_dir, data_dir)
+        self.assertIsNone(TennisDataLoader(str(data_dir)).baselines)
+
+        player1, player2 = [player["name"] for player in TennisDataLoader(str(data_dir)).get_all_players()[:2]]
+        ratings = EloRatings(date(2025, 6, 1))
+        ratings.update(player1, player2, "hard")
+        record_baselines(data_dir, dump_checkpoints([ratings]))
+        loader = TennisDataLoader(str(data_dir))
+        response = run_simulation_request({
+            "player1": player1, "player2": player2, "format": "best3",
+            "num_simulations": 10, "surfaces": ["hard", "clay"], "seed": 1,
+        }, loader)
+        baselines = response["baselines"]
+        self.assertEqual(baselines["through"], "2025-06-01")
+        self.assertGreater(baselines["surfaces"]["hard"]["surface_elo"], 0.5)
+        self.assertEqual(baselines["surfaces"]["clay"]["surface_elo"], 0.5)
+        self.assertEqual(baselines["surfaces"]["hard"]["elo"], baselines["surfaces"]["clay"]["elo"])
+        self.assertIsNotNone(baselines["surfaces"]["hard"]["ranking"])
+
+    def test_unreadable_or_unrecorded_ratings_are_ignored(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        data_dir = Path(directory.name) / "data"
+        shutil.copytree(TennisDataLoader().data_dir, data_dir)
+        blob = dump_checkpoints([EloRatings(date(2025, 6, 1))])
+        path = data_dir / BASELINES_FILE
+        path.write_bytes(blob)
+        # Ratings must be recorded in metadata.json to be trusted.
+        self.assertIsNone(TennisDataLoader(str(data_dir)).baselines)
+
+        record_baselines(data_dir, blob)
+        # Truncated after it was recorded, then corrupt but recorded as such.
+        path.write_bytes(blob[:len(blob) // 2])
+        self.assertIsNone(TennisDataLoader(str(data_dir)).baselines)
+        for corrupt in (blob[:len(blob) // 2], b'{"format_version": 99}', b'{"format_version": 1}'):
+            record_baselines(data_dir, corrupt)
+            self.assertIsNone(TennisDataLoader(str(data_dir)).baselines)
+        record_baselines(data_dir, blob)
+        self.assertEqual(TennisDataLoader(str(data_dir)).baselines.through, date(2025, 6, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,11 @@
+import json
 import os
+from pathlib import Path
+import shutil
 import tempfile
 import unittest
 
-from data_loader import TennisDataLoader
+from data_loader import SNAPSHOT_FILE, TennisDataLoader
 
 
 class DataLoaderTests(unittest.TestCase):
@@ -31,6 +34,35 @@ class DataLoaderTests(unittest.TestCase):
         self.assertEqual(stats["source_surface"], "all")
         self.assertIn("all-surface", loader.get_fallback_warning(candidate, "grass"))
 
+    def test_binary_snapshot_matches_csv_load(self):
+        from_csv = TennisDataLoader(use_snapshot=False)
+        from_snapshot = TennisDataLoader()
+        self.assertEqual((from_csv.source, from_snapshot.source), ("csv", "snapshot"))
+        self.assertEqual(from_snapshot.player_data, from_csv.player_data)
+        self.assertEqual(from_snapshot.fallback_sources, from_csv.fallback_sources)
+        stats = next(iter(next(iter(from_csv.player_data.values())).values()))
+        self.assertEqual(set(stats) - {"source_surface"}, set(TennisDataLoader.STAT_FIELDS))
+
+    def test_stale_snapshot_falls_back_to_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            data_dir = Path(directory)
+            source_dir = Path(TennisDataLoader().data_dir)
+            for path in source_dir.iterdir():
+                shutil.copy(path, data_dir / path.name)
+            (data_dir / SNAPSHOT_FILE).write_bytes(b"TSNP" + b"\0" * 64)
+            self.assertEqual(TennisDataLoader(str(data_dir)).source, "csv")
+
+            shutil.copy(source_dir / SNAPSHOT_FILE, data_dir / SNAPSHOT_FILE)
+            self.assertEqual(TennisDataLoader(str(data_dir)).source, "snapshot")
+            serve = data_dir / TennisDataLoader.FILES["serve"]
+            serve.write_text(serve.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+            self.assertEqual(TennisDataLoader(str(data_dir)).source, "csv")
+
+            metadata = json.loads((data_dir / "metadata.json").read_text(encoding="utf-8"))
+            metadata.pop("snapshot")
+            (data_dir / "metadata.json").write_text(json.dumps(metadata), encoding="utf-8")
+            self.assertEqual(TennisDataLoader(str(data_dir)).source, "csv")
+
     def test_missing_percentage_is_preserved(self):
         self.assertIsNone(TennisDataLoader.clean_percentage(""))
         self.assertIsNone(TennisDataLoader.clean_percentage("-"))
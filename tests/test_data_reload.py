@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+import shutil
+import tempfile
+import unittest
+
+from data_loader import TennisDataLoader
+from data_reload import DataReloader
+
+
+class DataReloaderTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.data_dir = Path(directory.name)
+        for path in TennisDataLoader().data_dir.iterdir():
+            shutil.copy(path, self.data_dir / path.name)
+        self.loader = TennisDataLoader(str(self.data_dir))
+
+    def write_metadata(self, **changes):
+        path = self.data_dir / "metadata.json"
+        metadata = json.loads(path.read_text(encoding="utf-8"))
+        metadata.update(changes)
+        path.write_text(json.dumps(metadata), encoding="utf-8")
+
+    def wait_for(self, reloader):
+        reloader._reload_thread.join(10)
+
+    def test_changed_metadata_swaps_in_a_validated_loader(self):
+        swaps = []
+        reloader = DataReloader(
+            self.loader, on_swap=[lambda new, old: swaps.append((new, old))]
+        )
+        self.assertFalse(reloader.check_for_update())
+
+        held = reloader.loader
+        self.write_metadata(as_of="2026-08-11")
+        self.assertTrue(reloader.check_for_update())
+        self.wait_for(reloader)
+
+        self.assertEqual(reloader.loader.data_version, "2026-08-11")
+        self.assertEqual(swaps, [(reloader.loader, held)])
+        # A request that captured the old loader keeps its snapshot.
+        self.assertEqual(held.data_version, self.loader.data_version)
+        self.assertEqual(reloader.status()["reloads"], 1)
+        self.assertFalse(reloader.check_for_update())
+
+    def test_snapshot_failing_validation_keeps_the_old_loader(self):
+        swaps = []
+        reloader = DataReloader(
+            self.loader, on_swap=[lambda new, old: swaps.append(new)]
+        )
+        serve = self.data_dir / TennisDataLoader.FILES["serve"]
+        header, *rows = serve.read_text(encoding="utf-8").splitlines()
+        serve.write_text("\n".join([header, *rows[:20]]) + "\n", encoding="utf-8")
+        self.write_metadata(as_of="2026-08-11")
+
+        self.assertTrue(reloader.check_for_update())
+        self.wait_for(reloader)
+        self.assertIs(reloader.loader, self.loader)
+        self.assertEqual(swaps, [])
+        self.assertIn("fewer than 50 usable players", reloader.status()["last_error"])
+        # The same bad snapshot is not reloaded on every poll.
+        self.assertFalse(reloader.check_for_update())
+        self.write_metadata(as_of="2026-08-12")
+        self.assertTrue(reloader.check_for_update())
+        self.wait_for(reloader)
+
+    def test_failing_preparation_commits_nothing(self):
+        committed = []
+
+        def prepare_then_commit(new, old):
+            return lambda: committed.append(new)
+
+        def failing(new, old):
+            raise RuntimeError("pool failed to start")
+
+        reloader = DataReloader(self.loader, on_swap=[prepare_then_commit, failing])
+        self.write_metadata(as_of="2026-08-11")
+        self.assertFalse(reloader.reload())
+        self.assertIs(reloader.loader, self.loader)
+        self.assertEqual(committed, [])
+
+        reloader.on_swap.pop()
+        self.assertTrue(reloader.reload())
+        self.assertEqual(committed, [reloader.loader])
+        self.assertEqual(reloader.loader.data_version, "2026-08-11")
+
+
+if __name__ == "__main__":
+    unittest.main()
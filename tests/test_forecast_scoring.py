@@ -0,0 +1,95 @@
+from datetime import date
+import json
+import math
+from pathlib import Path
+import random
+import tempfile
+import unittest
+
+from scripts.backtest import run_backtest, write_results
+from scripts.forecast_scoring import (
+    POISSON_WEIGHTS,
+    bootstrap_means,
+    forecast_report,
+    render_html,
+    report_backtest,
+    score_forecasts,
+)
+from scripts.refresh_data import read_matches
+from tests.test_refresh_data import synthetic_blob
+
+
+class ForecastScoringTests(unittest.TestCase):
+    def test_metrics_and_calibration_match_direct_formulas(self):
+        probabilities = [0.8, 0.3, 0.5, 0.9, 0.05]
+        outcomes = [1, 0, 1, 0, 0]
+        scores = score_forecasts(probabilities, outcomes, bins=4, resamples=0)
+        realized = [0.8, 0.7, 0.5, 0.1, 0.95]
+        self.assertAlmostEqual(scores["log_loss"], sum(-math.log(p) for p in realized) / 5)
+        self.assertAlmostEqual(scores["brier"], sum((1 - p) ** 2 for p in realized) / 5)
+        self.assertAlmostEqual(scores["accuracy"], 3.5 / 5)
+        self.assertIsNone(scores["log_loss_ci95"])
+        self.assertEqual(
+            [(row["bin_low"], row["count"], row["observed_rate"]) for row in scores["calibration"]],
+            [(0.0, 1, 0.0), (0.25, 1, 0.0), (0.5, 1, 1.0), (0.75, 2, 0.5)],
+        )
+        with self.assertRaises(ValueError):
+            score_forecasts([0.5, 1.2], [0, 1])
+        with self.assertRaises(ValueError):
+            score_forecasts([0.5], [2])
+
+    def test_poisson_bootstrap_is_seeded_and_covers_the_mean(self):
+        self.assertAlmostEqual(sum(POISSON_WEIGHTS) / 256, 1.0, places=2)
+        rng = random.Random(47)
+        probabilities = [rng.random() for _ in range(400)]
+        outcomes = [int(rng.random() < p) for p in probabilities]
+        scores = score_forecasts(probabilities, outcomes, resamples=300, seed=1)
+        self.assertEqual(scores, score_forecasts(probabilities, outcomes, resamples=300, seed=1))
+        for metric in ("log_loss", "brier", "accuracy"):
+            low, high = scores[f"{metric}_ci95"]
+            self.assertLess(low, scores[metric])
+            self.assertGreater(high, scores[metric])
+        # Roughly the analytic standard error of the mean.
+        means = bootstrap_means([[float(o) for o in outcomes]], 400, seed=2)[0]
+        rate = sum(outcomes) / len(outcomes)
+        stderr = math.sqrt(rate * (1 - rate) / len(outcomes))
+        spread = math.sqrt(sum((m - rate) ** 2 for m in means) / len(means))
+        self.assertLess(abs(spread / stderr - 1), 0.2)
+
+        keys = ["a" if p < 0.5 else "b" for p in probabilities]
+        single = forecast_report(probabilities, outcomes, {"side": keys}, resamples=100)
+        double = forecast_report(
+            probabilities, outcomes, {"parity": [i % 2 for i in range(400)], "side": keys}, resamples=100
+        )
+        self.assertEqual(single["breakdowns"]["side"], double["breakdowns"]["side"])
+        self.assertEqual(sum(group["count"] for group in double["breakdowns"]["parity"].values()), 400)
+
+    def test_backtest_report_writes_json_and_html(self):
+        matches = read_matches(
+            {"history.csv": synthetic_blob(random.Random(47), date(2025, 1, 1), 300, 400)},
+            date(2025, 1, 1),
+        )
+        results, _ = run_backtest(matches, date(2025, 7, 1), date(2025, 10, 27), 10, workers=1)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / "results.csv.gz"
+        write_results(results, path)
+
+        report = report_backtest(path, resamples=50)
+        self.assertEqual(report["overall"]["count"], len(results))
+        self.assertEqual(
+            set(report["breakdowns"]), {"surface", "tour_level", "favourite_strength", "sample_size"}
+        )
+        for groups in report["breakdowns"].values():
+            self.assertEqual(sum(group["count"] for group in groups.values()), len(results))
+        json.dumps(report)
+        elo = report_backtest(path, resamples=0, column="elo_probability")
+        self.assertEqual(elo["overall"]["count"], len(results))
+        self.assertEqual(elo["source"]["column"], "elo_probability")
+        page = render_html(report)
+        self.assertIn("<h2>By favourite strength</h2>", page)
+        self.assertIn("<svg", page)
+
+
+if __name__ == "__main__":
+    unittest.main()
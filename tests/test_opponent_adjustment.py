@@ -0,0 +1,114 @@
+from datetime import date
+from math import exp
+from pathlib import Path
+import random
+import tempfile
+import unittest
+
+from data_loader import TennisDataLoader
+from result_store import SimulationResultStore, TieredResultCache
+from scripts.opponent_adjustment import GROUPS, MAX_ITERATIONS, ServeObservations, fit_ratings
+from scripts.refresh_data import (
+    MatchTable,
+    build_rows,
+    contribution_records,
+    opponent_adjusted_rates,
+    read_matches,
+    write_outputs,
+)
+from simulation_cache import BoundedLRUCache
+from simulation_service import run_simulation_request
+from tests.test_refresh_data import synthetic_blob
+
+
+def logistic(value):
+    return 1.0 / (1.0 + exp(-value))
+
+
+class OpponentAdjustmentTests(unittest.TestCase):
+    def test_fit_removes_schedule_strength_from_equal_servers(self):
+        # Players 0 and 1 serve equally well, but 0 only meets the best
+        # returners and 1 only the worst; everyone else plays everyone.
+        returning = [0.0, 0.0, -0.6, -0.5, -0.4, 0.0, 0.1, 0.4, 0.5, 0.6]
+        serve = [0.0, 0.0, 0.3, -0.2, 0.1, 0.0, -0.1, 0.2, -0.3, 0.0]
+        opponents = {0: (7, 8, 9), 1: (2, 3, 4)}
+        observations = ServeObservations()
+        group = GROUPS.index("hard")
+        for server in range(10):
+            for returner in range(10):
+                if server == returner:
+                    continue
+                if server in opponents and returner not in opponents[server]:
+                    continue
+                if returner in opponents and server not in opponents[returner]:
+                    continue
+                probability = logistic(0.5 + serve[server] - returning[returner])
+                observations.add(group, server, returner, round(5000 * probability), 5000)
+
+        base, fitted_serve, fitted_return, iterations = fit_ratings(observations, 10)
+        self.assertLess(iterations, MAX_ITERATIONS)
+        raw = [
+            sum(won for won, server in zip(observations.won, observations.server) if server == player)
+            / sum(played for played, server in zip(observations.played, observations.server) if server == player)
+            for player in (0, 1)
+        ]
+        adjusted = [logistic(base[group] + fitted_serve[player * len(GROUPS) + group]) for player in (0, 1)]
+        self.assertGreater(raw[1] - raw[0], 0.15)
+        self.assertAlmostEqual(adjusted[0], adjusted[1], delta=0.01)
+        for player in range(2, 10):
+            self.assertAlmostEqual(
+                fitted_return[player * len(GROUPS) + group] - fitted_return[5 * len(GROUPS) + group],
+                returning[player] - returning[5], delta=0.05,
+            )
+
+    def test_loader_selects_the_adjusted_columns(self):
+        blob = synthetic_blob(random.Random(50), date(2025, 1, 1), 365, 600)
+        matches = read_matches({"2025.csv": blob}, date(2025, 1, 1))
+        table = MatchTable.from_matches(matches)
+        grouped, profiles = table.aggregate(5)
+        adjusted = table.opponent_adjusted_rates(grouped)
+        self.assertEqual(adjusted.keys(), grouped.keys())
+        # The incremental path fits the same points from its stored records.
+        from_records = opponent_adjusted_rates(contribution_records(matches), grouped)
+        for key, rates in adjusted.items():
+            for column, rate in rates.items():
+                self.assertAlmostEqual(from_records[key][column], rate, places=5)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        write_outputs(build_rows(grouped, profiles, adjusted), Path(directory.name), {"as_of": "2026-01-01"})
+
+        raw = TennisDataLoader(directory.name)
+        selected = TennisDataLoader(directory.name, opponent_adjusted=True)
+        player, surface = next(iter(grouped))
+        raw_stats, _ = raw.get_player_stats(player, surface)
+        stats, _ = selected.get_player_stats(player, surface)
+        for field, column in TennisDataLoader.OPPONENT_ADJUSTED_FIELDS.items():
+            self.assertAlmostEqual(stats[field], adjusted[(player, surface)][column], places=4)
+            self.assertEqual(raw_stats[column], stats[column])
+        self.assertNotEqual(raw_stats["first_serve_win_pct"], stats["first_serve_win_pct"])
+        self.assertEqual(raw_stats["first_serve_in_pct"], stats["first_serve_in_pct"])
+
+        # A seeded result stored under one rate choice is not served for the other.
+        names = [name for name, group in grouped if group == "hard"][:2]
+        payload = {
+            "player1": names[0], "player2": names[1], "format": "best3",
+            "num_simulations": 500, "surfaces": ["hard"], "seed": 50,
+        }
+        store_path = Path(directory.name) / "results.sqlite3"
+        cache = TieredResultCache(BoundedLRUCache(), SimulationResultStore(store_path))
+        run_simulation_request(payload, raw, result_cache=cache)
+        cache.store.flush()
+        restarted = TieredResultCache(BoundedLRUCache(), SimulationResultStore(store_path))
+        restarted.warm_load(selected.data_version, limit=10)
+        self.assertEqual(
+            run_simulation_request(payload, selected, result_cache=restarted),
+            run_simulation_request(payload, selected),
+        )
+        self.assertNotEqual(
+            run_simulation_request(payload, selected),
+            run_simulation_request(payload, raw),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import json
+import unittest
+
+from data_loader import TennisDataLoader
+from player_search import PlayerDirectory, PlayerSearchIndex
+
+
+PLAYERS = [
+    {"name": "Novak Djokovic", "ranking": 1, "surfaces": ["hard"]},
+    {"name": "Carlos Alcaraz", "ranking": 2, "surfaces": ["clay"]},
+    {"name": "Tomás Martín Etcheverry", "ranking": 30, "surfaces": ["clay"]},
+    {"name": "Carlos Taberner", "ranking": 90, "surfaces": ["clay"]},
+    {"name": "Jan-Lennard Struff", "ranking": 40, "surfaces": ["hard"]},
+]
+
+
+def names(players):
+    return [player["name"] for player in players]
+
+
+class PlayerSearchIndexTests(unittest.TestCase):
+    def test_prefix_search_is_accent_insensitive(self):
+        index = PlayerSearchIndex(PLAYERS)
+        self.assertEqual(names(index.search("tomas mar")), ["Tomás Martín Etcheverry"])
+        self.assertEqual(names(index.search("MARTÍN")), ["Tomás Martín Etcheverry"])
+        self.assertEqual(names(index.search("lennard")), ["Jan-Lennard Struff"])
+        self.assertEqual(index.search("zz"), [])
+        self.assertEqual(index.search("  "), [])
+
+    def test_results_keep_list_order_and_respect_limit(self):
+        index = PlayerSearchIndex(PLAYERS)
+        self.assertEqual(names(index.search("car")), ["Carlos Alcaraz", "Carlos Taberner"])
+        self.assertEqual(names(index.search("c", limit=1)), ["Carlos Alcaraz"])
+        self.assertEqual(names(index.search("carlos tab")), ["Carlos Taberner"])
+
+    def test_loader_directory_pages_cover_the_full_list(self):
+        loader = TennisDataLoader()
+        directory = PlayerDirectory.from_loader(loader)
+        players = loader.get_all_players()
+        self.assertEqual(json.loads(directory.full_list.body), {"players": players})
+
+        first = json.loads(directory.page(1, 50).body)
+        self.assertEqual(first["total"], len(players))
+        self.assertEqual(first["players"], players[:50])
+        last = json.loads(directory.page(first["pages"], 50).body)
+        self.assertEqual(last["players"], players[(first["pages"] - 1) * 50:])
+        self.assertIs(directory.page(1, 50), directory.page(1, 50))
+
+        top = players[0]
+        self.assertEqual(directory.search(top["name"].split()[-1], limit=1), [top])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+from pathlib import Path
+import pickle
+import tempfile
+import unittest
+
+from data_loader import TennisDataLoader
+from player_stats import PlayerStatsTable
+
+
+class PlayerStatsTableTests(unittest.TestCase):
+    def small_table(self):
+        table = PlayerStatsTable(("ranking", "dominance_ratio"), ("hard", "grass", "all"))
+        row = table.append_row("all", {"ranking": 12.0, "dominance_ratio": None})
+        table.link("Player A", "all", row)
+        table.link("Player A", "grass", row)
+        table.link("Player A", "hard", table.append_row("hard", {"ranking": 12.0, "dominance_ratio": 1.1}))
+        table.add_player("Player B")
+        return table
+
+    def test_fallback_surfaces_share_one_row(self):
+        table = self.small_table()
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.row("Player A", "grass"), table.row("Player A", "all"))
+        self.assertEqual(table.row_dict(table.row("Player A", "grass")), {
+            "ranking": 12.0, "dominance_ratio": None, "source_surface": "all",
+        })
+        self.assertIsNone(table.row("Player B", "hard"))
+        self.assertEqual(table.column("ranking").tolist(), [12.0, 12.0])
+
+    def test_round_trips_through_bytes(self):
+        table = self.small_table()
+        restored = PlayerStatsTable.from_bytes(table.to_bytes())
+        self.assertEqual(restored.fields, table.fields)
+        self.assertEqual(list(restored.players), ["Player A", "Player B"])
+        for surface in ("hard", "grass", "all"):
+            self.assertEqual(
+                restored.row_dict(restored.row("Player A", surface)),
+                table.row_dict(table.row("Player A", surface)),
+            )
+
+    def test_mapped_file_shares_pages_until_first_write(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / "player_stats.bin"
+        path.write_bytes(self.small_table().to_bytes())
+
+        table = PlayerStatsTable.map_file(path)
+        self.assertTrue(table.mapped)
+        self.assertEqual(table.column("ranking").tolist(), [12.0, 12.0])
+        # Pickling a mapped table sends the path, not the columns.
+        self.assertIn(str(path).encode("utf-8"), pickle.dumps(table))
+        self.assertTrue(pickle.loads(pickle.dumps(table)).mapped)
+
+        table.link("Player B", "hard", table.append_row("hard", {"ranking": 80.0}))
+        self.assertFalse(table.mapped)
+        self.assertEqual(table.column("ranking").tolist(), [12.0, 12.0, 80.0])
+        self.assertEqual(
+            pickle.loads(pickle.dumps(table)).row_dict(table.row("Player B", "hard"))["ranking"], 80.0
+        )
+        with self.assertRaises(ValueError):
+            PlayerStatsTable.map_file(path, sha256="0" * 64)
+
+    def test_loader_views_keep_dict_interface(self):
+        loader = TennisDataLoader()
+        player, sources = next(
+            (player, sources) for player, sources in loader.fallback_sources.items()
+            if sources.get("grass") == "all"
+        )
+        stats, fallback = loader.get_player_stats(player, "grass")
+        self.assertTrue(fallback)
+        self.assertEqual(loader.player_data[player]["grass"], stats)
+
+        stats["dominance_ratio"] += 0.5
+        self.assertNotEqual(loader.player_data[player]["grass"], stats)
+        loader.player_data[player]["grass"] = stats
+        self.assertEqual(loader.get_player_stats(player, "grass")[0], stats)
+        # The all-surface row the grass entry used to share is unchanged.
+        self.assertNotEqual(
+            loader.get_player_stats(player, "all")[0]["dominance_ratio"],
+            stats["dominance_ratio"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
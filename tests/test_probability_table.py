@@ -0,0 +1,86 @@
+import json
+from pathlib import Path
+import shutil
+import tempfile
+import unittest
+
+from data_loader import TennisDataLoader
+from probability_table import PROBABILITY_TABLE_FILE, ProbabilityTable
+from scripts.refresh_data import rebuild_snapshot
+from simulation_engine import TennisSimulator
+from simulation_service import run_simulation_request
+from tests.test_upcoming_service import RecordingPool, scheduled_match, static_discoverer
+from upcoming_service import UpcomingMatchService
+
+
+class ProbabilityTableTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.data_dir = Path(directory.name) / "data"
+        shutil.copytree(TennisDataLoader().data_dir, self.data_dir)
+        rebuild_snapshot(self.data_dir, precompute_top=6)
+        self.loader = TennisDataLoader(str(self.data_dir))
+        self.names = [player["name"] for player in self.loader.get_all_players()[:8]]
+
+    def test_cells_match_the_engine_in_either_player_order(self):
+        table = self.loader.probability_table
+        self.assertEqual(table.players, self.names[:6])
+        stats = [self.loader.get_player_stats(name, "clay")[0] for name in self.names[1:3]]
+        exact = TennisSimulator.exact_match_probabilities(*stats, "best5")
+        cell = table.lookup(self.names[1], self.names[2], "clay", "best5")
+        self.assertAlmostEqual(cell["player1_win_pct"], exact["player1_win_pct"], places=6)
+        for score, probability in exact["set_distributions"].items():
+            self.assertAlmostEqual(cell["set_distributions"][score], probability, places=6)
+        mirrored = table.lookup(self.names[2], self.names[1], "clay", "best5")
+        self.assertAlmostEqual(mirrored["player1_win_pct"], 1 - cell["player1_win_pct"], places=6)
+        self.assertEqual(mirrored["set_distributions"]["2-3"], cell["set_distributions"]["3-2"])
+        self.assertIsNone(table.lookup(self.names[1], self.names[6], "clay", "best5"))
+        self.assertEqual(ProbabilityTable.from_bytes(table.to_bytes()).values, table.values)
+
+        payload = {
+            "player1": self.names[3], "player2": self.names[0], "format": "best3",
+            "num_simulations": 999, "surfaces": ["grass", "hard"], "seed": 5,
+        }
+        response = run_simulation_request(payload, self.loader)
+        for surface, result in response["surfaces"].items():
+            self.assertTrue(result["precomputed"])
+            self.assertEqual(sum(result["set_distributions"].values()), 999)
+            self.assertEqual(result["player1_wins"] + result["player2_wins"], 999)
+            self.assertAlmostEqual(result["player1_wins"] / 999, result["player1_win_pct"], delta=0.002)
+            self.assertIn("observed_stats", result)
+        live = run_simulation_request({**payload, "player2": self.names[7], "num_simulations": 20}, self.loader)
+        self.assertNotIn("precomputed", live["surfaces"]["hard"])
+
+        # A table from another snapshot is never served.
+        metadata_path = self.data_dir / "metadata.json"
+        metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+        metadata["snapshot"]["sha256"] = "0" * 64
+        metadata_path.write_text(json.dumps(metadata), encoding="utf-8")
+        self.assertIsNone(TennisDataLoader(str(self.data_dir)).probability_table)
+        self.assertTrue((self.data_dir / PROBABILITY_TABLE_FILE).is_file())
+
+    def test_dashboard_answers_covered_matches_without_the_pool(self):
+        pool = RecordingPool(self.loader)
+        self.addCleanup(pool.shutdown)
+        service = UpcomingMatchService(
+            self.loader,
+            discoverer=static_discoverer([
+                scheduled_match("covered", self.names[0], self.names[1]),
+                scheduled_match("live", self.names[0], self.names[7]),
+            ]),
+            simulation_pool=pool,
+        )
+        service.get_upcoming()
+        covered = service.get_simulation("covered")
+        cell = self.loader.probability_table.lookup(
+            self.names[0], self.names[1], covered["surface"], covered["format"]
+        )
+        self.assertEqual(covered["player1_probability"], cell["player1_win_pct"])
+        self.assertEqual(pool.payloads, [])
+        service.get_simulation("live")
+        self.assertEqual([payload["player2"] for payload in pool.payloads], [self.names[7]])
+
+
+if __name__ == "__main__":
+    unittest.main()
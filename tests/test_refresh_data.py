@@ -1,6 +1,71 @@
+import csv
+from datetime import date, timedelta
+import hashlib
+import io
+from pathlib import Path
+import random
+import tempfile
 import unittest
 
-from scripts.refresh_data import STAT_FIELDS, add_player, add_score, empty_stats
+from urllib.error import HTTPError
+
+from scripts.refresh_data import (
+    ADJUSTED_TOLERANCE,
+    HEADERS,
+    STAT_FIELDS,
+    ContributionStore,
+    DecayedCounters,
+    DownloadCache,
+    MatchTable,
+    add_player,
+    add_score,
+    aggregate,
+    build_rows,
+    diff_outputs,
+    empty_stats,
+    ingest_source,
+    opponent_adjusted_rates,
+    read_matches,
+    read_sources,
+    retrieve_source,
+)
+
+
+def synthetic_blob(rng, first_day, days, count, offset=0):
+    players = [f"Player {letter}" for letter in "ABCDEFGHIJKL"]
+    columns = [
+        "tourney_id", "tourney_date", "match_num", "winner_name", "loser_name",
+        "surface", "score", "winner_rank", "loser_rank", "winner_ioc", "loser_ioc",
+        *(f"{prefix}_{field}" for prefix in ("w", "l") for field in STAT_FIELDS),
+    ]
+    handle = io.StringIO()
+    writer = csv.DictWriter(handle, columns)
+    writer.writeheader()
+    for number in range(offset, offset + count):
+        winner, loser = rng.sample(players, 2)
+        day = first_day + timedelta(days=rng.randrange(days))
+        row = {
+            "tourney_id": f"T{day:%Y%m%d}", "tourney_date": f"{day:%Y%m%d}",
+            "match_num": str(number), "winner_name": winner, "loser_name": loser,
+            "surface": rng.choice(["Hard", "Clay", "Grass", "Carpet"]),
+            "score": rng.choice(["6-4 6-4", "7-6(3) 4-6 6-2", "6-3 RET"]),
+            "winner_rank": str(rng.randint(1, 300)), "loser_rank": rng.choice(["", "55", "120"]),
+            "winner_ioc": "USA", "loser_ioc": "ESP",
+        }
+        for prefix in ("w", "l"):
+            svpt = rng.randint(40, 90)
+            first_in = rng.randint(20, svpt)
+            bp_faced = rng.randint(0, 10)
+            row.update({
+                f"{prefix}_ace": rng.randint(0, 10), f"{prefix}_df": rng.randint(0, 3),
+                f"{prefix}_svpt": svpt, f"{prefix}_1stIn": first_in,
+                f"{prefix}_1stWon": rng.randint(0, first_in),
+                f"{prefix}_2ndWon": rng.randint(0, (svpt - first_in) // 2),
+                f"{prefix}_SvGms": rng.randint(6, 14), f"{prefix}_bpSaved": rng.randint(0, bp_faced),
+                f"{prefix}_bpFaced": bp_faced,
+            })
+        writer.writerow(row)
+    return handle.getvalue().encode("utf-8")
 
 
 class RefreshDataTests(unittest.TestCase):
@@ -31,6 +96,205 @@ class RefreshDataTests(unittest.TestCase):
         row["w_bpSaved"] = "7"
         self.assertFalse(add_player(empty_stats(), row, "w", "l", True))
 
+    def test_match_table_mirrors_each_match_for_both_players(self):
+        row = {
+            "winner_name": "Player A", "loser_name": "Player B", "surface": "Clay",
+            "score": "7-6(4) 3-6 6-3", "winner_rank": "10", "loser_rank": "",
+            "winner_ioc": "USA", "loser_ioc": "ESP",
+        }
+        for prefix, svpt in (("w", 60), ("l", 70)):
+            counters = {"ace": 5, "df": 2, "svpt": svpt, "1stIn": 36, "1stWon": 26,
+                        "2ndWon": 12, "SvGms": 10, "bpSaved": 4, "bpFaced": 6}
+            for field in STAT_FIELDS:
+                row[f"{prefix}_{field}"] = str(counters[field])
+        table = MatchTable()
+        self.assertTrue(table.add_match(date(2026, 5, 1), row))
+        self.assertFalse(table.add_match(date(2026, 5, 2), dict(row, w_bpSaved="7")))
+
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.column("svpt").tolist(), [60, 70])
+        self.assertEqual(table.column("opp_svpt").tolist(), [70, 60])
+        self.assertEqual(table.column("tiebreaks_won").tolist(), [1, 0])
+        grouped, profiles = table.aggregate(min_matches=1)
+        self.assertEqual(grouped[("Player B", "clay")]["opponent_ranks"], [10])
+        self.assertEqual(grouped[("Player A", "all")]["opponent_ranks"], [])
+        self.assertEqual(grouped[("Player A", "all")]["sets_won"], 2)
+        self.assertEqual(profiles["Player B"], {"ranking": None, "ioc": "ESP", "date": "2026-05-01"})
+
+    def test_decayed_counters_match_the_closed_form_in_any_order(self):
+        counters = DecayedCounters(half_life_days=30, width=2)
+        events = [(100, (4, 1)), (160, (2, 2)), (130, (6, 0)), (190, (1, 3))]
+        for day, values in events:
+            counters.add(day, values)
+        expected = [
+            sum(values[index] * 0.5 ** ((220 - day) / 30) for day, values in events)
+            for index in range(2)
+        ]
+        for actual, wanted in zip(counters.at(220), expected):
+            self.assertAlmostEqual(actual, wanted)
+        with self.assertRaises(ValueError):
+            counters.at(150)
+
+    def test_recency_weighting_only_rescales_counters(self):
+        blob = synthetic_blob(random.Random(11), date(2025, 1, 1), 365, 400)
+        matches = read_matches({"2025.csv": blob}, date(2025, 1, 1))
+        as_of = date(2026, 1, 1)
+        unweighted, _ = aggregate(matches, 3)
+        # A half-life far beyond the window weighs every match ~equally.
+        flat, _ = aggregate(matches, 3, 1e12, as_of)
+        for key, stats in flat.items():
+            self.assertAlmostEqual(stats["svpt"], unweighted[key]["svpt"], places=4)
+            self.assertAlmostEqual(stats["wins"], unweighted[key]["wins"], places=4)
+            self.assertEqual(sorted(stats["opponent_ranks"]), sorted(unweighted[key]["opponent_ranks"]))
+
+        weighted, _ = aggregate(matches, 3, 90, as_of)
+        self.assertEqual(weighted.keys(), unweighted.keys())
+        for key, stats in weighted.items():
+            self.assertLess(stats["matches"], unweighted[key]["matches"])
+            self.assertGreater(stats["matches"], 0)
+
+    def test_recency_weighting_ignores_matches_after_a_past_as_of(self):
+        blob = synthetic_blob(random.Random(12), date(2025, 1, 1), 365, 400)
+        matches = read_matches({"2025.csv": blob}, date(2025, 1, 1))
+        as_of = date(2025, 6, 1)
+        earlier = [(match_date, row) for match_date, row in matches if match_date <= as_of]
+        self.assertLess(len(earlier), len(matches))
+
+        table = MatchTable.from_matches(matches)
+        weighted, _ = table.aggregate(3, 90, as_of)
+        expected_table = MatchTable.from_matches(earlier)
+        expected, _ = expected_table.aggregate(3, 90, as_of)
+        for key, stats in expected.items():
+            self.assertAlmostEqual(weighted[key]["svpt"], stats["svpt"], places=6)
+            self.assertEqual(weighted[key]["opponent_ranks"], stats["opponent_ranks"])
+
+        adjusted = table.opponent_adjusted_rates(expected, 90, as_of)
+        for key, rates in expected_table.opponent_adjusted_rates(expected, 90, as_of).items():
+            for column, rate in rates.items():
+                self.assertAlmostEqual(adjusted[key][column], rate, places=5)
+
+    def test_streaming_ingest_hashes_and_filters_in_one_pass(self):
+        blob = "\ufeff".encode("utf-8") + synthetic_blob(random.Random(3), date(2026, 1, 1), 30, 50)
+        blob = blob.replace(b"Player A", "Pláyer Ä".encode("utf-8"))
+        cutoff = date(2026, 1, 16)
+        source = ingest_source("2026.csv", io.BytesIO(blob), cutoff)
+
+        self.assertEqual(source.sha256, hashlib.sha256(blob).hexdigest())
+        self.assertEqual(source.size, len(blob))
+        self.assertTrue(source.matches)
+        self.assertTrue(all(match_date >= cutoff for match_date, _ in source.matches))
+        decoded = list(csv.DictReader(io.StringIO(blob.decode("utf-8-sig"))))
+        expected = [row["match_num"] for row in decoded if row["tourney_date"] >= "20260116"
+                    and row["surface"] != "Carpet"]
+        self.assertEqual([row["match_num"] for _, row in source.matches], expected)
+        self.assertIn("Pláyer Ä", {row["winner_name"] for row in decoded})
+
+
+class ContributionStoreTests(unittest.TestCase):
+    def full_rebuild(self, blobs, cutoff):
+        matches = read_matches(blobs, cutoff)
+        table = MatchTable.from_matches(matches)
+        grouped, profiles = table.aggregate(3)
+        return build_rows(grouped, profiles, table.opponent_adjusted_rates(grouped)), len(matches)
+
+    def test_incremental_updates_match_a_full_rebuild(self):
+        rng = random.Random(40)
+        start = date(2026, 1, 1)
+        older = synthetic_blob(rng, start, 60, 300)
+        current = synthetic_blob(rng, start + timedelta(days=40), 40, 200, offset=300)
+        blobs = {"2025.csv": older, "ongoing.csv": current + current.split(b"\n", 1)[1]}
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / "contributions.json.gz"
+
+        for as_of, extra in ((start + timedelta(days=60), 0), (start + timedelta(days=75), 80)):
+            if extra:
+                blobs["ongoing.csv"] = current + synthetic_blob(
+                    rng, start + timedelta(days=60), 15, extra, offset=900
+                ).split(b"\n", 1)[1]
+            cutoff = as_of - timedelta(days=45)
+            store = ContributionStore(path)
+            report = store.update(read_sources(blobs, cutoff), cutoff)
+            store.save()
+            expected, match_count = self.full_rebuild(blobs, cutoff)
+            grouped, profiles = store.aggregate(3)
+            incremental = build_rows(grouped, profiles, opponent_adjusted_rates(store.selected, grouped))
+            self.assertEqual(
+                diff_outputs(expected, incremental, adjusted_tolerance=ADJUSTED_TOLERANCE), []
+            )
+            self.assertEqual(len(store.selected), match_count)
+
+        # Only the adjusted columns get the tolerance, and only up to it.
+        shifted = {kind: [list(row) for row in rows] for kind, rows in incremental.items()}
+        column = HEADERS["serve"].index("adjusted_first_serve_win_pct")
+        shifted["serve"][0][column] = f"{float(shifted['serve'][0][column].rstrip('%')) + 0.2:.2f}%"
+        self.assertEqual(len(diff_outputs(incremental, shifted, adjusted_tolerance=ADJUSTED_TOLERANCE)), 1)
+        shifted["serve"][0][column] = incremental["serve"][0][column]
+        shifted["serve"][0][2] = "Someone Else"
+        self.assertEqual(len(diff_outputs(incremental, shifted, adjusted_tolerance=1e9)), 1)
+
+        self.assertEqual(report["reused_files"], 1)
+        self.assertGreater(report["removed_matches"], 0)
+        self.assertGreater(report["added_matches"], 0)
+
+
+class FakeResponse(io.BytesIO):
+    def __init__(self, data, headers):
+        super().__init__(data)
+        self.headers = headers
+
+
+class DownloadCacheTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = DownloadCache(Path(directory.name))
+        self.blob = synthetic_blob(random.Random(5), date(2026, 1, 1), 30, 40)
+        self.cutoff = date(2026, 1, 1)
+        self.requests = []
+
+    def serve(self, request, timeout):
+        self.requests.append(dict(request.header_items()))
+        if request.get_header("If-none-match") == '"v1"':
+            raise HTTPError(request.full_url, 304, "Not Modified", {}, None)
+        return FakeResponse(self.blob, {"ETag": '"v1"', "Last-Modified": "Sat, 10 Jan 2026 00:00:00 GMT"})
+
+    def retrieve(self, modified, **options):
+        return retrieve_source(
+            self.cache, "2026.csv", "https://example.test/2026.csv", modified,
+            self.cutoff, opener=self.serve, **options,
+        )
+
+    def test_unchanged_files_skip_the_network_and_changed_ones_revalidate(self):
+        downloaded = self.retrieve("t1")
+        self.assertEqual(downloaded.retrieved, "downloaded")
+        self.assertEqual(downloaded.sha256, hashlib.sha256(self.blob).hexdigest())
+        self.assertEqual(
+            self.cache.object_path(downloaded.sha256).read_bytes(), self.blob
+        )
+
+        cached = self.retrieve("t1")
+        self.assertEqual((cached.retrieved, len(self.requests)), ("cached", 1))
+        self.assertEqual(cached.matches, downloaded.matches)
+
+        revalidated = self.retrieve("t2")
+        self.assertEqual(revalidated.retrieved, "not_modified")
+        self.assertEqual(self.requests[-1]["If-none-match"], '"v1"')
+        self.assertEqual(revalidated.sha256, downloaded.sha256)
+        self.assertEqual(self.retrieve("t2").retrieved, "cached")
+
+    def test_offline_mode_builds_only_from_the_cache(self):
+        with self.assertRaises(RuntimeError):
+            self.retrieve("t1", offline=True)
+        self.retrieve("t1")
+        self.cache.save()
+
+        self.cache = DownloadCache(self.cache.directory)
+        offline = self.retrieve("t9", offline=True)
+        self.assertEqual((offline.retrieved, len(self.requests)), ("cached", 1))
+        skipped = self.retrieve("t1", reusable=lambda name, sha256: True)
+        self.assertIsNone(skipped.matches)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,34 @@
+import json
+import unittest
+
+from response_snapshot import publish
+
+
+class ResponseSnapshotTests(unittest.TestCase):
+    def test_body_matches_data_and_etag_tracks_content(self):
+        value = {"matches": [{"id": "a", "providers": []}], "errors": []}
+        snapshot = publish(value)
+        self.assertEqual(json.loads(snapshot.body), value)
+        self.assertEqual(snapshot.data, value)
+        self.assertEqual(publish(dict(value)).etag, snapshot.etag)
+        self.assertNotEqual(publish({**value, "errors": ["late"]}).etag, snapshot.etag)
+
+    def test_published_data_is_read_only_and_detached(self):
+        value = {"matches": [{"id": "a"}]}
+        snapshot = publish(value)
+        value["matches"][0]["id"] = "changed"
+        self.assertEqual(snapshot.data["matches"][0]["id"], "a")
+        with self.assertRaises(TypeError):
+            snapshot.data["matches"][0]["id"] = "b"
+        self.assertIsInstance(snapshot.data["matches"], tuple)
+
+    def test_frozen_values_can_be_republished(self):
+        nested = publish({"providers": [{"status": "available"}]}).data
+        self.assertEqual(
+            json.loads(publish({"market": nested}).body),
+            {"market": {"providers": [{"status": "available"}]}},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
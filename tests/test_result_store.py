@@ -0,0 +1,119 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import tempfile
+import unittest
+
+from data_loader import TennisDataLoader
+from result_store import SimulationResultStore, TieredResultCache, canonical_request_key
+from simulation_cache import BoundedLRUCache
+from simulation_service import run_simulation_request, unchanged_inputs
+
+
+class SimulationResultStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = Path(self.directory.name) / "results.sqlite3"
+
+    def test_results_survive_reopening_the_store(self):
+        store = SimulationResultStore(self.path)
+        store.put("simulate", "2026-08-10", "key", {"p": [0.5, 0.25]})
+        store.flush()
+
+        reopened = SimulationResultStore(self.path)
+        self.assertEqual(reopened.get("simulate", "2026-08-10", "key"), {"p": [0.5, 0.25]})
+        self.assertIsNone(reopened.get("simulate", "2026-08-11", "key"))
+        self.assertIsNone(reopened.get("dashboard", "2026-08-10", "key"))
+        metrics = reopened.metrics()
+        self.assertEqual((metrics["entries"], metrics["hits"], metrics["misses"]), (1, 1, 2))
+
+    def test_concurrent_readers_with_one_writer(self):
+        store = SimulationResultStore(self.path)
+
+        def read(index):
+            store.put("simulate", "v1", str(index), {"index": index})
+            return store.get("simulate", "v1", str(index - 1))
+
+        with ThreadPoolExecutor(max_workers=8) as clients:
+            list(clients.map(read, range(200)))
+        store.flush()
+        self.assertEqual(store.metrics()["entries"], 200)
+        self.assertEqual(store.metrics()["errors"], 0)
+
+    def test_recent_returns_newest_first_and_compaction_caps_size(self):
+        now = [0.0]
+        store = SimulationResultStore(self.path, clock=lambda: now[0])
+        for index in range(10):
+            now[0] = float(index)
+            store.put("dashboard", "v1", str(index), {"text": "x" * 100 + str(index)})
+        store.flush()
+        self.assertEqual([key for key, _ in store.recent("dashboard", "v1", 3)], ["9", "8", "7"])
+
+        entry_size = store.metrics()["stored_bytes"] // 10
+        store.max_bytes = entry_size * 4
+        removed = store.compact()
+        metrics = store.metrics()
+        self.assertGreaterEqual(removed, 5)
+        self.assertLessEqual(metrics["stored_bytes"], store.max_bytes)
+        self.assertIsNotNone(store.get("dashboard", "v1", "9"))
+        self.assertIsNone(store.get("dashboard", "v1", "0"))
+
+    def test_tiered_cache_serves_seeded_requests_after_restart(self):
+        loader = TennisDataLoader()
+        names = [player["name"] for player in loader.get_all_players()[:2]]
+        payload = {
+            "player1": names[0], "player2": names[1], "format": "best3",
+            "num_simulations": 20, "surfaces": ["hard"], "seed": 7,
+        }
+        cache = TieredResultCache(BoundedLRUCache(), SimulationResultStore(self.path))
+        first = run_simulation_request(payload, loader, result_cache=cache)
+        cache.store.flush()
+
+        restarted = TieredResultCache(BoundedLRUCache(), SimulationResultStore(self.path))
+        self.assertEqual(restarted.warm_load(loader.data_version, limit=10), 1)
+        self.assertEqual(run_simulation_request(payload, loader, result_cache=restarted), first)
+        self.assertEqual(restarted.metrics()["hits"], 1)
+
+        unseeded = dict(payload, seed=None)
+        run_simulation_request(unseeded, loader, result_cache=restarted)
+        self.assertEqual(len(restarted.memory), 1)
+
+    def test_refresh_carries_forward_only_unchanged_inputs(self):
+        loader = TennisDataLoader()
+        names = [player["name"] for player in loader.get_all_players()[:4]]
+        cache = TieredResultCache(BoundedLRUCache(), SimulationResultStore(self.path))
+        payloads = [
+            {"player1": first, "player2": second, "format": "best3",
+             "num_simulations": 20, "surfaces": ["hard"], "seed": 7}
+            for first, second in ((names[0], names[1]), (names[2], names[3]))
+        ]
+        for payload in payloads:
+            run_simulation_request(payload, loader, result_cache=cache)
+        cache.store.flush()
+
+        previous_version = loader.data_version
+        stats = dict(loader.player_data[names[3]]["hard"])
+        stats["dominance_ratio"] += 0.1
+        loader.player_data[names[3]]["hard"] = stats
+        loader.data_version = "next"
+        restarted = TieredResultCache(BoundedLRUCache(), SimulationResultStore(self.path))
+        restarted.warm_load("next", limit=10, unchanged=unchanged_inputs(loader))
+        for payload in payloads:
+            run_simulation_request(payload, loader, result_cache=restarted)
+        self.assertEqual(restarted.metrics()["last_refresh"], {
+            "from_version": previous_version,
+            "to_version": "next",
+            "carried_forward": 1,
+            "invalidated": 1,
+            "recomputed": 1,
+        })
+
+    def test_canonical_key_ignores_field_order(self):
+        self.assertEqual(
+            canonical_request_key({"a": 1, "b": ["hard"]}),
+            canonical_request_key({"b": ["hard"], "a": 1}),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+import unittest
+
+from simulation_cache import BoundedLRUCache, estimate_size
+
+
+class BoundedLRUCacheTests(unittest.TestCase):
+    def test_least_recently_used_entry_is_evicted_at_capacity(self):
+        cache = BoundedLRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.metrics()["evictions"], {"capacity": 1})
+
+    def test_memory_budget_bounds_estimated_bytes(self):
+        value = {"warnings": ["x" * 200]}
+        cache = BoundedLRUCache(max_entries=100, max_bytes=3 * estimate_size(value))
+        for key in range(10):
+            cache.put(key, {"warnings": ["x" * 200]})
+        metrics = cache.metrics()
+        self.assertEqual(metrics["entries"], 3)
+        self.assertLessEqual(metrics["estimated_bytes"], metrics["max_bytes"])
+
+    def test_purge_counts_reason_and_releases_bytes(self):
+        cache = BoundedLRUCache()
+        cache.put(("old", "m1"), {"p": 0.5})
+        cache.put(("new", "m1"), {"p": 0.5})
+        self.assertEqual(cache.purge(lambda key: key[0] == "old", "data_version"), 1)
+        metrics = cache.metrics()
+        self.assertEqual(metrics["entries"], 1)
+        self.assertEqual(metrics["estimated_bytes"], estimate_size({"p": 0.5}))
+        self.assertEqual(metrics["evictions"], {"data_version": 1})
+
+    def test_concurrent_puts_respect_the_entry_limit(self):
+        cache = BoundedLRUCache(max_entries=50)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda key: cache.put(key, [key]), range(2000)))
+        self.assertEqual(len(cache), 50)
+        self.assertEqual(cache.metrics()["evictions"]["capacity"], 1950)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -92,6 +92,26 @@ class SimulationEngineTests(unittest.TestCase):
         self.assertAlmostEqual(result["player1_win_pct"], 0.5, delta=0.02)
         self.assertEqual(sum(result["set_distributions"].values()), 10000)
 
+    def test_exact_probabilities_match_monte_carlo(self):
+        stronger = {**BASE_STATS, "first_serve_win_pct": 0.78, "vs_second_serve_win_pct": 0.55}
+        even = TennisSimulator.exact_match_probabilities(BASE_STATS, BASE_STATS, "best5")
+        self.assertAlmostEqual(even["player1_win_pct"], 0.5)
+        self.assertAlmostEqual(even["set_distributions"]["3-1"], even["set_distributions"]["1-3"])
+
+        exact = TennisSimulator.exact_match_probabilities(stronger, BASE_STATS, "best3")
+        self.assertAlmostEqual(sum(exact["set_distributions"].values()), 1.0)
+        result = TennisSimulator().run_monte_carlo_simulation(
+            stronger, BASE_STATS, num_simulations=4000, track_detailed_stats=True, seed=49
+        )
+        low, high = result["player1_win_ci95"]
+        self.assertTrue(low <= exact["player1_win_pct"] <= high)
+        for score, count in result["set_distributions"].items():
+            self.assertAlmostEqual(count / 4000, exact["set_distributions"][score], delta=0.03)
+        expected = TennisSimulator.expected_observed_stats(stronger, BASE_STATS)
+        for player, observed in result["observed_stats"].items():
+            for key, value in observed.items():
+                self.assertAlmostEqual(value, expected[player][key], delta=0.02)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,68 @@
+from datetime import date, timedelta
+from pathlib import Path
+import random
+import tempfile
+import unittest
+
+from data_loader import TennisDataLoader
+from scripts.refresh_data import aggregate, build_rows, read_matches, write_outputs
+from scripts.stats_index import PointInTimeIndex
+from tests.test_refresh_data import synthetic_blob
+
+
+class PointInTimeIndexTests(unittest.TestCase):
+    def setUp(self):
+        blob = synthetic_blob(random.Random(45), date(2025, 1, 1), 500, 900)
+        self.matches = read_matches({"history.csv": blob}, date(2025, 1, 1))
+        self.index = PointInTimeIndex.from_matches(self.matches, window_days=365, min_matches=5)
+
+    def refreshed_loader(self, as_of):
+        """Load what a refresh at ``as_of`` would write if it saw only earlier matches."""
+        window = [
+            (match_date, row) for match_date, row in self.matches
+            if as_of - timedelta(days=365) <= match_date < as_of
+        ]
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        outputs = build_rows(*aggregate(window, 5))
+        write_outputs(outputs, Path(directory.name), {"as_of": as_of.isoformat()})
+        return TennisDataLoader(directory.name, use_snapshot=False)
+
+    def test_matches_a_refresh_for_any_as_of_date(self):
+        for as_of in (date(2025, 9, 1), date(2026, 2, 14), date(2026, 5, 10)):
+            loader = self.refreshed_loader(as_of)
+            checked = 0
+            for player in loader.player_data:
+                for surface in loader.SURFACES:
+                    try:
+                        expected = loader.get_player_stats(player, surface)
+                    except ValueError:
+                        with self.assertRaises(ValueError):
+                            self.index.get_player_stats(player, surface, as_of)
+                        continue
+                    self.assertEqual(self.index.get_player_stats(player, surface, as_of), expected)
+                    checked += 1
+            self.assertGreater(checked, 20)
+
+    def test_window_is_half_open(self):
+        day = next(match_date for match_date, row in self.matches[400:] if row["winner_name"] == "Player A")
+
+        def played_on(when):
+            return sum(
+                1 for match_date, row in self.matches
+                if match_date == when and "Player A" in (row["winner_name"], row["loser_name"])
+            )
+
+        before = self.index.totals("Player A", "all", day)
+        after = self.index.totals("Player A", "all", day + timedelta(days=1))
+        self.assertEqual(
+            after["matches"] - before["matches"],
+            played_on(day) - played_on(day - timedelta(days=365)),
+        )
+        self.assertIsNone(self.index.totals("Player A", "all", date(2025, 1, 1)))
+        with self.assertRaises(ValueError):
+            self.index.get_player_stats("Nobody", "hard", day)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,21 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+from pathlib import Path
+import tempfile
+import threading
 import unittest
+from unittest.mock import patch
 
 from data_loader import TennisDataLoader
 from market_odds import build_market_comparison
+from result_store import SimulationResultStore
+from simulation_service import run_simulation_request
 from upcoming_service import (
+    DISCOVERY_BACKOFF_SECONDS,
+    DISCOVERY_TTL_SECONDS,
+    MAX_BATCH_SIMULATIONS,
+    RETIRED_MATCH_GRACE_SECONDS,
+    UNKNOWN_MATCH_MESSAGE,
     UpcomingMatchService,
     classify_tournament,
     infer_format,
@@ -21,6 +34,54 @@ def provider(name, player1_probability):
     }
 
 
+def scheduled_match(match_id, player1, player2, tournament="National Bank Open",
+                    start_time="2026-08-11T22:00:00Z"):
+    return {
+        "id": match_id,
+        "player1": player1,
+        "player2": player2,
+        "player1_in_model": True,
+        "player2_in_model": True,
+        "start_time": start_time,
+        "tournament": tournament,
+        "round": None,
+        "market_comparison": build_market_comparison(player1, player2, []),
+    }
+
+
+def static_discoverer(matches):
+    def discoverer(_known_names, days):
+        return {
+            "matches": [dict(match) for match in matches],
+            "errors": [],
+            "generated_at": "2026-08-11T16:00:00Z",
+            "window_end": "2026-08-18T16:00:00Z",
+        }
+    return discoverer
+
+
+class RecordingPool:
+    """Thread-backed stand-in for SimulationPool that records submissions."""
+
+    def __init__(self, loader, release=None):
+        self.loader = loader
+        self.release = release
+        self.payloads = []
+        self._executor = ThreadPoolExecutor(max_workers=4)
+
+    def submit(self, payload):
+        self.payloads.append(payload)
+        return self._executor.submit(self._run, payload)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, payload):
+        if self.release is not None:
+            self.release.wait(5)
+        return run_simulation_request(payload, self.loader)
+
+
 class UpcomingServiceTests(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -106,6 +167,392 @@ class UpcomingServiceTests(unittest.TestCase):
         ))
         self.assertIn("hard", result["market_comparison"]["model_comparison"])
 
+    def test_concurrent_requests_share_one_in_flight_simulation(self):
+        names = [player["name"] for player in self.loader.get_all_players()[:4]]
+        release = threading.Event()
+        pool = RecordingPool(self.loader, release)
+        self.addCleanup(pool.shutdown)
+        service = UpcomingMatchService(
+            self.loader,
+            discoverer=static_discoverer([
+                scheduled_match("first", names[0], names[1]),
+                scheduled_match("second", names[2], names[3]),
+            ]),
+            simulation_pool=pool,
+        )
+        service.get_upcoming()
+        with ThreadPoolExecutor(max_workers=6) as clients:
+            requests = [
+                clients.submit(service.get_simulation, match_id)
+                for match_id in ("first", "second", "first", "second", "first", "second")
+            ]
+            # Both matches are submitted before either computation finishes.
+            for _ in range(100):
+                if len(pool.payloads) == 2:
+                    break
+                threading.Event().wait(0.01)
+            self.assertEqual(len(pool.payloads), 2)
+            release.set()
+            results = [request.result() for request in requests]
+        self.assertEqual(len(pool.payloads), 2)
+        self.assertEqual(results[0]["seed"], results[2]["seed"])
+        self.assertEqual(service.get_simulation("first")["seed"], results[0]["seed"])
+        self.assertEqual(len(pool.payloads), 2)
+
+    def test_prewarm_runs_in_tournament_priority_then_start_order(self):
+        names = [player["name"] for player in self.loader.get_all_players()[:6]]
+        pool = RecordingPool(self.loader)
+        self.addCleanup(pool.shutdown)
+        service = UpcomingMatchService(
+            self.loader,
+            discoverer=static_discoverer([
+                scheduled_match("atp-250", names[0], names[1], "Winston-Salem Open",
+                                "2026-08-11T12:00:00Z"),
+                scheduled_match("slam-late", names[2], names[3], "US Open",
+                                "2026-08-12T18:00:00Z"),
+                scheduled_match("slam-early", names[4], names[5], "US Open",
+                                "2026-08-12T12:00:00Z"),
+            ]),
+            simulation_pool=pool,
+            prewarm=True,
+        )
+        self.assertEqual(service.warmup_status(), {"state": "idle"})
+        service.get_upcoming()
+        for _ in range(500):
+            if service.warmup_status()["state"] == "complete":
+                break
+            threading.Event().wait(0.01)
+        status = service.warmup_status()
+        self.assertEqual((status["completed"], status["total"], status["queued"]), (3, 3, 0))
+        self.assertEqual([payload["player1"] for payload in pool.payloads], [
+            names[4], names[2], names[0],
+        ])
+        service.get_simulation("atp-250")
+        self.assertEqual(len(pool.payloads), 3)
+
+    def test_refresh_purges_unscheduled_matches_and_old_data_versions(self):
+        names = [player["name"] for player in self.loader.get_all_players()[:4]]
+        schedule = [
+            scheduled_match("kept", names[0], names[1]),
+            scheduled_match("finished", names[2], names[3]),
+        ]
+        service = UpcomingMatchService(self.loader, discoverer=static_discoverer(schedule))
+        service.get_upcoming()
+        service.get_simulation("kept")
+        service.get_simulation("finished")
+        service._simulation_cache.put(("previous", "kept", "hard", "best3"), {})
+        self.assertEqual(service.cache_metrics()["entries"], 3)
+
+        schedule.pop()
+        service.get_upcoming(force=True)
+        # The removed match survives one refresh for the retired-id grace period.
+        self.assertEqual(service.cache_metrics()["entries"], 2)
+        service.get_upcoming(force=True)
+        metrics = service.cache_metrics()
+        self.assertEqual(metrics["entries"], 1)
+        self.assertEqual(metrics["evictions"], {"data_version": 1, "unscheduled_match": 1})
+
+    def test_restarted_service_reads_persisted_simulations(self):
+        names = [player["name"] for player in self.loader.get_all_players()[:4]]
+        schedule = [
+            scheduled_match("warm", names[0], names[1]),
+            scheduled_match("stored", names[2], names[3]),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "results.sqlite3"
+            first = UpcomingMatchService(
+                self.loader, discoverer=static_discoverer(schedule),
+                result_store=SimulationResultStore(path),
+            )
+            first.get_upcoming()
+            expected = first.get_simulation("warm")
+            first.get_simulation("stored")
+            first.result_store.flush()
+
+            pool = RecordingPool(self.loader)
+            self.addCleanup(pool.shutdown)
+            restarted = UpcomingMatchService(
+                self.loader, discoverer=static_discoverer(schedule),
+                simulation_pool=pool, result_store=SimulationResultStore(path),
+            )
+            # Both results are loaded into memory before any request arrives.
+            self.assertEqual(restarted.cache_metrics()["entries"], 2)
+            restarted.get_upcoming()
+            self.assertEqual(restarted.get_simulation("warm")["seed"], expected["seed"])
+            self.assertEqual(
+                restarted.get_simulation("warm")["player1_probability"],
+                expected["player1_probability"],
+            )
+            restarted._simulation_cache.purge(lambda key: key[1] == "stored", "test")
+            restarted.get_simulation("stored")
+            self.assertEqual(pool.payloads, [])
+            self.assertEqual(restarted.result_store.metrics()["hits"], 1)
+
+    def test_new_data_version_carries_forward_unchanged_matchups(self):
+        names = [player["name"] for player in self.loader.get_all_players()[:4]]
+        schedule = [
+            scheduled_match("same", names[0], names[1]),
+            scheduled_match("changed", names[2], names[3]),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+            store_path = directory / "results.sqlite3"
+            for version in ("2026-08-10", "2026-08-11"):
+                (directory / f"{version}.json").write_text(json.dumps({"as_of": version}))
+            first = UpcomingMatchService(
+                self.loader, discoverer=static_discoverer(schedule),
+                metadata_path=directory / "2026-08-10.json",
+                result_store=SimulationResultStore(store_path),
+            )
+            first.get_upcoming()
+            same = first.get_simulation("same")
+            first.get_simulation("changed")
+            first.result_store.flush()
+
+            refreshed = TennisDataLoader()
+            stats = dict(refreshed.player_data[names[2]]["hard"])
+            stats["first_serve_win_pct"] += 0.01
+            refreshed.player_data[names[2]]["hard"] = stats
+            pool = RecordingPool(refreshed)
+            self.addCleanup(pool.shutdown)
+            second = UpcomingMatchService(
+                refreshed, discoverer=static_discoverer(schedule),
+                metadata_path=directory / "2026-08-11.json",
+                simulation_pool=pool, result_store=SimulationResultStore(store_path),
+            )
+            second.get_upcoming()
+            carried = second.get_simulation("same")
+            self.assertEqual(carried["seed"], same["seed"])
+            # The carried result is what a fresh run on the new data returns.
+            fresh = run_simulation_request(second._simulation_payload(
+                {**schedule[0], "surface": carried["surface"], "format": carried["format"]}
+            ), refreshed)
+            self.assertEqual(fresh["seed"], carried["seed"])
+            self.assertEqual(carried["player1_probability"], fresh["surfaces"]["hard"]["player1_win_pct"])
+            second.get_simulation("changed")
+            self.assertEqual([payload["player1"] for payload in pool.payloads], [names[2]])
+            self.assertEqual(second.cache_metrics()["last_refresh"], {
+                "from_version": "2026-08-10",
+                "to_version": "2026-08-11",
+                "carried_forward": 1,
+                "invalidated": 1,
+                "recomputed": 1,
+            })
+
+    def test_swapping_loader_republishes_and_recomputes_changed_matchups(self):
+        names = [player["name"] for player in self.loader.get_all_players()[:4]]
+        old_pool = RecordingPool(self.loader)
+        self.addCleanup(old_pool.shutdown)
+        service = UpcomingMatchService(
+            self.loader,
+            discoverer=static_discoverer([
+                scheduled_match("same", names[0], names[1]),
+                scheduled_match("changed", names[2], names[3]),
+            ]),
+            simulation_pool=old_pool,
+        )
+        service.get_upcoming()
+        same = service.get_simulation("same")
+        service.get_simulation("changed")
+        held_state = service._state
+
+        refreshed = TennisDataLoader()
+        refreshed.data_version = "next"
+        stats = dict(refreshed.player_data[names[3]]["hard"])
+        stats["vs_first_serve_win_pct"] += 0.02
+        refreshed.player_data[names[3]]["hard"] = stats
+        new_pool = RecordingPool(refreshed)
+        self.addCleanup(new_pool.shutdown)
+        service.swap_loader(refreshed, new_pool)
+
+        self.assertEqual(service.get_upcoming()["data_version"], "next")
+        self.assertIs(held_state.loader, self.loader)
+        self.assertEqual(service.get_simulation("same")["seed"], same["seed"])
+        service.get_simulation("changed")
+        self.assertEqual([payload["player2"] for payload in new_pool.payloads], [names[3]])
+        self.assertEqual(len(old_pool.payloads), 2)
+        refresh = service.cache_metrics()["last_refresh"]
+        self.assertEqual(
+            (refresh["carried_forward"], refresh["invalidated"], refresh["recomputed"]),
+            (1, 1, 1),
+        )
+
+    def test_expired_snapshot_is_served_while_one_thread_refreshes(self):
+        now = [0.0]
+        calls = []
+        release = threading.Event()
+        names = [player["name"] for player in self.loader.get_all_players()[:2]]
+        schedule = static_discoverer([scheduled_match("kept", names[0], names[1])])
+
+        def discoverer(known_names, days):
+            calls.append(now[0])
+            if len(calls) > 1:
+                release.wait(5)
+            return schedule(known_names, days)
+
+        service = UpcomingMatchService(
+            self.loader, discoverer=discoverer, clock=lambda: now[0]
+        )
+        first = service.get_upcoming()
+        self.assertEqual(first["refresh_latency_seconds"], 0)
+        now[0] = DISCOVERY_TTL_SECONDS + 1
+        # Every caller gets the stale snapshot while a single refresh is pending.
+        self.assertEqual(service.get_upcoming(), first)
+        self.assertEqual(service.get_upcoming(), first)
+        self.assertEqual(service.snapshot_age(), DISCOVERY_TTL_SECONDS + 1)
+        self.assertTrue(service.discovery_metrics()["refreshing"])
+        release.set()
+        service._refresh_thread.join(5)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(service.snapshot_age(), 0)
+        self.assertEqual(service.discovery_metrics()["refreshes"], 2)
+
+    def test_failed_refreshes_back_off_exponentially(self):
+        now = [0.0]
+        calls = []
+        names = [player["name"] for player in self.loader.get_all_players()[:2]]
+        schedule = static_discoverer([scheduled_match("kept", names[0], names[1])])
+
+        def discoverer(known_names, days):
+            calls.append(now[0])
+            if len(calls) > 1:
+                raise TimeoutError("provider down")
+            return schedule(known_names, days)
+
+        service = UpcomingMatchService(
+            self.loader, discoverer=discoverer, clock=lambda: now[0]
+        )
+        service.get_upcoming()
+
+        def request_at(moment):
+            now[0] = moment
+            result = service.get_upcoming()
+            if service._refresh_thread is not None:
+                service._refresh_thread.join(5)
+            return result
+
+        expired = DISCOVERY_TTL_SECONDS
+        request_at(expired)
+        request_at(expired + DISCOVERY_BACKOFF_SECONDS - 1)
+        request_at(expired + DISCOVERY_BACKOFF_SECONDS)
+        request_at(expired + 2 * DISCOVERY_BACKOFF_SECONDS)
+        result = request_at(expired + 3 * DISCOVERY_BACKOFF_SECONDS)
+        self.assertEqual(calls[1:], [
+            expired,
+            expired + DISCOVERY_BACKOFF_SECONDS,
+            expired + 3 * DISCOVERY_BACKOFF_SECONDS,
+        ])
+        self.assertEqual(len(result["matches"]), 1)
+        self.assertIn("Serving a cached schedule because live discovery failed.", result["errors"])
+        self.assertEqual(service.discovery_metrics()["consecutive_failures"], 3)
+
+    def test_snapshots_are_serialized_once_per_refresh(self):
+        names = [player["name"] for player in self.loader.get_all_players()[:4]]
+        schedule = [scheduled_match("kept", names[0], names[1])]
+        service = UpcomingMatchService(self.loader, discoverer=static_discoverer(schedule))
+        dashboard = service.get_upcoming_snapshot()
+        self.assertIs(service.get_upcoming_snapshot(), dashboard)
+        self.assertEqual(json.loads(dashboard.body), service.get_upcoming())
+
+        simulation = service.get_simulation_snapshot("kept")
+        self.assertIs(service.get_simulation_snapshot("kept"), simulation)
+        self.assertEqual(json.loads(simulation.body)["seed"], simulation.data["seed"])
+
+        schedule.append(scheduled_match("added", names[2], names[3]))
+        refreshed = service.get_upcoming_snapshot(force=True)
+        self.assertNotEqual(refreshed.etag, dashboard.etag)
+        self.assertIsNot(service.get_simulation_snapshot("kept"), simulation)
+
+    def test_batch_returns_cached_results_first_then_computes_misses(self):
+        names = [player["name"] for player in self.loader.get_all_players()[:4]]
+        pool = RecordingPool(self.loader)
+        self.addCleanup(pool.shutdown)
+        service = UpcomingMatchService(
+            self.loader,
+            discoverer=static_discoverer([
+                scheduled_match("first", names[0], names[1]),
+                scheduled_match("second", names[2], names[3]),
+            ]),
+            simulation_pool=pool,
+        )
+        service.get_simulation("second")
+        results = list(service.iter_simulation_snapshots(
+            ["first", "missing", "second", "first"]
+        ))
+        self.assertEqual([(match_id, error) for match_id, _, error in results], [
+            ("missing", (404, UNKNOWN_MATCH_MESSAGE)),
+            ("second", None),
+            ("first", None),
+        ])
+        self.assertEqual(len(pool.payloads), 2)
+        self.assertEqual(results[2][1].data, service.get_simulation("first"))
+        with self.assertRaises(ValueError):
+            service.iter_simulation_snapshots([])
+
+    def test_dashboard_client_splits_ids_into_batches_the_server_accepts(self):
+        script = (Path(__file__).resolve().parents[1] / "static" / "script.js").read_text(encoding="utf-8")
+        self.assertIn(f"const MAX_BATCH_SIMULATIONS = {MAX_BATCH_SIMULATIONS};", script)
+        names = [player["name"] for player in self.loader.get_all_players()[:2]]
+        service = UpcomingMatchService(
+            self.loader, discoverer=static_discoverer([scheduled_match("only", *names)])
+        )
+        match_ids = [f"match-{index}" for index in range(MAX_BATCH_SIMULATIONS + 1)]
+        with self.assertRaises(ValueError):
+            service.iter_simulation_snapshots(match_ids)
+        results = [
+            result
+            for start in range(0, len(match_ids), MAX_BATCH_SIMULATIONS)
+            for result in service.iter_simulation_snapshots(match_ids[start:start + MAX_BATCH_SIMULATIONS])
+        ]
+        self.assertEqual([match_id for match_id, _, _ in results], match_ids)
+
+    def test_batch_without_a_pool_yields_each_miss_before_computing_the_next(self):
+        names = [player["name"] for player in self.loader.get_all_players()[:4]]
+        service = UpcomingMatchService(
+            self.loader,
+            discoverer=static_discoverer([
+                scheduled_match("first", names[0], names[1]),
+                scheduled_match("second", names[2], names[3]),
+            ]),
+        )
+        computed = []
+
+        def recording_run(payload, loader):
+            computed.append(payload["player1"])
+            return run_simulation_request(payload, loader)
+
+        with patch("upcoming_service.run_simulation_request", recording_run):
+            results = service.iter_simulation_snapshots(["first", "second"])
+            match_id, snapshot, error = next(results)
+            self.assertEqual((match_id, error), ("first", None))
+            self.assertEqual(computed, [names[0]])
+            self.assertEqual([match_id for match_id, _, _ in results], ["second"])
+        self.assertEqual(computed, [names[0], names[2]])
+        self.assertEqual(snapshot.data["player1"], names[0])
+
+    def test_removed_ids_resolve_during_grace_period_then_404(self):
+        now = [0.0]
+        names = [player["name"] for player in self.loader.get_all_players()[:4]]
+        schedule = [
+            scheduled_match("kept", names[0], names[1]),
+            scheduled_match("started", names[2], names[3]),
+        ]
+        service = UpcomingMatchService(
+            self.loader, discoverer=static_discoverer(schedule), clock=lambda: now[0]
+        )
+        service.get_upcoming()
+        schedule.pop()
+        service.get_upcoming(force=True)
+        self.assertNotIn("started", service.get_upcoming_snapshot().match_index)
+
+        now[0] = RETIRED_MATCH_GRACE_SECONDS - 1
+        self.assertEqual(service.get_simulation("started")["player1"], names[2])
+        now[0] = RETIRED_MATCH_GRACE_SECONDS
+        with self.assertRaisesRegex(KeyError, "left the schedule"):
+            service.get_simulation("started")
+        with self.assertRaises(KeyError):
+            service.get_simulation("never-listed")
+
 
 if __name__ == "__main__":
     unittest.main()
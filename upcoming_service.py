@@ -1,20 +1,41 @@
 """Cached upcoming-match dashboard orchestration."""
 
-from copy import deepcopy
+from collections import deque
+from concurrent.futures import Future, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
 import hashlib
 import json
 from pathlib import Path
 import re
 import threading
 import time
+from types import MappingProxyType
+from typing import Any, Mapping
 import unicodedata
 
+from data_loader import read_data_version
 from market_odds import build_market_comparison, discover_upcoming_matches
-from simulation_service import run_simulation_request
+from response_snapshot import ResponseSnapshot, publish
+from result_store import canonical_request_key
+from simulation_cache import BoundedLRUCache
+from simulation_service import input_fingerprint, is_precomputed, run_simulation_request
 
 
 DISCOVERY_TTL_SECONDS = 300
+DISCOVERY_REFRESH_AHEAD_SECONDS = 30
+DISCOVERY_BACKOFF_SECONDS = 15
+DISCOVERY_MAX_BACKOFF_SECONDS = 600
+# Ids from the previous schedule keep resolving briefly so dashboards rendered
+# just before a refresh can still load their simulations.
+RETIRED_MATCH_GRACE_SECONDS = 120
+UNKNOWN_MATCH_MESSAGE = (
+    "Upcoming match not found; it may have started or left the schedule."
+)
 DASHBOARD_SIMULATIONS = 1000
+SIMULATION_CACHE_ENTRIES = 2000
+SIMULATION_CACHE_BYTES = 16 * 1024 * 1024
+MAX_BATCH_SIMULATIONS = 200
 
 TOURNAMENT_TIERS = {
     "grand_slam": {"label": "Grand Slam", "priority": 0},
@@ -159,125 +180,439 @@ def infer_format(tournament):
     return "best3"
 
 
+@dataclass(frozen=True)
+class DashboardSnapshot(ResponseSnapshot):
+    """Published schedule plus an id index built once per refresh."""
+
+    match_index: Mapping
+
+    @classmethod
+    def publish(cls, dashboard):
+        published = publish(dashboard)
+        return cls(
+            data=published.data,
+            body=published.body,
+            etag=published.etag,
+            match_index=MappingProxyType({
+                match["id"]: match for match in published.data["matches"]
+            }),
+        )
+
+
+@dataclass(frozen=True)
+class DataState:
+    """A loader, its data version, and the pool whose workers hold that loader.
+
+    Swapped as one reference so a request never mixes two data snapshots.
+    """
+
+    loader: Any
+    data_version: str
+    simulation_pool: Any = None
+
+
 class UpcomingMatchService:
     def __init__(self, loader, discoverer=discover_upcoming_matches,
-                 clock=time.monotonic, metadata_path=None):
-        self.loader = loader
+                 clock=time.monotonic, metadata_path=None, simulation_pool=None,
+                 prewarm=False, result_store=None):
         self.discoverer = discoverer
         self.clock = clock
+        self.result_store = result_store
         self.metadata_path = Path(metadata_path) if metadata_path else (
             Path(__file__).resolve().parent / "data" / "metadata.json"
         )
         self._discovery_lock = threading.Lock()
         self._simulation_lock = threading.Lock()
-        self._matches = None
+        self._refresh_guard = threading.Lock()
+        self._refresh_thread = None
+        self._dashboard = None
+        self._retired_index = MappingProxyType({})
+        self._retired_at = None
         self._matches_cached_at = 0
-        self._simulation_cache = {}
-        self.data_version = self._load_data_version()
+        self._discovery_latency = None
+        self._discovery_refreshes = 0
+        self._discovery_failures = 0
+        self._discovery_retry_at = 0
+        self._discovery_days = 7
+        self._simulation_cache = BoundedLRUCache(
+            SIMULATION_CACHE_ENTRIES, SIMULATION_CACHE_BYTES
+        )
+        self._simulation_responses = BoundedLRUCache(
+            SIMULATION_CACHE_ENTRIES, SIMULATION_CACHE_BYTES
+        )
+        self._simulations_in_flight = {}
+        self._last_refresh = None
+        self.prewarm = prewarm
+        self._warmup_condition = threading.Condition()
+        self._warmup_queue = deque()
+        self._warmup_progress = None
+        self._warmup_version = None
+        self._warmup_thread = None
+        self._interactive_requests = 0
+        self._state = DataState(loader, self._load_data_version(), simulation_pool)
+        self._warm_load_results()
 
     def _load_data_version(self):
-        try:
-            metadata = json.loads(self.metadata_path.read_text(encoding="utf-8"))
-            return str(metadata.get("as_of") or metadata.get("generated_at") or "unknown")
-        except (OSError, ValueError):
-            return "unknown"
+        return read_data_version(self.metadata_path)
+
+    @property
+    def loader(self):
+        return self._state.loader
+
+    @property
+    def data_version(self):
+        return self._state.data_version
+
+    @property
+    def simulation_pool(self):
+        return self._state.simulation_pool
+
+    def swap_loader(self, loader, simulation_pool=None):
+        """Switch to a new, validated loader without blocking requests.
+
+        Requests that already captured the old state finish on it. Results
+        whose inputs did not change are carried forward, the schedule is
+        rediscovered so in-model flags match the new players, and the old
+        pool shuts down once its queued work drains.
+        """
+        previous = self._state
+        self._state = DataState(loader, loader.data_version, simulation_pool)
+        version = loader.data_version
+        if previous.data_version != version:
+            self._carry_forward_simulations(previous.data_version)
+            self._simulation_responses.purge(lambda key: key[1] != version, "data_version")
+        if self._dashboard is not None:
+            with self._discovery_lock:
+                self._refresh_discovery(self._discovery_days)
+        if previous.simulation_pool not in (None, simulation_pool):
+            previous.simulation_pool.shutdown(wait=False)
+
+    def _warm_load_results(self):
+        """Seed the memory cache from the persistent store, if configured.
+
+        The newest results for this data version are loaded as-is; results for
+        the store's previous version are carried forward when their inputs
+        are unchanged.
+        """
+        if self.result_store is None:
+            return
+        records = self.result_store.recent(
+            "dashboard", self.data_version, SIMULATION_CACHE_ENTRIES
+        )
+        for _, record in reversed(records):
+            entry = record["entry"]
+            self._simulation_cache.put((
+                self.data_version, record["match_id"], entry["surface"],
+                entry["format"], record["fingerprint"],
+            ), entry)
+        previous = self.result_store.latest_version("dashboard", self.data_version)
+        if previous is not None:
+            self._carry_forward_simulations(previous)
+
+    def _carry_forward_simulations(self, previous_version):
+        """Re-key ``previous_version`` results whose model inputs are unchanged.
+
+        Only matchups whose input fingerprint changed are left to recompute;
+        the quality summary is rebuilt because it also reflects schedule data.
+        """
+        candidates = {
+            key[1:]: entry for key, entry in self._simulation_cache.items()
+            if key[0] == previous_version
+        }
+        if self.result_store is not None:
+            for _, record in self.result_store.recent(
+                "dashboard", previous_version, SIMULATION_CACHE_ENTRIES
+            ):
+                entry = record["entry"]
+                candidates.setdefault(
+                    (record["match_id"], entry["surface"], entry["format"], record["fingerprint"]),
+                    entry,
+                )
+        state = self._state
+        carried = 0
+        for (match_id, surface, format_type, fingerprint), entry in candidates.items():
+            match = {
+                "id": match_id, "player1": entry["player1"], "player2": entry["player2"],
+                "surface": surface, "format": format_type,
+            }
+            payload = self._simulation_payload(match)
+            try:
+                if (entry.get("seed") != payload["seed"]
+                        or input_fingerprint(payload, state.loader) != fingerprint):
+                    continue
+                entry = {**entry, "quality": self._quality_summary(match, state.loader)}
+            except ValueError:
+                continue
+            self._store_simulation(
+                (state.data_version, match_id, surface, format_type, fingerprint),
+                entry, canonical_request_key(payload),
+            )
+            carried += 1
+        self._simulation_cache.purge(lambda key: key[0] == previous_version, "data_version")
+        with self._simulation_lock:
+            self._last_refresh = {
+                "from_version": previous_version,
+                "to_version": state.data_version,
+                "carried_forward": carried,
+                "invalidated": len(candidates) - carried,
+                "recomputed": 0,
+            }
 
     def _known_names(self):
         return [player["name"] for player in self.loader.get_all_players()]
 
+    def get_upcoming_snapshot(self, days=7, force=False):
+        """Return the current schedule snapshot without waiting on providers.
+
+        Only the very first discovery (or an explicit ``force``) blocks the
+        caller. Afterwards a single background thread refreshes the snapshot
+        once it is close to expiring, backing off exponentially on failure.
+        """
+        if force or self._dashboard is None:
+            with self._discovery_lock:
+                if force or self._dashboard is None:
+                    self._refresh_discovery(days)
+        else:
+            self._maybe_refresh_in_background(days)
+            if self.prewarm and self._warmup_version != self.data_version:
+                self._schedule_warmup(self._dashboard.data)
+        return self._dashboard
+
     def get_upcoming(self, days=7, force=False):
+        """Return the read-only schedule; it is shared, never copied."""
+        return self.get_upcoming_snapshot(days, force).data
+
+    def _prepare_dashboard(self, result):
+        included_matches = []
+        excluded_count = 0
+        for match in result["matches"]:
+            tournament = classify_tournament(match.get("tournament"))
+            if tournament is None:
+                excluded_count += 1
+                continue
+            match["tournament_name"] = tournament["name"]
+            match["tournament_tier"] = tournament["tier"]
+            match["tournament_tier_label"] = tournament["tier_label"]
+            match["tournament_priority"] = tournament["priority"]
+            tournament_text = _normalized_text(match.get("tournament"))
+            is_qualification = (
+                "qualification" in tournament_text
+                or "qualifying" in tournament_text
+            )
+            match["tournament_stage"] = "Qualification" if is_qualification else "Main draw"
+            match["tournament_stage_priority"] = 1 if is_qualification else 0
+            match["surface"] = infer_surface(match.get("tournament"))
+            match["format"] = infer_format(match.get("tournament"))
+            match["player1_url"] = tennis_abstract_url(match["player1"])
+            match["player2_url"] = tennis_abstract_url(match["player2"])
+            match["simulation_available"] = bool(
+                match["player1_in_model"]
+                and match["player2_in_model"]
+                and match["surface"]
+            )
+            if not match["simulation_available"]:
+                if not match["player1_in_model"] or not match["player2_in_model"]:
+                    match["simulation_unavailable_reason"] = (
+                        "One or both players are not in the current statistics snapshot."
+                    )
+                else:
+                    match["simulation_unavailable_reason"] = (
+                        "Tournament surface is not mapped yet."
+                    )
+            included_matches.append(match)
+        included_matches.sort(key=lambda match: (
+            match["start_time"],
+            match["tournament_priority"],
+            match["tournament_stage_priority"],
+            match["tournament_name"],
+            match["player1"],
+        ))
+        result["matches"] = included_matches
+        result["excluded_match_count"] = excluded_count
+        result["tour_level_only"] = True
+        result["data_version"] = self.data_version
+        result["cache_seconds"] = DISCOVERY_TTL_SECONDS
+        return result
+
+    def _refresh_discovery(self, days):
+        """Run one discovery under ``_discovery_lock`` and record its outcome."""
+        self._discovery_days = days
+        started = self.clock()
+        try:
+            result = self._prepare_dashboard(
+                self.discoverer(self._known_names(), days=days)
+            )
+        except Exception:
+            finished = self.clock()
+            self._discovery_failures += 1
+            self._discovery_retry_at = finished + min(
+                DISCOVERY_MAX_BACKOFF_SECONDS,
+                DISCOVERY_BACKOFF_SECONDS * 2 ** (self._discovery_failures - 1),
+            )
+            if self._dashboard is None:
+                raise
+            previous = json.loads(self._dashboard.body)
+            previous["errors"] = list(dict.fromkeys([
+                *previous.get("errors", []),
+                "Serving a cached schedule because live discovery failed.",
+            ]))
+            self._dashboard = DashboardSnapshot.publish(previous)
+            return
+        finished = self.clock()
+        self._discovery_latency = finished - started
+        self._discovery_failures = 0
+        self._discovery_retry_at = 0
+        self._discovery_refreshes += 1
+        result["refresh_latency_seconds"] = round(self._discovery_latency, 3)
+        if self._dashboard is not None:
+            self._retired_index = self._dashboard.match_index
+            self._retired_at = finished
+        self._dashboard = DashboardSnapshot.publish(result)
+        self._matches_cached_at = finished
+        self._purge_simulations({*self._dashboard.match_index, *self._retired_index})
+        etag = self._dashboard.etag
+        self._simulation_responses.purge(lambda key: key[0] != etag, "dashboard_refresh")
+        self._schedule_warmup(self._dashboard.data)
+
+    def _maybe_refresh_in_background(self, days):
         now = self.clock()
         if (
-            not force
-            and self._matches is not None
-            and now - self._matches_cached_at < DISCOVERY_TTL_SECONDS
+            now - self._matches_cached_at
+            < DISCOVERY_TTL_SECONDS - DISCOVERY_REFRESH_AHEAD_SECONDS
+            or now < self._discovery_retry_at
         ):
-            return deepcopy(self._matches)
+            return
+        with self._refresh_guard:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(
+                target=self._background_refresh, args=(days,),
+                name="schedule-discovery", daemon=True,
+            )
+            self._refresh_thread.start()
 
+    def _background_refresh(self, days):
         with self._discovery_lock:
-            now = self.clock()
-            if (
-                not force
-                and self._matches is not None
-                and now - self._matches_cached_at < DISCOVERY_TTL_SECONDS
-            ):
-                return deepcopy(self._matches)
+            self._refresh_discovery(days)
+
+    def snapshot_age(self):
+        if self._dashboard is None:
+            return None
+        return max(0.0, self.clock() - self._matches_cached_at)
+
+    def discovery_metrics(self):
+        age = self.snapshot_age()
+        thread = self._refresh_thread
+        return {
+            "snapshot_age_seconds": None if age is None else round(age, 3),
+            "last_refresh_latency_seconds": (
+                None if self._discovery_latency is None
+                else round(self._discovery_latency, 3)
+            ),
+            "refreshes": self._discovery_refreshes,
+            "consecutive_failures": self._discovery_failures,
+            "retry_in_seconds": round(max(0.0, self._discovery_retry_at - self.clock()), 3),
+            "refreshing": thread is not None and thread.is_alive(),
+        }
+
+    def _purge_simulations(self, scheduled_ids):
+        """Eagerly drop results for superseded data or matches no longer listed."""
+        version = self.data_version
+        self._simulation_cache.purge(lambda key: key[0] != version, "data_version")
+        self._simulation_cache.purge(lambda key: key[1] not in scheduled_ids, "unscheduled_match")
+
+    def cache_metrics(self):
+        with self._simulation_lock:
+            in_flight = len(self._simulations_in_flight)
+            last_refresh = dict(self._last_refresh) if self._last_refresh else None
+        return {
+            **self._simulation_cache.metrics(),
+            "in_flight": in_flight,
+            "last_refresh": last_refresh,
+        }
+
+    def _schedule_warmup(self, dashboard):
+        """Queue every simulatable match, most important tournaments first.
+
+        A new schedule or data version replaces whatever was still queued.
+        """
+        if not self.prewarm:
+            return
+        matches = sorted(
+            (match for match in dashboard["matches"] if match["simulation_available"]),
+            key=lambda match: (
+                match["tournament_priority"],
+                match["tournament_stage_priority"],
+                match["start_time"],
+                match["id"],
+            ),
+        )
+        with self._warmup_condition:
+            self._warmup_queue = deque(matches)
+            self._warmup_version = self.data_version
+            self._warmup_progress = {
+                "data_version": self.data_version,
+                "total": len(matches),
+                "completed": 0,
+                "failed": 0,
+                "running": False,
+            }
+            if self._warmup_thread is None:
+                self._warmup_thread = threading.Thread(
+                    target=self._run_warmup, name="simulation-warmup", daemon=True
+                )
+                self._warmup_thread.start()
+            self._warmup_condition.notify_all()
+
+    def _run_warmup(self):
+        # One simulation at a time, and only while no interactive request is
+        # waiting, so warming never competes with visitors for pool workers.
+        while True:
+            with self._warmup_condition:
+                while not self._warmup_queue or self._interactive_requests:
+                    self._warmup_condition.wait()
+                match = self._warmup_queue.popleft()
+                progress = self._warmup_progress
+                progress["running"] = True
             try:
-                result = self.discoverer(self._known_names(), days=days)
-                included_matches = []
-                excluded_count = 0
-                for match in result["matches"]:
-                    tournament = classify_tournament(match.get("tournament"))
-                    if tournament is None:
-                        excluded_count += 1
-                        continue
-                    match["tournament_name"] = tournament["name"]
-                    match["tournament_tier"] = tournament["tier"]
-                    match["tournament_tier_label"] = tournament["tier_label"]
-                    match["tournament_priority"] = tournament["priority"]
-                    tournament_text = _normalized_text(match.get("tournament"))
-                    is_qualification = (
-                        "qualification" in tournament_text
-                        or "qualifying" in tournament_text
-                    )
-                    match["tournament_stage"] = "Qualification" if is_qualification else "Main draw"
-                    match["tournament_stage_priority"] = 1 if is_qualification else 0
-                    match["surface"] = infer_surface(match.get("tournament"))
-                    match["format"] = infer_format(match.get("tournament"))
-                    match["player1_url"] = tennis_abstract_url(match["player1"])
-                    match["player2_url"] = tennis_abstract_url(match["player2"])
-                    match["simulation_available"] = bool(
-                        match["player1_in_model"]
-                        and match["player2_in_model"]
-                        and match["surface"]
-                    )
-                    if not match["simulation_available"]:
-                        if not match["player1_in_model"] or not match["player2_in_model"]:
-                            match["simulation_unavailable_reason"] = (
-                                "One or both players are not in the current statistics snapshot."
-                            )
-                        else:
-                            match["simulation_unavailable_reason"] = (
-                                "Tournament surface is not mapped yet."
-                            )
-                    included_matches.append(match)
-                included_matches.sort(key=lambda match: (
-                    match["start_time"],
-                    match["tournament_priority"],
-                    match["tournament_stage_priority"],
-                    match["tournament_name"],
-                    match["player1"],
-                ))
-                result["matches"] = included_matches
-                result["excluded_match_count"] = excluded_count
-                result["tour_level_only"] = True
-                result["data_version"] = self.data_version
-                result["cache_seconds"] = DISCOVERY_TTL_SECONDS
-                self._matches = result
-                self._matches_cached_at = now
+                self._simulation_future(match).result()
+                outcome = "completed"
             except Exception:
-                if self._matches is None:
-                    raise
-                self._matches["errors"] = list(dict.fromkeys([
-                    *self._matches.get("errors", []),
-                    "Serving a cached schedule because live discovery failed.",
-                ]))
-            return deepcopy(self._matches)
-
-    def _find_match(self, match_id):
-        dashboard = self.get_upcoming()
-        return next(
-            (match for match in dashboard["matches"] if match["id"] == match_id),
-            None,
-        )
+                outcome = "failed"
+            with self._warmup_condition:
+                progress[outcome] += 1
+                progress["running"] = False
+                self._warmup_condition.notify_all()
+
+    def warmup_status(self):
+        with self._warmup_condition:
+            if self._warmup_progress is None:
+                return {"state": "idle" if self.prewarm else "disabled"}
+            progress = dict(self._warmup_progress)
+            running = progress.pop("running")
+            progress["queued"] = len(self._warmup_queue)
+        progress["state"] = "warming" if running or progress["queued"] else "complete"
+        return progress
+
+    def _find_match(self, match_id, dashboard=None):
+        """Look up a match by id, honouring the previous schedule's grace period."""
+        dashboard = dashboard if dashboard is not None else self.get_upcoming_snapshot()
+        match = dashboard.match_index.get(match_id)
+        if match is None and self._retired_at is not None and (
+            self.clock() - self._retired_at < RETIRED_MATCH_GRACE_SECONDS
+        ):
+            match = self._retired_index.get(match_id)
+        return match
 
     def _seed_for(self, match):
-        material = f"{self.data_version}|{match['id']}|{match['surface']}"
+        # The seed ignores the data version so a result carried forward to a new
+        # version is exactly what recomputing it there would return.
+        material = f"{match['id']}|{match['surface']}"
         return int.from_bytes(hashlib.sha256(material.encode("utf-8")).digest()[:8], "big") % (2**63)
 
-    def _quality_summary(self, match):
-        first, _ = self.loader.get_player_stats(match["player1"], match["surface"])
-        second, _ = self.loader.get_player_stats(match["player2"], match["surface"])
+    def _quality_summary(self, match, loader):
+        first, _ = loader.get_player_stats(match["player1"], match["surface"])
+        second, _ = loader.get_player_stats(match["player2"], match["surface"])
         players = []
         for name, stats in ((match["player1"], first), (match["player2"], second)):
             players.append({
@@ -292,7 +627,11 @@ class UpcomingMatchService:
         if min(player["matches"] for player in players) < 15:
             warnings.append("At least one player has fewer than 15 matches on this surface.")
         opponent_means = [player["mean_opponent_rank"] for player in players]
-        if None not in opponent_means and abs(opponent_means[0] - opponent_means[1]) >= 75:
+        adjusted = getattr(loader, "opponent_adjusted", False) and all(
+            stats.get("adjusted_first_serve_win_pct") is not None for stats in (first, second)
+        )
+        if (not adjusted and None not in opponent_means
+                and abs(opponent_means[0] - opponent_means[1]) >= 75):
             warnings.append(
                 "The players faced substantially different opponent quality; the model does not adjust for schedule strength."
             )
@@ -302,48 +641,223 @@ class UpcomingMatchService:
             "warnings": warnings,
         }
 
-    def get_simulation(self, match_id):
-        match = self._find_match(match_id)
+    def _submit_simulation(self, payload, state):
+        # A precomputed answer is cheaper than the round trip to the pool.
+        if state.simulation_pool is not None and not is_precomputed(payload, state.loader):
+            return state.simulation_pool.submit(payload)
+        computation = Future()
+        try:
+            computation.set_result(run_simulation_request(payload, state.loader))
+        except Exception as error:
+            computation.set_exception(error)
+        return computation
+
+    def _dashboard_entry(self, match, simulation, loader):
+        surface_result = simulation["surfaces"][match["surface"]]
+        return {
+            "player1": match["player1"],
+            "player2": match["player2"],
+            "surface": match["surface"],
+            "format": match["format"],
+            "num_simulations": DASHBOARD_SIMULATIONS,
+            "seed": simulation["seed"],
+            "player1_probability": surface_result["player1_win_pct"],
+            "player2_probability": surface_result["player2_win_pct"],
+            "player1_ci95": surface_result["player1_win_ci95"],
+            "quality": self._quality_summary(match, loader),
+            "fallback_warnings": simulation["fallback_warnings"],
+        }
+
+    def _store_simulation(self, cache_key, cached, store_key=None):
+        with self._simulation_lock:
+            self._simulation_cache.put(cache_key, cached)
+            self._simulations_in_flight.pop(cache_key, None)
+        if store_key is not None and self.result_store is not None:
+            self.result_store.put("dashboard", cache_key[0], store_key, {
+                "match_id": cache_key[1],
+                "fingerprint": cache_key[4],
+                "entry": cached,
+            })
+
+    def _finish_simulation(self, state, cache_key, store_key, match, pending, computation):
+        try:
+            cached = self._dashboard_entry(match, computation.result(), state.loader)
+        except Exception as error:
+            with self._simulation_lock:
+                self._simulations_in_flight.pop(cache_key, None)
+            pending.set_exception(error)
+            return
+        self._store_simulation(cache_key, cached, store_key)
+        with self._simulation_lock:
+            if self._last_refresh and self._last_refresh["to_version"] == cache_key[0]:
+                self._last_refresh["recomputed"] += 1
+        pending.set_result(cached)
+
+    def _simulation_payload(self, match):
+        return {
+            "player1": match["player1"],
+            "player2": match["player2"],
+            "format": match["format"],
+            "num_simulations": DASHBOARD_SIMULATIONS,
+            "surfaces": [match["surface"]],
+            "seed": self._seed_for(match),
+        }
+
+    def _simulation_future(self, match, state=None):
+        """Return a future for one match, sharing any computation already running.
+
+        The lock only guards the cache and in-flight lookups; the simulation
+        itself runs on the shared pool so different matches compute in parallel.
+        Results are keyed by data version and the fingerprint of the players'
+        model inputs. A memory miss consults the persistent result store, when
+        configured, before computing.
+        """
+        state = state or self._state
+        payload = self._simulation_payload(match)
+        try:
+            fingerprint = input_fingerprint(payload, state.loader)
+        except ValueError as error:
+            failed = Future()
+            failed.set_exception(error)
+            return failed
+        cache_key = (
+            state.data_version, match["id"], match["surface"], match["format"], fingerprint
+        )
+        with self._simulation_lock:
+            cached = self._simulation_cache.get(cache_key)
+            if cached is not None:
+                pending = Future()
+                pending.set_result(cached)
+                return pending
+            pending = self._simulations_in_flight.get(cache_key)
+            if pending is not None:
+                return pending
+            pending = Future()
+            self._simulations_in_flight[cache_key] = pending
+
+        store_key = canonical_request_key(payload)
+        if self.result_store is not None:
+            record = self.result_store.get("dashboard", cache_key[0], store_key)
+            if record is not None:
+                self._store_simulation(cache_key, record["entry"])
+                pending.set_result(record["entry"])
+                return pending
+        try:
+            computation = self._submit_simulation(payload, state)
+        except Exception as error:
+            with self._simulation_lock:
+                self._simulations_in_flight.pop(cache_key, None)
+            pending.set_exception(error)
+            return pending
+        computation.add_done_callback(
+            lambda done: self._finish_simulation(state, cache_key, store_key, match, pending, done)
+        )
+        return pending
+
+    def _resolve_simulatable(self, match_id, dashboard):
+        match = self._find_match(match_id, dashboard)
         if match is None:
-            raise KeyError("Upcoming match not found")
+            raise KeyError(UNKNOWN_MATCH_MESSAGE)
         if not match["simulation_available"]:
             raise ValueError(match["simulation_unavailable_reason"])
+        return match
 
-        cache_key = (self.data_version, match_id, match["surface"], match["format"])
-        with self._simulation_lock:
-            cached = self._simulation_cache.get(cache_key)
-            if cached is None:
-                payload = {
-                    "player1": match["player1"],
-                    "player2": match["player2"],
-                    "format": match["format"],
-                    "num_simulations": DASHBOARD_SIMULATIONS,
-                    "surfaces": [match["surface"]],
-                    "seed": self._seed_for(match),
-                }
-                simulation = run_simulation_request(payload, self.loader)
-                surface_result = simulation["surfaces"][match["surface"]]
-                cached = {
-                    "player1": match["player1"],
-                    "player2": match["player2"],
-                    "surface": match["surface"],
-                    "format": match["format"],
-                    "num_simulations": DASHBOARD_SIMULATIONS,
-                    "seed": simulation["seed"],
-                    "player1_probability": surface_result["player1_win_pct"],
-                    "player2_probability": surface_result["player2_win_pct"],
-                    "player1_ci95": surface_result["player1_win_ci95"],
-                    "quality": self._quality_summary(match),
-                    "fallback_warnings": simulation["fallback_warnings"],
-                }
-                self._simulation_cache[cache_key] = cached
-
-        response = deepcopy(cached)
+    def _publish_simulation(self, dashboard, state, match, cached):
         providers = match["market_comparison"].get("providers", [])
-        response["market_comparison"] = build_market_comparison(
-            match["player1"],
-            match["player2"],
-            providers,
-            {match["surface"]: cached["player1_probability"]},
+        published = publish({
+            **cached,
+            "market_comparison": build_market_comparison(
+                match["player1"],
+                match["player2"],
+                providers,
+                {match["surface"]: cached["player1_probability"]},
+            ),
+        })
+        self._simulation_responses.put(
+            (dashboard.etag, state.data_version, match["id"]), published
         )
-        return response
+        return published
+
+    @contextmanager
+    def _interactive(self, count=1):
+        """Pause warm-up while visitors are waiting on simulation results."""
+        with self._warmup_condition:
+            self._interactive_requests += count
+        try:
+            yield
+        finally:
+            with self._warmup_condition:
+                self._interactive_requests -= count
+                self._warmup_condition.notify_all()
+
+    def get_simulation_snapshot(self, match_id):
+        """Return the serialized simulation response for one dashboard match.
+
+        Responses are built once per dashboard snapshot, because the market
+        comparison depends on that snapshot's provider prices.
+        """
+        dashboard = self.get_upcoming_snapshot()
+        state = self._state
+        match = self._resolve_simulatable(match_id, dashboard)
+        published = self._simulation_responses.get(
+            (dashboard.etag, state.data_version, match_id)
+        )
+        if published is not None:
+            return published
+        with self._interactive():
+            cached = self._simulation_future(match, state).result()
+        return self._publish_simulation(dashboard, state, match, cached)
+
+    def iter_simulation_snapshots(self, match_ids):
+        """Resolve a batch of ids against one dashboard snapshot.
+
+        Returns an iterator of ``(match_id, snapshot, error)`` tuples. Cached
+        responses come first; misses are computed in parallel and yielded as
+        each finishes. ``error`` is ``(http_status, message)`` or ``None``.
+        """
+        match_ids = list(dict.fromkeys(match_ids))
+        if not match_ids:
+            raise ValueError("At least one match id is required")
+        if len(match_ids) > MAX_BATCH_SIMULATIONS:
+            raise ValueError(f"At most {MAX_BATCH_SIMULATIONS} match ids are allowed")
+        return self._iter_simulation_snapshots(self.get_upcoming_snapshot(), match_ids)
+
+    def _iter_simulation_snapshots(self, dashboard, match_ids):
+        state = self._state
+        misses = []
+        for match_id in match_ids:
+            try:
+                match = self._resolve_simulatable(match_id, dashboard)
+            except KeyError:
+                yield match_id, None, (404, UNKNOWN_MATCH_MESSAGE)
+                continue
+            except ValueError as error:
+                yield match_id, None, (422, str(error))
+                continue
+            published = self._simulation_responses.get(
+                (dashboard.etag, state.data_version, match_id)
+            )
+            if published is not None:
+                yield match_id, published, None
+            else:
+                misses.append(match)
+        if not misses:
+            return
+
+        with self._interactive(len(misses)):
+            if state.simulation_pool is None:
+                # Misses compute inline, so each is yielded before the next starts.
+                completed = ((self._simulation_future(match, state), match) for match in misses)
+            else:
+                pending = {self._simulation_future(match, state): match for match in misses}
+                completed = ((future, pending[future]) for future in as_completed(pending))
+            for future, match in completed:
+                try:
+                    cached = future.result()
+                except Exception:
+                    yield match["id"], None, (503, "Match simulation is temporarily unavailable")
+                    continue
+                yield match["id"], self._publish_simulation(dashboard, state, match, cached), None
+
+    def get_simulation(self, match_id):
+        return self.get_simulation_snapshot(match_id).data